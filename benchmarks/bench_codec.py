@@ -0,0 +1,106 @@
+"""
+Record format benchmark: binary records against JSON and pickle
+
+Encodes and decodes --samples fake samples of each model as
+    records_f64    RecordCodec with float64 values (RecordCodec.encode / iter_unpack)
+    records_f32    the same with float32 values
+    numpy          np.frombuffer() of the float64 records, each column copied into its own
+                   array (decoding only, no model objects)
+    json           one JSON object per sample, a list of lines
+    pickle         pickle.dumps of the (timestamp, model) list (highest protocol)
+and reports bytes per sample and encode/decode throughput in samples/sec.
+
+Usage:
+    python benchmarks/bench_codec.py [--samples 100000] [--repeat 3]
+"""
+import argparse
+import json
+import pickle
+import time
+from dataclasses import asdict
+from datetime import datetime, timedelta
+
+import common  # noqa: F401  (sets up sys.path)
+from models import RaspberryPiData, RecordCodec, SenseHatData
+
+
+def fake_samples(model: type, count: int) -> list:
+    from sensors.fake import FakeSenseHatReader, FakeSystemReader
+    
+    reader = FakeSenseHatReader() if model is SenseHatData else FakeSystemReader()
+    start = datetime(2024, 1, 1)
+    return [(start + timedelta(seconds=i), reader.read()) for i in range(count)]
+
+
+def json_encode(samples: list) -> bytes:
+    return "\n".join(
+        json.dumps({"timestamp": timestamp.isoformat(), **asdict(data)}) for timestamp, data in samples
+    ).encode("utf-8")
+
+
+def json_decoder(model: type):
+    def decode(buffer: bytes) -> list:
+        samples = []
+        for line in buffer.decode("utf-8").split("\n"):
+            values = json.loads(line)
+            samples.append((datetime.fromisoformat(values.pop("timestamp")), model(**values)))
+        return samples
+    return decode
+
+
+def numpy_decoder(codec: RecordCodec):
+    import numpy as np
+    
+    def decode(buffer: bytes) -> dict:
+        # Copy the columns so the timing covers reading every record, not only the view
+        records = np.frombuffer(buffer, dtype=codec.dtype())
+        return {name: np.ascontiguousarray(records[name]) for name in records.dtype.names}
+    return decode
+
+
+def formats(model: type) -> dict:
+    """Format name -> (encode, decode)"""
+    f64 = RecordCodec(model)
+    f32 = RecordCodec(model, float_width=4)
+    result = {
+        "records_f64": (f64.encode, lambda buffer: list(f64.iter_unpack(buffer))),
+        "records_f32": (f32.encode, lambda buffer: list(f32.iter_unpack(buffer))),
+    }
+    try:
+        result["numpy"] = (f64.encode, numpy_decoder(f64))
+    except ImportError:
+        pass
+    result["json"] = (json_encode, json_decoder(model))
+    result["pickle"] = (lambda samples: pickle.dumps(samples, pickle.HIGHEST_PROTOCOL), pickle.loads)
+    return result
+
+
+def best(operation, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3, help="timing runs per operation (default: 3)")
+    args = parser.parse_args()
+    
+    for model in (SenseHatData, RaspberryPiData):
+        samples = fake_samples(model, args.samples)
+        print(f"{model.__name__}, {args.samples:,} samples")
+        print(f"  {'format':<12} {'bytes/sample':>12} {'encode/s':>12} {'decode/s':>12}")
+        for name, (encode, decode) in formats(model).items():
+            buffer = encode(samples)
+            encode_seconds = best(lambda: encode(samples), args.repeat)
+            decode_seconds = best(lambda: decode(buffer), args.repeat)
+            print(f"  {name:<12} {len(buffer) / args.samples:>12.1f} "
+                  f"{args.samples / encode_seconds:>12,.0f} {args.samples / decode_seconds:>12,.0f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Fleet load test: how many loggers one PostgreSQL server absorbs
+
+Simulates K devices, each with its own DEVICE_ID, fake readers and Database,
+writing a sensehat and a raspberry_pi sample every --interval seconds through
+the logger's real write path into the configured PostgreSQL database
+(POSTGRES_* variables), e.g. the one from docker/docker-compose.yml. Devices
+are spread over worker processes, each running its devices as threads, so
+the load generator is not held back by the GIL.
+
+Every write method is run for every fleet size:
+    per_row      one INSERT and COMMIT per sample (DB_BATCH_SIZE=1)
+    insert       one multi-row INSERT per --batch samples
+    copy         COPY text per --batch samples
+    copy_binary  COPY binary per --batch samples
+
+Reported per run: sustained rows/sec, p50/p99 latency of a write call, the
+largest number of connections to the database and the CPU used by postgres
+processes on this host (in % of one core; n/a when the server is remote).
+The benchmark rows are deleted after every run.
+
+Usage:
+    python benchmarks/bench_fleet.py --devices 10 100 500 --duration 60
+    python benchmarks/bench_fleet.py --devices 50 --interval 0 --methods per_row copy   # unthrottled
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import threading
+import time
+
+import psutil
+
+import common  # noqa: F401  (sets up sys.path)
+from config import Config
+from database import Database
+from database.db import utcnow
+
+METHODS = ("per_row", "insert", "copy", "copy_binary")
+TABLES = ("sensehat", "raspberry_pi")
+
+
+def run_device(device_id: str, method: str, batch: int, interval: float, start_at: float, stop_at: float,
+               results: list):
+    """Write fake samples for one device from start_at until stop_at (time.time())"""
+    from sensors.fake import FakeSenseHatReader, FakeSystemReader
+    
+    db = Database(batch_size=1, device_id=device_id)
+    sensehat_reader = FakeSenseHatReader()
+    system_reader = FakeSystemReader()
+    batch = 1 if method == "per_row" else batch
+    pending = {table: [] for table in TABLES}
+    latencies = []
+    rows = errors = 0
+    
+    # Spread the devices over the interval, like a fleet that was not started in lockstep
+    next_tick = start_at + random.uniform(0, interval)
+    while True:
+        now = time.time()
+        if now >= stop_at:
+            break
+        if now < next_tick:
+            time.sleep(min(next_tick, stop_at) - now)
+            continue
+        next_tick += interval
+        
+        timestamp = utcnow()
+        pending["sensehat"].append((timestamp, sensehat_reader.read()))
+        pending["raspberry_pi"].append((timestamp, system_reader.read()))
+        if len(pending["sensehat"]) < batch:
+            continue
+        for table in TABLES:
+            samples, pending[table] = pending[table], []
+            start = time.perf_counter()
+            try:
+                db.write_samples(table, samples)
+                rows += len(samples)
+            except Exception:
+                errors += len(samples)
+            latencies.append(time.perf_counter() - start)
+    db.close()
+    results.append((rows, errors, latencies))
+
+
+def run_worker(device_ids: list, method: str, batch: int, interval: float, start_at: float, stop_at: float,
+               queue):
+    """Worker process: run its devices as threads and report their totals"""
+    import logging
+    logging.getLogger("sense_logger").setLevel(logging.WARNING)
+    
+    Config.DB_WRITE_METHOD = "insert" if method == "per_row" else method
+    # The devices share the process's pool like the logger's threads share theirs:
+    # at most one connection per device, kept open once needed
+    Config.DB_POOL_MAX_IDLE = Config.DB_POOL_MAX_SIZE = len(device_ids)
+    Config.DB_POOL_TIMEOUT = 60.0
+    
+    results = []
+    threads = [
+        threading.Thread(target=run_device,
+                         args=(device_id, method, batch, interval, start_at, stop_at, results))
+        for device_id in device_ids
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    from database.db import get_pool
+    get_pool().closeall()
+    queue.put((
+        sum(rows for rows, _, _ in results),
+        sum(errors for _, errors, _ in results),
+        [latency for _, _, latencies in results for latency in latencies],
+    ))
+
+
+class ServerMonitor:
+    """Samples the connection count and the CPU time of local postgres processes"""
+    
+    def __init__(self, db: Database):
+        self.db = db
+        self.max_connections = 0
+        self._cpu_start = {}  # pid -> cpu seconds when first seen
+        self._cpu_last = {}  # pid -> cpu seconds when last seen
+        self._local = False
+        self._started = False
+    
+    def sample(self):
+        conn = self.db.get_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT count(*) FROM pg_stat_activity WHERE datname = current_database()")
+            # Minus the monitor's own connection
+            self.max_connections = max(self.max_connections, cur.fetchone()[0] - 1)
+            conn.commit()
+        finally:
+            cur.close()
+        
+        for proc in psutil.process_iter(["name", "cpu_times"]):
+            name = proc.info["name"] or ""
+            cpu_times = proc.info["cpu_times"]
+            if not name.startswith("postgres") or cpu_times is None:
+                continue
+            self._local = True
+            cpu = cpu_times.user + cpu_times.system
+            # Backends started during the run count from zero
+            self._cpu_start.setdefault(proc.pid, 0.0 if self._started else cpu)
+            self._cpu_last[proc.pid] = cpu
+        self._started = True
+    
+    def reset(self):
+        self.max_connections = 0
+        self._cpu_start.clear()
+        self._cpu_last.clear()
+        self._local = False
+        self._started = False
+    
+    def cpu_seconds(self):
+        """CPU seconds used by postgres processes since the first sample, None if none run locally"""
+        if not self._local:
+            return None
+        return sum(cpu - self._cpu_start[pid] for pid, cpu in self._cpu_last.items())
+
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def run(devices: int, method: str, args, monitor: ServerMonitor) -> str:
+    """One load run; returns its result line"""
+    workers = min(args.processes, devices)
+    device_ids = [f"{args.device_prefix}{i}" for i in range(devices)]
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    
+    monitor.reset()
+    monitor.sample()
+    monitor_started = time.time()
+    start_at = monitor_started + 2.0  # let the workers start up
+    stop_at = start_at + args.duration
+    processes = [
+        context.Process(target=run_worker, args=(device_ids[i::workers], method, args.batch,
+                                                 args.interval, start_at, stop_at, queue))
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    while time.time() < stop_at:
+        time.sleep(1.0)
+        monitor.sample()
+    
+    results = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+    monitor.sample()
+    
+    rows = sum(rows for rows, _, _ in results)
+    errors = sum(errors for _, errors, _ in results)
+    latencies = [latency for _, _, worker_latencies in results for latency in worker_latencies]
+    cpu = monitor.cpu_seconds()
+    elapsed = time.time() - monitor_started
+    cpu_text = f"{cpu / elapsed * 100:>9.0f}%" if cpu is not None else f"{'n/a':>10}"
+    return (
+        f"{devices:>7} {method:<12} {rows / args.duration:>12,.0f} "
+        f"{percentile(latencies, 0.5) * 1000:>9.2f} {percentile(latencies, 0.99) * 1000:>9.2f} "
+        f"{errors:>8} {monitor.max_connections:>6} {cpu_text}"
+    )
+
+
+def cleanup(db: Database, prefix: str):
+    """Remove the benchmark rows"""
+    conn = db.get_connection()
+    cur = conn.cursor()
+    try:
+        for table in TABLES:
+            cur.execute(f"DELETE FROM {table} WHERE device_id LIKE %s", (prefix + "%",))
+        conn.commit()
+    finally:
+        cur.close()
+        db.release_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--methods", nargs="+", choices=METHODS, default=list(METHODS))
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="seconds between the samples of a device (0 = as fast as possible)")
+    parser.add_argument("--batch", type=int, default=60, help="samples per write for the batched methods")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per run")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="load generator processes")
+    parser.add_argument("--device-prefix", default="load-", help="device ids are this prefix plus a number")
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark rows")
+    args = parser.parse_args()
+    
+    db = Database(batch_size=1)
+    if not db.init_database():
+        raise SystemExit("Could not initialise the database")
+    monitor = ServerMonitor(db)
+    
+    print(f"{args.duration:g}s per run, a sample per device every {args.interval:g}s, "
+          f"batches of {args.batch}, {args.processes} load process(es)")
+    print(f"{'devices':>7} {'method':<12} {'rows/s':>12} {'p50 ms':>9} {'p99 ms':>9} "
+          f"{'errors':>8} {'conns':>6} {'server CPU':>10}")
+    try:
+        for devices in args.devices:
+            for method in args.methods:
+                print(run(devices, method, args, monitor), flush=True)
+                if not args.keep:
+                    cleanup(db, args.device_prefix)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
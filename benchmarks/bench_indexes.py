@@ -0,0 +1,145 @@
+"""
+Index profile benchmark: insert cost, index size and query latency per profile
+
+For every index profile a scratch copy of the table is created, indexed with
+that profile and filled with fake rows spread over several devices and days.
+Then the typical Grafana queries are timed against it. The scratch tables are
+dropped afterwards.
+
+Usage:
+    python benchmarks/bench_indexes.py [--rows 500000] [--devices 4] [--days 30]
+"""
+import argparse
+import statistics
+import time
+from datetime import timedelta
+
+import common  # noqa: F401  (sets up sys.path)
+from database import Database
+from database.db import TABLE_COLUMNS, utcnow
+from database.indexes import INDEX_PROFILES, create_index_sql, profile_indexes
+
+QUERIES = {
+    "last hour, all devices": (
+        "SELECT timestamp, {field} FROM {table} "
+        "WHERE timestamp >= %(end)s - INTERVAL '1 hour' ORDER BY timestamp"
+    ),
+    "last hour, one device": (
+        "SELECT timestamp, {field} FROM {table} "
+        "WHERE device_id = %(device)s AND timestamp >= %(end)s - INTERVAL '1 hour' ORDER BY timestamp"
+    ),
+    "last day, one device": (
+        "SELECT timestamp, {field} FROM {table} "
+        "WHERE device_id = %(device)s AND timestamp >= %(end)s - INTERVAL '1 day' ORDER BY timestamp"
+    ),
+    "30 days, hourly avg": (
+        "SELECT date_trunc('hour', timestamp), AVG({field}) FROM {table} "
+        "WHERE timestamp >= %(end)s - INTERVAL '30 days' GROUP BY 1 ORDER BY 1"
+    ),
+}
+
+
+def execute(db: Database, sql: str, params=None):
+    conn = db.get_connection()
+    cur = conn.cursor()
+    cur.execute(sql, params)
+    conn.commit()
+    cur.close()
+
+
+def build_rows(db: Database, table: str, count: int, devices: int, days: float) -> list:
+    """Fake rows in time order, round-robin over the devices, ending now"""
+    step = days * 86400 / count
+    start = time.time() - count * step
+    rows = common.make_rows(db, table, count, start=start, step=step)
+    return [(row[0], f"bench-{i % devices}") + row[2:] for i, row in enumerate(rows)]
+
+
+def insert(db: Database, scratch: str, columns: tuple, rows: list, batch: int) -> float:
+    """Insert rows in multi-row INSERT batches, one commit each; returns seconds"""
+    conn = db.get_connection()
+    cur = conn.cursor()
+    placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    start = time.perf_counter()
+    for i in range(0, len(rows), batch):
+        chunk = rows[i:i + batch]
+        cur.execute(
+            "INSERT INTO {} ({}) VALUES {}".format(scratch, ", ".join(columns), ", ".join([placeholders] * len(chunk))),
+            [value for row in chunk for value in row],
+        )
+        conn.commit()
+    elapsed = time.perf_counter() - start
+    cur.close()
+    return elapsed
+
+
+def index_sizes(db: Database, scratch: str) -> str:
+    conn = db.get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT indexrelid::regclass::text, pg_relation_size(indexrelid) FROM pg_index "
+        "WHERE indrelid = %s::regclass ORDER BY 1",
+        (scratch,),
+    )
+    sizes = ", ".join(f"{name} {size / 1024 / 1024:.1f} MB" for name, size in cur.fetchall())
+    conn.commit()
+    cur.close()
+    return sizes
+
+
+def time_query(db: Database, sql: str, params: dict, repeat: int) -> float:
+    """Median milliseconds of repeat runs"""
+    conn = db.get_connection()
+    cur = conn.cursor()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cur.execute(sql, params)
+        cur.fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    conn.commit()
+    cur.close()
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--table", choices=("sensehat", "raspberry_pi"), default="sensehat")
+    parser.add_argument("--profiles", nargs="+", choices=sorted(INDEX_PROFILES), default=list(INDEX_PROFILES))
+    parser.add_argument("--devices", type=int, default=4)
+    parser.add_argument("--days", type=float, default=30)
+    parser.add_argument("--batch", type=int, default=100, help="rows per INSERT (default: 100)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per query (default: 5)")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch tables")
+    args = parser.parse_args()
+    
+    db = Database(batch_size=1)
+    db.init_database()
+    columns = TABLE_COLUMNS[args.table]
+    field = columns[2]
+    rows = build_rows(db, args.table, args.rows, args.devices, args.days)
+    params = {"end": utcnow() + timedelta(minutes=1), "device": "bench-0"}
+    
+    for profile in args.profiles:
+        scratch = f"bench_{profile}_{args.table}"
+        execute(db, f"DROP TABLE IF EXISTS {scratch}")
+        execute(db, f"CREATE TABLE {scratch} (LIKE {args.table} INCLUDING DEFAULTS)")
+        for name, method, index_columns in profile_indexes(scratch, profile):
+            execute(db, create_index_sql(name, scratch, method, index_columns))
+        
+        elapsed = insert(db, scratch, columns, rows, args.batch)
+        execute(db, f"ANALYZE {scratch}")
+        print(f"\n[{profile}] insert {args.rows} rows: {elapsed:.2f}s {common.rate(args.rows, elapsed)}")
+        print(f"[{profile}] indexes: {index_sizes(db, scratch)}")
+        for label, sql in QUERIES.items():
+            ms = time_query(db, sql.format(field=field, table=scratch), params, args.repeat)
+            print(f"[{profile}] {label:<24} {ms:>9.2f} ms")
+        
+        if not args.keep:
+            execute(db, f"DROP TABLE {scratch}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
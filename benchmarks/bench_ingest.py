@@ -0,0 +1,66 @@
+"""
+Ingest benchmark: rows/sec of the INSERT and COPY write paths
+
+Writes fake rows into the configured PostgreSQL database (POSTGRES_* variables)
+under a dedicated device id and deletes them again afterwards.
+
+Usage:
+    python benchmarks/bench_ingest.py [--rows 1000 10000 100000] [--table sensehat]
+"""
+import argparse
+import time
+
+import common  # noqa: F401  (sets up sys.path)
+from config import Config
+from database import Database
+
+METHODS = ("insert_per_row", "insert", "copy", "copy_binary")
+
+
+def run_method(db: Database, table: str, rows: list, method: str) -> float:
+    """Write rows with one method and return the elapsed seconds"""
+    start = time.perf_counter()
+    if method == "insert_per_row":
+        # The original path: one INSERT and one COMMIT per sample
+        for row in rows:
+            db.insert_rows(table, [row])
+    else:
+        db.write_rows(table, rows, method=method)
+    return time.perf_counter() - start
+
+
+def cleanup(db: Database, table: str, device_id: str):
+    """Remove the benchmark rows"""
+    conn = db.get_connection()
+    cur = conn.cursor()
+    cur.execute(f"DELETE FROM {table} WHERE device_id = %s", (device_id,))
+    conn.commit()
+    cur.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--table", choices=("sensehat", "raspberry_pi"), default="sensehat")
+    parser.add_argument("--methods", nargs="+", choices=METHODS, default=list(METHODS))
+    parser.add_argument("--device-id", default="benchmark-ingest")
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark rows")
+    args = parser.parse_args()
+    
+    Config.DEVICE_ID = args.device_id
+    db = Database(batch_size=1)
+    db.init_database()
+    
+    print(f"{'rows':>8}  {'method':<15} {'seconds':>9}  throughput")
+    for count in args.rows:
+        rows = common.make_rows(db, args.table, count)
+        for method in args.methods:
+            elapsed = run_method(db, args.table, rows, method)
+            print(f"{count:>8}  {method:<15} {elapsed:>9.3f}  {common.rate(count, elapsed)}")
+            if not args.keep:
+                cleanup(db, args.table, args.device_id)
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Micro-benchmarks of the read -> model -> write hot path with a regression gate
+
+Times every stage of a sample's way from the sensors to the database, one
+operation at a time:
+    fake_*_read         FakeSenseHatReader / FakeSystemReader.read()
+    sensehat_read       SenseHatReader.read() against a mocked SenseHat
+    system_read         SystemReader.read() (psutil on this machine)
+    *_model             SenseHatData / RaspberryPiData construction
+    *_row               building the INSERT parameters of a sample
+    write_*             Database.write_* against a mock cursor (per sample)
+    write_*_postgres    the same against PostgreSQL (with --postgres, POSTGRES_* variables)
+
+Each stage is timed with timeit over --repeat runs, reporting the median and
+the spread (interquartile range relative to the median) of the runs. --save
+stores both as the baseline; later runs compare against it and exit with
+status 1 if any stage got slower than the baseline by more than --threshold
+percent plus the spread of both measurements, so a noisy stage needs a larger
+slowdown to count. Baselines are only comparable on the same machine.
+
+Usage:
+    python benchmarks/bench_micro.py --save               # record the baseline
+    python benchmarks/bench_micro.py --threshold 10       # compare, fail on regressions
+    python benchmarks/bench_micro.py --postgres --stages write_sensehat write_sensehat_postgres
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+from datetime import datetime
+from typing import Callable, Dict, Tuple
+from unittest.mock import MagicMock, patch
+
+import common  # noqa: F401  (sets up sys.path)
+from database import ConnectionPool, Database
+from database import db as db_module
+from models import RaspberryPiData, SenseHatData
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_micro_baseline.json")
+BATCH = 100  # samples per write_*_batch call
+DEVICE_ID = "benchmark-micro"
+
+SENSEHAT_VALUES = dict(
+    temperature=25.5, humidity=60.0, pressure=1013.25, pitch=1.0, roll=2.0, yaw=3.0,
+    accel_x=0.01, accel_y=0.02, accel_z=1.0, gyro_x=0.1, gyro_y=0.2, gyro_z=0.3,
+    compass_x=10.0, compass_y=20.0, compass_z=30.0,
+)
+RASPBERRY_PI_VALUES = dict(
+    cpu_temp=45.0, cpu_percent=25.0, cpu_count=4, cpu_freq_mhz=1500.0,
+    mem_total_gb=4.0, mem_used_gb=2.0, mem_available_gb=2.0, mem_percent=50.0,
+    disk_total_gb=32.0, disk_used_gb=16.0, disk_free_gb=16.0, disk_percent=50.0,
+    load_avg_1min=0.5, load_avg_5min=0.6, load_avg_15min=0.7,
+)
+
+
+class MockCursor:
+    """Cursor that accepts every statement, so only the client side is timed"""
+    
+    rowcount = 0
+    
+    def execute(self, sql, params=None):
+        pass
+    
+    def copy_expert(self, sql, buf):
+        pass
+    
+    def fetchone(self):
+        return (1,)
+    
+    def close(self):
+        pass
+
+
+class MockConnection:
+    closed = 0
+    
+    def cursor(self):
+        return MockCursor()
+    
+    def commit(self):
+        pass
+    
+    def rollback(self):
+        pass
+    
+    def get_transaction_status(self):
+        return 0  # idle
+    
+    def close(self):
+        self.closed = 1
+
+
+def mock_database() -> Database:
+    """A Database whose pool hands out MockConnections"""
+    db_module._pool = ConnectionPool(MockConnection, max_idle=1, max_size=1)
+    db_module._schema.ready = True
+    return Database(batch_size=1, device_id=DEVICE_ID)
+
+
+def postgres_database() -> Database:
+    """A Database writing to the configured server"""
+    db_module._pool = None
+    db = Database(batch_size=1, device_id=DEVICE_ID)
+    if not db.init_database():
+        raise SystemExit("Could not initialise the database")
+    return db
+
+
+def stages(postgres: bool) -> Dict[str, Callable[[], Callable[[], object]]]:
+    """Stage name -> setup function returning the operation to time"""
+    sensehat = SenseHatData(**SENSEHAT_VALUES)
+    raspberry_pi = RaspberryPiData(**RASPBERRY_PI_VALUES)
+    timestamp = datetime(2024, 1, 1)
+    sensehat_batch = [(timestamp, sensehat)] * BATCH
+    
+    def fake_sensehat_read():
+        from sensors.fake import FakeSenseHatReader
+        return FakeSenseHatReader().read
+    
+    def fake_system_read():
+        from sensors.fake import FakeSystemReader
+        return FakeSystemReader().read
+    
+    def sensehat_read():
+        sense = MagicMock()
+        sense.get_temperature.return_value = 25.5
+        sense.get_humidity.return_value = 60.0
+        sense.get_pressure.return_value = 1013.25
+        sense.get_orientation.return_value = {"pitch": 0.0, "roll": 0.0, "yaw": 0.0}
+        sense.get_accelerometer_raw.return_value = {"x": 0.0, "y": 0.0, "z": 1.0}
+        sense.get_gyroscope_raw.return_value = {"x": 0.0, "y": 0.0, "z": 0.0}
+        sense.get_compass_raw.return_value = {"x": 0.0, "y": 0.0, "z": 0.0}
+        with patch("sensors.sensehat.SenseHat", return_value=sense):
+            from sensors import SenseHatReader
+            return SenseHatReader().read
+    
+    def system_read():
+        from sensors import SystemReader
+        return SystemReader().read
+    
+    def write(db: Database, table: str):
+        if table == "sensehat":
+            return lambda: db.write_sensehat_data(sensehat, timestamp)
+        return lambda: db.write_raspberry_pi_data(raspberry_pi, timestamp)
+    
+    def write_batch(db: Database):
+        return lambda: db.write_samples("sensehat", sensehat_batch)
+    
+    def build_row(table: str):
+        db = mock_database()
+        if table == "sensehat":
+            return lambda: db._sensehat_row(sensehat, timestamp)
+        return lambda: db._raspberry_pi_row(raspberry_pi, timestamp)
+    
+    result = {
+        "fake_sensehat_read": fake_sensehat_read,
+        "fake_system_read": fake_system_read,
+        "sensehat_read": sensehat_read,
+        "system_read": system_read,
+        "sensehat_model": lambda: lambda: SenseHatData(**SENSEHAT_VALUES),
+        "raspberry_pi_model": lambda: lambda: RaspberryPiData(**RASPBERRY_PI_VALUES),
+        "sensehat_row": lambda: build_row("sensehat"),
+        "raspberry_pi_row": lambda: build_row("raspberry_pi"),
+        "write_sensehat": lambda: write(mock_database(), "sensehat"),
+        "write_raspberry_pi": lambda: write(mock_database(), "raspberry_pi"),
+        "write_sensehat_batch": lambda: write_batch(mock_database()),
+    }
+    if postgres:
+        result.update({
+            "write_sensehat_postgres": lambda: write(postgres_database(), "sensehat"),
+            "write_sensehat_batch_postgres": lambda: write_batch(postgres_database()),
+        })
+    return result
+
+
+def time_stage(operation: Callable[[], object], repeat: int, per_call: int = 1) -> Tuple[float, float]:
+    """Median seconds per sample over repeat runs, and the relative spread of the runs"""
+    timer = timeit.Timer(operation)
+    number, _ = timer.autorange()
+    runs = [seconds / number / per_call for seconds in timer.repeat(repeat, number)]
+    median = statistics.median(runs)
+    if len(runs) < 4:
+        return median, 0.0
+    quartiles = statistics.quantiles(runs, n=4)
+    return median, (quartiles[2] - quartiles[0]) / median
+
+
+def cleanup():
+    """Remove the rows written to PostgreSQL"""
+    db = Database(batch_size=1)
+    conn = db.get_connection()
+    cur = conn.cursor()
+    try:
+        for table in ("sensehat", "raspberry_pi"):
+            cur.execute(f"DELETE FROM {table} WHERE device_id = %s", (DEVICE_ID,))
+        conn.commit()
+    finally:
+        cur.close()
+        db.close()
+
+
+def main() -> int:
+    available = stages(postgres=True)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stages", nargs="+", choices=list(available), help="stages to run (default: all)")
+    parser.add_argument("--postgres", action="store_true", help="include the PostgreSQL write stages")
+    parser.add_argument("--repeat", type=int, default=15, help="timing runs per stage (default: 15)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline file (default: %(default)s)")
+    parser.add_argument("--save", action="store_true", help="save the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=25.0,
+                        help="allowed slowdown against the baseline in percent, on top of the "
+                             "measured spread (default: 25)")
+    args = parser.parse_args()
+    
+    import logging
+    logging.getLogger("sense_logger").setLevel(logging.WARNING)
+    
+    selected = stages(args.postgres)
+    names = args.stages or list(selected)
+    baseline = {}
+    baseline_spread = {}
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            saved = json.load(f)
+        baseline = saved["stages"]
+        baseline_spread = saved.get("spread", {})
+    
+    results = {}
+    spreads = {}
+    regressions = []
+    print(f"{'stage':<30} {'us/op':>10} {'spread':>7} {'baseline':>10} {'change':>8} {'allowed':>8}")
+    try:
+        for name in names:
+            if name not in selected:
+                print(f"{name:<30} {'skipped (needs --postgres)':>30}")
+                continue
+            per_call = BATCH if name.startswith("write_sensehat_batch") else 1
+            seconds, spread = time_stage(selected[name](), args.repeat, per_call)
+            results[name], spreads[name] = seconds, spread
+            line = f"{name:<30} {seconds * 1e6:>10.3f} {spread * 100:>6.1f}%"
+            if name in baseline:
+                change = (seconds / baseline[name] - 1) * 100
+                allowed = args.threshold + (spread + baseline_spread.get(name, 0.0)) * 100
+                line += f" {baseline[name] * 1e6:>10.3f} {change:>+7.1f}% {allowed:>7.1f}%"
+                if change > allowed:
+                    regressions.append(name)
+                    line += "  REGRESSION"
+            print(line, flush=True)
+    finally:
+        if args.postgres and any(name.endswith("_postgres") for name in results):
+            cleanup()
+    
+    if args.save:
+        # Stages that were not run keep their previous baseline
+        saved = {"stages": {}, "spread": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                saved.update(json.load(f))
+        saved["stages"].update(results)
+        saved.setdefault("spread", {}).update(spreads)
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.platform(),
+                "saved": datetime.now().isoformat(timespec="seconds"),
+                "stages": saved["stages"],
+                "spread": saved["spread"],
+            }, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    if regressions:
+        print(f"{len(regressions)} stage(s) slower than the baseline by more than {args.threshold:g}% "
+              f"plus their spread: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Swinging-door benchmark: points kept and reconstruction error per field
+
+Compresses every field of the sensehat and raspberry_pi streams with the
+swinging-door filter, interpolates the corner points back to the original
+timestamps and reports the points kept, the compression ratio and the
+largest reconstruction error per field. By default the streams come from the
+fake readers (one sample per --step seconds of simulated time); with --range
+the samples logged in the configured PostgreSQL database are replayed instead.
+
+Usage:
+    python benchmarks/bench_swinging_door.py [--samples 86400] [--deviation "temperature=0.2,pressure=0.05%"]
+    python benchmarks/bench_swinging_door.py --range 7 --tables sensehat
+"""
+import argparse
+import time
+from datetime import timedelta
+
+import common  # noqa: F401  (sets up sys.path)
+from filters import Deadband, SwingingDoorFilter, parse_deadbands, reconstruct
+from utils.ringbuffer import to_epoch
+
+TABLES = ("sensehat", "raspberry_pi")
+
+
+def fake_samples(table: str, count: int, step: float):
+    """(epoch seconds, field values) of count fake samples, step seconds apart"""
+    from dataclasses import asdict
+    from sensors.fake import FakeSenseHatReader, FakeSystemReader
+    
+    reader = FakeSenseHatReader() if table == "sensehat" else FakeSystemReader()
+    start = time.time()
+    for i in range(count):
+        if table == "sensehat":
+            # The fake environment follows the time since the reader started, so let it age
+            reader.start_time = start - i * step
+        yield start + i * step, asdict(reader.read())
+
+
+def logged_samples(table: str, days: float, device_id: str = None):
+    """(epoch seconds, field values) of the samples of one device logged in the last days"""
+    from database import Database
+    from database.db import TABLE_COLUMNS, utcnow
+    
+    columns = TABLE_COLUMNS[table]
+    db = Database(batch_size=1)
+    try:
+        conn = db.get_connection()
+        cur = conn.cursor(name=f"swinging_door_{table}")
+        cur.itersize = 10000
+        cur.execute(
+            "SELECT {} FROM {} WHERE timestamp >= %s AND COALESCE(device_id, '') = %s ORDER BY timestamp".format(
+                ", ".join(columns), table
+            ),
+            (utcnow() - timedelta(days=days), device_id or ""),
+        )
+        for row in cur:
+            yield to_epoch(row[0]), dict(zip(columns[2:], row[2:]))
+        cur.close()
+        conn.commit()
+    finally:
+        db.close()
+
+
+def run_table(table: str, samples, sdt: SwingingDoorFilter):
+    """Compress one table's samples and print the result per field"""
+    times = []
+    series = {}
+    points = {}
+    elapsed = 0.0
+    for t, values in samples:
+        times.append(t)
+        for name, value in values.items():
+            series.setdefault(name, []).append(value)
+        start = time.perf_counter()
+        emitted = sdt.add_values(table, t, values)
+        elapsed += time.perf_counter() - start
+        for name, corners in emitted.items():
+            points.setdefault(name, []).extend(corners)
+    for name, corners in sdt.flush(table).items():
+        points.setdefault(name, []).extend(corners)
+    
+    if not times:
+        print(f"{table}: no samples")
+        return
+    print(f"\n{table}: {len(times)} samples, {elapsed / len(times) * 1e6:.1f} us per sample")
+    print(f"  {'field':<18} {'deviation':>10} {'kept':>8} {'ratio':>8} {'max error':>12}")
+    for name, values in series.items():
+        door = sdt.doors[(table, name)]
+        restored = reconstruct(points.get(name, []), times)
+        errors = [abs(a - b) for a, b in zip(values, restored) if a is not None and b is not None]
+        deviation = f"{door.deviation.value:.2%}" if door.deviation.relative else f"{door.deviation.value:g}"
+        ratio = f"{door.seen / door.kept:.1f}:1" if door.kept else "n/a"
+        print(f"  {name:<18} {deviation:>10} {door.kept:>8} {ratio:>8} {max(errors, default=0.0):>12.6g}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables", nargs="+", choices=TABLES, default=list(TABLES))
+    parser.add_argument("--samples", type=int, default=86400, help="fake samples per table")
+    parser.add_argument("--step", type=float, default=1.0, help="seconds between fake samples")
+    parser.add_argument("--range", type=float, help="replay the samples logged in the last RANGE days instead")
+    parser.add_argument("--device", help="device id of the logged samples (default: DEVICE_ID)")
+    parser.add_argument("--deviation", default="", help="per-field deviations, e.g. temperature=0.2,pressure=0.05%%")
+    parser.add_argument("--default", default="0.1", help="deviation of the other fields (default: 0.1)")
+    parser.add_argument("--max-interval", type=float, default=0.0,
+                        help="archive a point at least every this many seconds (default: never)")
+    args = parser.parse_args()
+    
+    sdt = SwingingDoorFilter(parse_deadbands(args.deviation), Deadband.parse(args.default), args.max_interval)
+    for table in args.tables:
+        if args.range is not None:
+            from config import Config
+            samples = logged_samples(table, args.range, args.device or Config.DEVICE_ID)
+        else:
+            samples = fake_samples(table, args.samples, args.step)
+        run_table(table, samples, sdt)
+
+
+if __name__ == "__main__":
+    main()
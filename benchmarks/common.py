@@ -0,0 +1,36 @@
+"""
+Shared helpers for the benchmark scripts
+"""
+import os
+import sys
+import time
+
+# Make the logger sources importable the same way main.py sees them
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+
+def make_rows(db, table: str, count: int, start: float = None, step: float = 1.0) -> list:
+    """Build count rows for a table from the fake readers, one step second apart"""
+    from datetime import datetime, timezone
+    from sensors.fake import FakeSenseHatReader, FakeSystemReader
+    
+    start = time.time() - count * step if start is None else start
+    rows = []
+    if table == "sensehat":
+        reader = FakeSenseHatReader()
+        build = db._sensehat_row
+    else:
+        reader = FakeSystemReader()
+        build = db._raspberry_pi_row
+    for i in range(count):
+        timestamp = datetime.fromtimestamp(start + i * step, timezone.utc).replace(tzinfo=None)
+        rows.append(build(reader.read(), timestamp))
+    return rows
+
+
+def rate(count: int, seconds: float) -> str:
+    """Format a rows/sec figure"""
+    return f"{count / seconds:>12,.0f} rows/s" if seconds > 0 else "         n/a"
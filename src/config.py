@@ -13,9 +13,107 @@ class Config:
     POSTGRES_DB = os.environ.get("POSTGRES_DB", "sensehat")
     POSTGRES_USER = os.environ.get("POSTGRES_USER", "postgres")
     POSTGRES_PASSWORD = os.environ.get("POSTGRES_PASSWORD", "postgres")
+    # Seconds to wait for a connection before giving up (and spooling)
+    POSTGRES_CONNECT_TIMEOUT = int(os.environ.get("POSTGRES_CONNECT_TIMEOUT", "10"))
+    # Connection pool shared by the writer and background threads
+    DB_POOL_MAX_IDLE = int(os.environ.get("DB_POOL_MAX_IDLE", "2"))  # idle connections kept open
+    DB_POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE", "4"))
+    # Seconds to wait for a free pooled connection
+    DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+    # Connections idle longer than this many seconds are checked before reuse
+    DB_POOL_CHECK_INTERVAL = float(os.environ.get("DB_POOL_CHECK_INTERVAL", "30"))
+    # Abort statements running longer than this many seconds (0 = no limit)
+    DB_STATEMENT_TIMEOUT = float(os.environ.get("DB_STATEMENT_TIMEOUT", "30"))
+    # TCP keepalives: first probe after idle seconds, then every interval, give up after count
+    DB_KEEPALIVE_IDLE = int(os.environ.get("DB_KEEPALIVE_IDLE", "30"))
+    DB_KEEPALIVE_INTERVAL = int(os.environ.get("DB_KEEPALIVE_INTERVAL", "10"))
+    DB_KEEPALIVE_COUNT = int(os.environ.get("DB_KEEPALIVE_COUNT", "3"))
+    # Jittered exponential backoff between failed connection attempts (seconds)
+    DB_RECONNECT_BACKOFF_MIN = float(os.environ.get("DB_RECONNECT_BACKOFF_MIN", "1"))
+    DB_RECONNECT_BACKOFF_MAX = float(os.environ.get("DB_RECONNECT_BACKOFF_MAX", "60"))
     
     # Logger configuration
     SAMPLE_INTERVAL = float(os.environ.get("SAMPLE_INTERVAL", "5"))
+    # Align ticks to wall-clock multiples of SAMPLE_INTERVAL (e.g. :00, :05, :10)
+    SAMPLE_ALIGN = os.environ.get("SAMPLE_ALIGN", "false").lower() in ("true", "1", "yes")
+    # What to do with ticks missed under overload: skip or coalesce
+    SAMPLE_MISSED_TICKS = os.environ.get("SAMPLE_MISSED_TICKS", "skip").lower()
+    
+    # Per-source sampling intervals in seconds (default to SAMPLE_INTERVAL)
+    # Sense HAT rows (motion sensors are read for every row)
+    SENSEHAT_INTERVAL = float(os.environ.get("SENSEHAT_INTERVAL", SAMPLE_INTERVAL))
+    # Temperature, humidity and pressure (reused in the rows in between)
+    SENSEHAT_ENV_INTERVAL = float(os.environ.get("SENSEHAT_ENV_INTERVAL", SENSEHAT_INTERVAL))
+    # System metrics rows
+    SYSTEM_INTERVAL = float(os.environ.get("SYSTEM_INTERVAL", SAMPLE_INTERVAL))
+    # Disk usage (reused in the rows in between)
+    DISK_INTERVAL = float(os.environ.get("DISK_INTERVAL", SYSTEM_INTERVAL))
+    # Poll the motion sensors at this rate (Hz) in the background and store
+    # mean/min/max/RMS per Sense HAT row in sensehat_motion (0 = disabled)
+    IMU_RATE_HZ = float(os.environ.get("IMU_RATE_HZ", "0"))
+    # Seconds of recent samples kept in memory for live queries (0 = disabled)
+    HISTORY_SECONDS = float(os.environ.get("HISTORY_SECONDS", "86400"))
+    # Upper bound of samples kept per table, which caps the memory used
+    HISTORY_MAX_SAMPLES = int(os.environ.get("HISTORY_MAX_SAMPLES", "100000"))
+    
+    # Write batching (rows per multi-row INSERT, 1 = write every sample immediately)
+    DB_BATCH_SIZE = int(os.environ.get("DB_BATCH_SIZE", "1"))
+    # Maximum age in seconds of a buffered row before the batch is flushed
+    DB_BATCH_MAX_AGE = float(os.environ.get("DB_BATCH_MAX_AGE", "60"))
+    # Rows kept buffered per table when a batch cannot be written and no spool takes them
+    # (retried with the next flush, oldest dropped beyond this)
+    DB_BUFFER_MAX_ROWS = int(os.environ.get("DB_BUFFER_MAX_ROWS", "10000"))
+    # Bulk write method for batches: insert, copy (COPY text) or copy_binary
+    DB_WRITE_METHOD = os.environ.get("DB_WRITE_METHOD", "insert").lower()
+    
+    # Range-partition new tables by timestamp: none, daily or weekly
+    DB_PARTITIONING = os.environ.get("DB_PARTITIONING", "none").lower()
+    # Number of future partitions kept ready ahead of the current one
+    DB_PARTITIONS_AHEAD = int(os.environ.get("DB_PARTITIONS_AHEAD", "3"))
+    # Drop partitions older than this many days (0 = keep everything)
+    DB_RETENTION_DAYS = int(os.environ.get("DB_RETENTION_DAYS", "0"))
+    # Seconds between partition maintenance runs
+    DB_PARTITION_MAINTENANCE_INTERVAL = float(os.environ.get("DB_PARTITION_MAINTENANCE_INTERVAL", "3600"))
+    # Indexes on the sample tables: btree (timestamp and device_id) or
+    # brin (BRIN on timestamp plus a (device_id, timestamp) btree)
+    DB_INDEX_PROFILE = os.environ.get("DB_INDEX_PROFILE", "btree").lower()
+    
+    # Seconds between incremental updates of the 1-minute/1-hour rollup tables (0 = disabled, the default)
+    ROLLUP_INTERVAL = float(os.environ.get("ROLLUP_INTERVAL", "0"))
+    
+    # Deadband filter: write a sample only when a field moved beyond its threshold
+    # since the last written sample, or after DEADBAND_HEARTBEAT seconds
+    DEADBAND_ENABLED = os.environ.get("DEADBAND_ENABLED", "false").lower() in ("true", "1", "yes")
+    # Per-field thresholds, absolute or relative: temperature=0.1,sensehat.pressure=0.05%,...
+    DEADBAND = os.environ.get("DEADBAND", "")
+    # Threshold of fields not listed in DEADBAND (0 = any change)
+    DEADBAND_DEFAULT = os.environ.get("DEADBAND_DEFAULT", "0")
+    DEADBAND_HEARTBEAT = float(os.environ.get("DEADBAND_HEARTBEAT", "300"))
+    
+    # Queue between the sensor loop and the database writer thread
+    QUEUE_SIZE = int(os.environ.get("QUEUE_SIZE", "1000"))
+    # What to do when the queue is full: block, drop_oldest or aggregate
+    QUEUE_POLICY = os.environ.get("QUEUE_POLICY", "drop_oldest").lower()
+    # Threads for blocking sensor reads in the asyncio engine (main_async.py)
+    ASYNC_SENSOR_WORKERS = int(os.environ.get("ASYNC_SENSOR_WORKERS", "2"))
+    
+    # Local spool for samples that cannot be written while PostgreSQL is down
+    # (empty SPOOL_PATH disables spooling)
+    SPOOL_PATH = os.environ.get("SPOOL_PATH", "")
+    SPOOL_MAX_RECORDS = int(os.environ.get("SPOOL_MAX_RECORDS", "200000"))
+    SPOOL_FSYNC_RECORDS = int(os.environ.get("SPOOL_FSYNC_RECORDS", "50"))
+    SPOOL_FSYNC_INTERVAL = float(os.environ.get("SPOOL_FSYNC_INTERVAL", "10"))
+    # Maximum rows/sec written back to PostgreSQL when draining the spool
+    SPOOL_REPLAY_RATE = float(os.environ.get("SPOOL_REPLAY_RATE", "500"))
+    
+    # Serve the latest readings and logger metrics for Prometheus on this port (0 = disabled)
+    METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))
+    # Address the metrics endpoint listens on (0.0.0.0 to allow scrapes from other hosts)
+    METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+    # Time every hot-path stage (sensor calls, cursor, execute, commit, sleep) into histograms
+    INSTRUMENTATION = os.environ.get("INSTRUMENTATION", "false").lower() in ("true", "1", "yes")
+    # Seconds between stage timing summaries in the log (0 = only at shutdown)
+    INSTRUMENTATION_LOG_INTERVAL = float(os.environ.get("INSTRUMENTATION_LOG_INTERVAL", "300"))
     
     # Device identifier (optional, for multi-Pi setups)
     DEVICE_ID = os.environ.get("DEVICE_ID", None)
@@ -27,4 +125,11 @@ class Config:
     LOG_DIR = os.environ.get("LOG_DIR", "/var/log/raspi-sense-monitor")
     LOG_FILE = os.environ.get("LOG_FILE", "sense-logger.log")
     LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+    # Rotate the log file at this size, keeping LOG_BACKUP_COUNT gzip-compressed backups
+    LOG_MAX_BYTES = int(os.environ.get("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+    LOG_BACKUP_COUNT = int(os.environ.get("LOG_BACKUP_COUNT", "5"))
+    # Log a repeated warning or error at most once per this many seconds (0 = log every one)
+    LOG_DEDUP_INTERVAL = float(os.environ.get("LOG_DEDUP_INTERVAL", "60"))
+    # Records waiting for the log writer thread; more are dropped instead of blocking
+    LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
 
@@ -1,7 +1,17 @@
 """
 Database module for Raspberry Pi Sense HAT Monitor
 """
+from .async_db import AsyncDatabase, AsyncWriter
 from .db import get_database, Database
+from .partitions import PartitionMaintainer
+from .pool import ConnectionPool
+from .rollup import Rollups, RollupWorker, resolution_table
+from .spool import Spool, SpoolReplayer
+from .writer import Sample, SampleQueue, WriterThread
 
-__all__ = ['get_database', 'Database']
+__all__ = [
+    'get_database', 'AsyncDatabase', 'AsyncWriter', 'ConnectionPool', 'Database',
+    'PartitionMaintainer', 'Rollups', 'RollupWorker', 'resolution_table', 'Spool', 'SpoolReplayer',
+    'Sample', 'SampleQueue', 'WriterThread',
+]
 
@@ -0,0 +1,291 @@
+"""
+Asynchronous write path for the asyncio engine
+
+Rows are written over psycopg2's asynchronous connections, which the event
+loop drives through socket readiness instead of blocking a thread, so a slow
+network round trip only delays the writer task and never a sensor read.
+Row building, schema creation and the spool are shared with Database, and
+rows are batched like Database does (DB_BATCH_SIZE, DB_BATCH_MAX_AGE).
+psycopg2 cannot COPY over an asynchronous connection, so with DB_WRITE_METHOD
+copy or copy_binary, and for spool appends, the blocking Database does the
+write in the executor.
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import psycopg2
+from psycopg2.extensions import POLL_OK, POLL_READ, POLL_WRITE, connection
+
+# Import config - handle both relative and absolute imports
+try:
+    from config import Config
+except ImportError:
+    from ..config import Config
+
+from .db import TABLE_COLUMNS, Database, connect_kwargs
+from .writer import Sample, SampleQueue
+
+logger = logging.getLogger("sense_logger")
+
+
+async def wait_ready(conn: connection):
+    """Wait until the pending operation of an asynchronous connection has finished"""
+    loop = asyncio.get_running_loop()
+    while True:
+        state = conn.poll()
+        if state == POLL_OK:
+            return
+        if state not in (POLL_READ, POLL_WRITE):
+            raise psycopg2.OperationalError(f"Unexpected connection poll state: {state}")
+        
+        ready = loop.create_future()
+        fd = conn.fileno()
+        watch, unwatch = (
+            (loop.add_reader, loop.remove_reader) if state == POLL_READ
+            else (loop.add_writer, loop.remove_writer)
+        )
+        watch(fd, lambda: ready.done() or ready.set_result(None))
+        try:
+            await ready
+        finally:
+            unwatch(fd)
+
+
+class AsyncDatabase:
+    """Writes sample rows over one asynchronous connection with reconnect backoff"""
+    
+    def __init__(self, db: Database, executor=None, batch_size: Optional[int] = None,
+                 batch_max_age: Optional[float] = None):
+        self.db = db  # builds rows, creates the schema, runs COPY and owns the spool
+        self.executor = executor  # runs the blocking schema setup, COPY and spool writes
+        self.batch_size = Config.DB_BATCH_SIZE if batch_size is None else batch_size
+        self.batch_max_age = Config.DB_BATCH_MAX_AGE if batch_max_age is None else batch_max_age
+        self.buffer_max_rows = Config.DB_BUFFER_MAX_ROWS
+        self._buffers: Dict[str, List[tuple]] = {table: [] for table in TABLE_COLUMNS}
+        self._buffer_started: Dict[str, float] = {table: 0.0 for table in TABLE_COLUMNS}
+        self._conn: Optional[connection] = None
+        self._schema_ready = False
+        self._failures = 0
+        self._retry_at = 0.0
+        self._spooling = False
+    
+    async def connect(self) -> connection:
+        """Get the connection, opening it unless the backoff after a failure is pending"""
+        if self._conn is not None and not self._conn.closed:
+            return self._conn
+        wait = self._retry_at - time.monotonic()
+        if wait > 0:
+            raise ConnectionError(f"Database unavailable, next connection attempt in {wait:.1f}s")
+        
+        conn = None
+        try:
+            conn = psycopg2.connect(**connect_kwargs(), async_=True)
+            await asyncio.wait_for(wait_ready(conn), Config.POSTGRES_CONNECT_TIMEOUT)
+        except Exception:
+            if conn is not None:
+                conn.close()
+            self._failures += 1
+            delay = min(Config.DB_RECONNECT_BACKOFF_MAX, Config.DB_RECONNECT_BACKOFF_MIN * 2 ** (self._failures - 1))
+            self._retry_at = time.monotonic() + random.uniform(delay / 2, delay)
+            raise
+        
+        if self._failures:
+            logger.info(f"Database connection restored after {self._failures} failed attempt(s)")
+        self._failures = 0
+        self._conn = conn
+        return conn
+    
+    async def execute(self, sql: str, params=None):
+        """Run one statement (asynchronous connections commit every statement)"""
+        conn = await self.connect()
+        cur = conn.cursor()
+        try:
+            cur.execute(sql, params)
+            await wait_ready(conn)
+        except BaseException:
+            # A failed or cancelled statement leaves the connection unusable
+            conn.close()
+            raise
+        finally:
+            cur.close()
+    
+    async def ensure_schema(self):
+        """Create the schema on first use, in the executor since it blocks"""
+        if not self._schema_ready:
+            await self._run(self.db.ensure_schema)
+            self._schema_ready = True
+    
+    async def insert_rows(self, table: str, rows: Sequence[tuple]):
+        """Insert rows as one multi-row INSERT"""
+        if not rows:
+            return
+        columns = TABLE_COLUMNS[table]
+        placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+        sql = "INSERT INTO {} ({}) VALUES {}".format(
+            table, ", ".join(columns), ", ".join([placeholders] * len(rows))
+        )
+        await self.execute(sql, [value for row in rows for value in row])
+    
+    async def write_rows(self, table: str, rows: Sequence[tuple], method: Optional[str] = None):
+        """Bulk write rows with the configured method (insert, copy or copy_binary)"""
+        method = method or Config.DB_WRITE_METHOD
+        if method == "insert":
+            await self.insert_rows(table, rows)
+        elif method in ("copy", "copy_binary"):
+            await self._run(self.db.write_rows, table, rows, method)
+        else:
+            raise ValueError(f"Unknown write method: {method}")
+    
+    async def write_samples(self, table: str, samples: Sequence[Tuple[Any, Any]]):
+        """Write (timestamp, data) samples of one table, or buffer them when batching is enabled"""
+        rows = self.db.build_rows(table, samples)
+        if self.batch_size <= 1:
+            await self._store(table, rows, self.write_rows if len(rows) > 1 else self.insert_rows)
+            return
+        
+        if not self._buffers[table]:
+            self._buffer_started[table] = time.monotonic()
+        self._buffers[table].extend(rows)
+        
+        if len(self._buffers[table]) >= self.batch_size:
+            await self._flush_table(table)
+        await self.flush_expired()
+    
+    async def flush(self):
+        """Write all buffered rows"""
+        errors = []
+        for table in TABLE_COLUMNS:
+            try:
+                await self._flush_table(table)
+            except Exception as e:
+                errors.append(e)
+        if errors:
+            raise errors[0]
+    
+    async def flush_expired(self):
+        """Write the buffered rows of every table whose oldest row reached batch_max_age"""
+        now = time.monotonic()
+        for table, started in self._buffer_started.items():
+            if self._buffers[table] and now - started >= self.batch_max_age:
+                await self._flush_table(table)
+    
+    async def _flush_table(self, table: str):
+        """Write the buffered rows of one table, keeping them buffered if the write fails"""
+        rows = self._buffers[table]
+        if not rows:
+            return
+        self._buffers[table] = []
+        try:
+            await self._store(table, rows, self.write_rows)
+        except Exception:
+            self._restore(table, rows)
+            raise
+    
+    def _restore(self, table: str, rows: List[tuple]):
+        """Put the rows of a failed flush back in front of the buffer, dropping the oldest beyond buffer_max_rows"""
+        rows = rows + self._buffers[table]
+        dropped = len(rows) - self.buffer_max_rows
+        if dropped > 0:
+            logger.warning(f"Write buffer of {table} is full, dropped the {dropped} oldest row(s)")
+            rows = rows[dropped:]
+        self._buffers[table] = rows
+    
+    async def _store(self, table: str, rows: List[tuple], write):
+        """Write rows, falling back to the spool if the database write fails"""
+        try:
+            await self.ensure_schema()
+            await write(table, rows)
+        except Exception as e:
+            spool = self.db.spool
+            if spool is None or not spool.accepts(table):
+                raise e
+            # Appending may fsync, which must not block the event loop
+            await self._run(spool.append_rows, table, rows)
+            if not self._spooling:
+                logger.warning(f"Database write failed, spooling samples to {spool.path}: {e}")
+                self._spooling = True
+            return
+        if self._spooling:
+            logger.info(f"Database writes recovered ({len(self.db.spool)} samples spooled)")
+            self._spooling = False
+    
+    async def _run(self, func, *args):
+        """Run a blocking call in the executor"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+    
+    def close(self):
+        """Close the connection"""
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            conn.close()
+
+
+class AsyncWriter:
+    """Drains a SampleQueue into an AsyncDatabase from the event loop"""
+    
+    def __init__(self, queue: SampleQueue, db: AsyncDatabase, batch_size: int = 100,
+                 idle_timeout: float = 1.0):
+        self.queue = queue
+        self.db = db
+        self.batch_size = batch_size
+        self.idle_timeout = idle_timeout
+        self.written = 0
+        self.failed = 0
+        self.writes = 0
+        self.write_seconds = 0.0  # total time spent in write_samples
+        self.last_write_seconds = 0.0
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+    
+    def put(self, sample: Sample) -> bool:
+        """Queue a sample without blocking the event loop (the block policy drops when full)"""
+        queued = self.queue.put(sample, timeout=0)
+        self._wakeup.set()
+        return queued
+    
+    async def run(self):
+        """Write queued samples whenever new ones arrive, until stopped"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.idle_timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.drain()
+            try:
+                # Write out buffered rows that reached DB_BATCH_MAX_AGE (all of them when stopping)
+                await (self.db.flush() if self._stopping else self.db.flush_expired())
+            except Exception as e:
+                logger.error(f"Error flushing buffered samples: {e}")
+            if self._stopping:
+                return
+    
+    def stop(self):
+        """Let run() write the remaining queued samples and return"""
+        self._stopping = True
+        self._wakeup.set()
+    
+    async def drain(self):
+        """Write everything queued so far"""
+        while True:
+            batch: List[Sample] = self.queue.get_batch(self.batch_size, timeout=0)
+            if not batch:
+                return
+            by_table = {}
+            for sample in batch:
+                by_table.setdefault(sample.table, []).append((sample.timestamp, sample.data))
+            for table, samples in by_table.items():
+                start = time.perf_counter()
+                try:
+                    await self.db.write_samples(table, samples)
+                    self.written += len(samples)
+                except Exception as e:
+                    self.failed += len(samples)
+                    logger.error(f"Error writing {len(samples)} {table} sample(s): {e}")
+                seconds = time.perf_counter() - start
+                self.writes += 1
+                self.write_seconds += seconds
+                self.last_write_seconds = seconds
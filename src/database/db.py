@@ -2,7 +2,14 @@
 Database module for Raspberry Pi Sense HAT Monitor
 Handles PostgreSQL connection and database operations
 """
-from typing import Optional
+import io
+import logging
+import struct
+import threading
+import time
+from dataclasses import fields
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 import psycopg2
 from psycopg2.extensions import connection
 
@@ -14,45 +21,198 @@ except ImportError:
 
 # Import models - handle both relative and absolute imports
 try:
-    from models import SenseHatData, RaspberryPiData
+    from models import SampleBatch, SenseHatData, SenseHatMotionData, RaspberryPiData
 except ImportError:
-    from ..models import SenseHatData, RaspberryPiData
+    from ..models import SampleBatch, SenseHatData, SenseHatMotionData, RaspberryPiData
+
+from .indexes import INDEX_PROFILES, create_index_sql, index_name, other_profile_indexes, profile_indexes
+from .partitions import PARTITION_PERIODS, parse_partition_bounds, partition_name, partition_start
+from .pool import ConnectionPool
+from .spool import Spool, SpoolRecord
+
+# Import instrumentation - handle both relative and absolute imports
+try:
+    from utils.instrumentation import timers
+except ImportError:
+    from ..utils.instrumentation import timers
+
+logger = logging.getLogger("sense_logger")
+
+# Column order of the rows built for each table
+SENSEHAT_COLUMNS = (
+    "timestamp", "device_id", "temperature", "humidity", "pressure",
+    "pitch", "roll", "yaw",
+    "accel_x", "accel_y", "accel_z",
+    "gyro_x", "gyro_y", "gyro_z",
+    "compass_x", "compass_y", "compass_z",
+)
+
+RASPBERRY_PI_COLUMNS = (
+    "timestamp", "device_id", "cpu_temp", "cpu_percent", "cpu_count", "cpu_freq_mhz",
+    "mem_total_gb", "mem_used_gb", "mem_available_gb", "mem_percent",
+    "disk_total_gb", "disk_used_gb", "disk_free_gb", "disk_percent",
+    "load_avg_1min", "load_avg_5min", "load_avg_15min",
+)
+
+# sample_count followed by <axis>_mean/_min/_max/_rms for every motion axis
+SENSEHAT_MOTION_COLUMNS = ("timestamp", "device_id") + tuple(
+    field.name for field in fields(SenseHatMotionData)
+)
+
+TABLE_COLUMNS = {
+    "sensehat": SENSEHAT_COLUMNS,
+    "raspberry_pi": RASPBERRY_PI_COLUMNS,
+    "sensehat_motion": SENSEHAT_MOTION_COLUMNS,
+}
+
+# PostgreSQL types of the columns above, used to encode binary COPY data
+TABLE_COLUMN_TYPES = {
+    "sensehat": ("timestamp", "text") + ("float8",) * 15,
+    "raspberry_pi": ("timestamp", "text", "float8", "float8", "int4") + ("float8",) * 12,
+    "sensehat_motion": ("timestamp", "text", "int4") + ("float8",) * (len(SENSEHAT_MOTION_COLUMNS) - 3),
+}
+
+WRITE_METHODS = ("insert", "copy", "copy_binary")
+
+# SQL type names used to cast VALUES lists
+_SQL_TYPES = {"timestamp": "timestamp", "text": "varchar", "float8": "float8", "int4": "integer"}
+
+# Binary COPY framing (see "COPY ... Binary Format" in the PostgreSQL docs)
+_COPY_BINARY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+_COPY_BINARY_TRAILER = struct.pack("!h", -1)
+_PG_EPOCH = datetime(2000, 1, 1)
+_NULL_FIELD = struct.pack("!i", -1)
+_FLOAT8 = struct.Struct("!id")
+_INT4 = struct.Struct("!ii")
+_INT8 = struct.Struct("!iq")
+
+
+# Backoff between failed schema initialisation attempts (seconds)
+SCHEMA_RETRY_MIN = 1.0
+SCHEMA_RETRY_MAX = 300.0
+
+
+class _SchemaState:
+    """Process-wide schema initialisation state shared by every Database"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ready = False
+        self.backoff = 0.0
+        self.retry_at = 0.0
+
+
+_schema = _SchemaState()
+
+
+def utcnow() -> datetime:
+    """Current UTC time as a naive datetime (matches the TIMESTAMP columns)"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
 
 
 class Database:
     """Database connection and operations manager"""
     
-    def __init__(self):
+    def __init__(self, batch_size: Optional[int] = None, batch_max_age: Optional[float] = None,
+                 spool: Optional[Spool] = None, device_id: Optional[str] = None):
         self._connection: Optional[connection] = None
+        
+        # Device the rows are written for (several simulated devices can share a process)
+        self.device_id = Config.DEVICE_ID if device_id is None else device_id
+        
+        # Rows that cannot be written are appended to the spool (if configured)
+        # instead of being lost; a SpoolReplayer writes them back later.
+        self.spool = spool
+        self._spooling = False
+        
+        # Write buffering: rows are collected per table and flushed as one
+        # multi-row INSERT when batch_size rows or batch_max_age seconds are reached.
+        # A batch_size of 1 writes every row immediately. Rows of a failed flush
+        # that the spool does not take stay buffered (up to buffer_max_rows per table).
+        self.batch_size = Config.DB_BATCH_SIZE if batch_size is None else batch_size
+        self.batch_max_age = Config.DB_BATCH_MAX_AGE if batch_max_age is None else batch_max_age
+        self.buffer_max_rows = Config.DB_BUFFER_MAX_ROWS
+        self._buffers: Dict[str, List[tuple]] = {table: [] for table in TABLE_COLUMNS}
+        self._buffer_started: Dict[str, float] = {table: 0.0 for table in TABLE_COLUMNS}
     
     def get_connection(self) -> connection:
-        """Get or create database connection"""
-        if self._connection is None or self._connection.closed:
-            self._connection = psycopg2.connect(
-                host=Config.POSTGRES_HOST,
-                port=Config.POSTGRES_PORT,
-                database=Config.POSTGRES_DB,
-                user=Config.POSTGRES_USER,
-                password=Config.POSTGRES_PASSWORD
-            )
+        """Get database connection, borrowing one from the shared pool if needed"""
+        if self._connection is not None and self._connection.closed:
+            # Lost while borrowed, e.g. the server closed it
+            get_pool().putconn(self._connection, discard=True)
+            self._connection = None
+        if self._connection is None:
+            with timers.time("db.connection"):
+                self._connection = get_pool().getconn()
         return self._connection
     
+    def release_connection(self):
+        """Return the borrowed connection to the pool for other threads to reuse"""
+        if self._connection is not None:
+            conn, self._connection = self._connection, None
+            get_pool().putconn(conn)
+    
     def close(self):
         """Close database connection"""
-        if self._connection and not self._connection.closed:
-            self._connection.close()
-            self._connection = None
+        if self._connection is not None:
+            conn, self._connection = self._connection, None
+            get_pool().putconn(conn, discard=True)
     
-    def init_database(self):
-        """Initialize database tables and indexes"""
+    def init_database(self) -> bool:
+        """Initialize database tables and indexes (returns False if that failed)"""
+        try:
+            self.ensure_schema(force=True)
+        except Exception as e:
+            logger.warning(f"Could not initialize database: {e}")
+            logger.info("Database will be initialized on first write")
+            return False
+        return True
+    
+    def ensure_schema(self, force: bool = False):
+        """Create the schema on first use, once per process
+        
+        A failed attempt is retried with exponential backoff; until the retry is
+        due this raises without contacting the server.
+        """
+        if _schema.ready and not force:
+            return
+        with _schema.lock:
+            if _schema.ready and not force:
+                return
+            now = time.monotonic()
+            if not force and now < _schema.retry_at:
+                raise ConnectionError(f"Database not initialized, next attempt in {_schema.retry_at - now:.0f}s")
+            try:
+                self._create_schema()
+            except Exception:
+                _schema.backoff = min(max(_schema.backoff * 2, SCHEMA_RETRY_MIN), SCHEMA_RETRY_MAX)
+                _schema.retry_at = now + _schema.backoff
+                raise
+            _schema.ready = True
+            _schema.backoff = 0.0
+        logger.info("Database initialized successfully")
+    
+    def _create_schema(self):
+        """Create tables, indexes and partitions (idempotent)"""
+        partitioned = Config.DB_PARTITIONING in PARTITION_PERIODS
+        if partitioned:
+            # The primary key of a partitioned table must include the partition key
+            ddl = {
+                "id_column": "id SERIAL",
+                "primary_key": ",\n                    PRIMARY KEY (id, timestamp)",
+                "partition_by": " PARTITION BY RANGE (timestamp)",
+            }
+        else:
+            ddl = {"id_column": "id SERIAL PRIMARY KEY", "primary_key": "", "partition_by": ""}
+        
+        conn = self.get_connection()
+        cur = conn.cursor()
+        
         try:
-            conn = self.get_connection()
-            cur = conn.cursor()
-            
             # Create sensehat table
             cur.execute("""
                 CREATE TABLE IF NOT EXISTS sensehat (
-                    id SERIAL PRIMARY KEY,
+                    {id_column},
                     timestamp TIMESTAMP NOT NULL DEFAULT NOW(),
                     device_id VARCHAR(50),
                     temperature FLOAT,
@@ -69,14 +229,14 @@ class Database:
                     gyro_z FLOAT,
                     compass_x FLOAT,
                     compass_y FLOAT,
-                    compass_z FLOAT
-                )
-            """)
+                    compass_z FLOAT{primary_key}
+                ){partition_by}
+            """.format(**ddl))
             
             # Create raspberry_pi table
             cur.execute("""
                 CREATE TABLE IF NOT EXISTS raspberry_pi (
-                    id SERIAL PRIMARY KEY,
+                    {id_column},
                     timestamp TIMESTAMP NOT NULL DEFAULT NOW(),
                     device_id VARCHAR(50),
                     cpu_temp FLOAT,
@@ -93,123 +253,623 @@ class Database:
                     disk_percent FLOAT,
                     load_avg_1min FLOAT,
                     load_avg_5min FLOAT,
-                    load_avg_15min FLOAT
-                )
-            """)
+                    load_avg_15min FLOAT{primary_key}
+                ){partition_by}
+            """.format(**ddl))
             
-            # Create indexes on timestamp and device_id for better query performance
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_sensehat_timestamp ON sensehat(timestamp)")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_sensehat_device_id ON sensehat(device_id)")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_raspberry_pi_timestamp ON raspberry_pi(timestamp)")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_raspberry_pi_device_id ON raspberry_pi(device_id)")
+            # Create sensehat_motion table (windowed aggregates of high-rate motion samples)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS sensehat_motion (
+                    {id_column},
+                    timestamp TIMESTAMP NOT NULL DEFAULT NOW(),
+                    device_id VARCHAR(50),
+                    sample_count INTEGER,
+                    {columns}{primary_key}
+                ){partition_by}
+            """.format(columns=",\n                    ".join(
+                column + " FLOAT" for column in SENSEHAT_MOTION_COLUMNS[3:]
+            ), **ddl))
+            
+            # Create the indexes of DB_INDEX_PROFILE for better query performance. Tables
+            # that still carry another profile's indexes are switched by migrate_indexes(),
+            # which builds the new indexes without blocking writes.
+            existing = self._existing_indexes(cur)
+            for table in TABLE_COLUMNS:
+                stale = [name for name in other_profile_indexes(table, Config.DB_INDEX_PROFILE) if name in existing]
+                if stale:
+                    logger.warning(f"{table} has indexes of another profile ({', '.join(stale)}), run "
+                                   f"'python manage.py migrate-indexes' to switch to "
+                                   f"DB_INDEX_PROFILE={Config.DB_INDEX_PROFILE}")
+                    continue
+                for name, method, columns in profile_indexes(table, Config.DB_INDEX_PROFILE):
+                    cur.execute(create_index_sql(name, table, method, columns))
             
             conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
             cur.close()
-            import logging
-            logging.getLogger("sense_logger").info("Database initialized successfully")
+            self.release_connection()
+        
+        if partitioned:
+            self.create_partitions()
+    
+    def create_partitions(self, now: Optional[datetime] = None) -> List[str]:
+        """Create the current and the next DB_PARTITIONS_AHEAD partitions of every partitioned table"""
+        period = PARTITION_PERIODS[Config.DB_PARTITIONING]
+        first = partition_start(now or utcnow(), Config.DB_PARTITIONING)
+        created = []
+        
+        conn = self.get_connection()
+        cur = conn.cursor()
+        
+        try:
+            for table in self._partitioned_tables(cur):
+                existing = self._partitions(cur, table)
+                # Rows outside every range (e.g. a skewed clock) land here instead of failing
+                if not any(bounds is None for bounds in existing.values()):
+                    cur.execute("CREATE TABLE IF NOT EXISTS {0}_default PARTITION OF {0} DEFAULT".format(table))
+                for i in range(Config.DB_PARTITIONS_AHEAD + 1):
+                    lower = first + i * period
+                    upper = lower + period
+                    # Skip ranges already covered, also by partitions of another period
+                    if any(bounds is not None and bounds[0] < upper and lower < bounds[1]
+                           for bounds in existing.values()):
+                        continue
+                    name = partition_name(table, lower)
+                    cur.execute(
+                        "CREATE TABLE {} PARTITION OF {} FOR VALUES FROM (%s) TO (%s)".format(name, table),
+                        (lower, upper),
+                    )
+                    created.append(name)
+            conn.commit()
         except Exception as e:
-            import logging
-            logger = logging.getLogger("sense_logger")
-            logger.warning(f"Could not initialize database: {e}")
-            logger.info("Database will be initialized on first connection")
+            conn.rollback()
+            raise e
+        finally:
+            cur.close()
+            self.release_connection()
+        
+        if created:
+            logger.info(f"Created partitions: {', '.join(created)}")
+        return created
     
-    def write_sensehat_data(self, data: SenseHatData):
-        """Write Sense HAT sensor data to database"""
+    def drop_expired_partitions(self, now: Optional[datetime] = None) -> List[str]:
+        """Drop partitions entirely older than DB_RETENTION_DAYS (0 keeps everything)"""
+        if Config.DB_RETENTION_DAYS <= 0:
+            return []
+        cutoff = (now or utcnow()) - timedelta(days=Config.DB_RETENTION_DAYS)
+        dropped = []
+        
         conn = self.get_connection()
         cur = conn.cursor()
         
         try:
-            cur.execute("""
-                INSERT INTO sensehat (
-                    timestamp, device_id, temperature, humidity, pressure,
-                    pitch, roll, yaw,
-                    accel_x, accel_y, accel_z,
-                    gyro_x, gyro_y, gyro_z,
-                    compass_x, compass_y, compass_z
-                ) VALUES (
-                    NOW(), %s, %s, %s, %s,
-                    %s, %s, %s,
-                    %s, %s, %s,
-                    %s, %s, %s,
-                    %s, %s, %s
-                )
-            """, (
-                Config.DEVICE_ID,
-                float(data.temperature),
-                float(data.humidity),
-                float(data.pressure),
-                float(data.pitch),
-                float(data.roll),
-                float(data.yaw),
-                float(data.accel_x),
-                float(data.accel_y),
-                float(data.accel_z),
-                float(data.gyro_x),
-                float(data.gyro_y),
-                float(data.gyro_z),
-                float(data.compass_x),
-                float(data.compass_y),
-                float(data.compass_z),
-            ))
+            for table in self._partitioned_tables(cur):
+                for name, bounds in self._partitions(cur, table).items():
+                    if bounds is None:
+                        # The default partition only holds stray rows, trim them instead
+                        cur.execute("DELETE FROM {} WHERE timestamp < %s".format(name), (cutoff,))
+                    elif bounds[1] <= cutoff:
+                        cur.execute("DROP TABLE {}".format(name))
+                        dropped.append(name)
             conn.commit()
         except Exception as e:
             conn.rollback()
             raise e
         finally:
             cur.close()
+            self.release_connection()
+        
+        if dropped:
+            logger.info(f"Dropped expired partitions: {', '.join(dropped)}")
+        return dropped
+    
+    def migrate_indexes(self, profile: Optional[str] = None) -> List[str]:
+        """Switch every table to an index profile without blocking writes
+        
+        The new indexes are built with CREATE INDEX CONCURRENTLY (per partition for
+        partitioned tables) before the indexes of other profiles are dropped.
+        Returns the names of the indexes created and dropped.
+        """
+        profile = profile or Config.DB_INDEX_PROFILE
+        if profile not in INDEX_PROFILES:
+            raise ValueError(f"Unknown index profile: {profile}")
+        changed = []
+        
+        conn = self.get_connection()
+        conn.commit()
+        # CONCURRENTLY cannot run inside a transaction block
+        autocommit = conn.autocommit
+        conn.autocommit = True
+        cur = conn.cursor()
+        
+        try:
+            # Index builds may take longer than DB_STATEMENT_TIMEOUT
+            cur.execute("SET statement_timeout = 0")
+            partitioned = self._partitioned_tables(cur, warn=False)
+            for table in TABLE_COLUMNS:
+                for suffix, method, columns in INDEX_PROFILES[profile]:
+                    name = index_name(table, suffix)
+                    if table in partitioned:
+                        built = self._build_partitioned_index(cur, table, suffix, method, columns)
+                    else:
+                        built = self._build_index(cur, name, table, method, columns)
+                    if built:
+                        changed.append(name)
+                        logger.info(f"Built index {name}")
+                
+                existing = self._existing_indexes(cur)
+                for name in other_profile_indexes(table, profile):
+                    if name not in existing:
+                        continue
+                    # Partitioned indexes cannot be dropped concurrently
+                    concurrently = "" if table in partitioned else "CONCURRENTLY "
+                    cur.execute(f"DROP INDEX {concurrently}IF EXISTS {name}")
+                    changed.append(name)
+                    logger.info(f"Dropped index {name}")
+        finally:
+            try:
+                cur.execute("RESET statement_timeout")
+            finally:
+                cur.close()
+                conn.autocommit = autocommit
+                self.release_connection()
+        return changed
+    
+    def write_sensehat_data(self, data: SenseHatData, timestamp: Optional[datetime] = None):
+        """Write Sense HAT sensor data to database"""
+        self._write("sensehat", [self._sensehat_row(data, timestamp)])
     
-    def write_raspberry_pi_data(self, data: RaspberryPiData):
+    def write_raspberry_pi_data(self, data: RaspberryPiData, timestamp: Optional[datetime] = None):
         """Write Raspberry Pi system metrics to database"""
+        self._write("raspberry_pi", [self._raspberry_pi_row(data, timestamp)])
+    
+    def write_sensehat_motion_data(self, data: SenseHatMotionData, timestamp: Optional[datetime] = None):
+        """Write windowed Sense HAT motion aggregates to database"""
+        self._write("sensehat_motion", [self._sensehat_motion_row(data, timestamp)])
+    
+    def write_samples(self, table: str, samples: Sequence[Tuple[datetime, Any]]):
+        """Write (timestamp, data) samples of one table together"""
+        self._write(table, self.build_rows(table, samples))
+    
+    def write_batch(self, batch: SampleBatch):
+        """Write a columnar batch of samples in one bulk write, bypassing the write buffer"""
+        self._store(batch.table, batch.rows(self.device_id), self.write_rows)
+    
+    def build_rows(self, table: str, samples: Sequence[Tuple[datetime, Any]]) -> List[tuple]:
+        """Build the rows of (timestamp, data) samples of one table"""
+        build = {
+            "sensehat": self._sensehat_row,
+            "raspberry_pi": self._raspberry_pi_row,
+            "sensehat_motion": self._sensehat_motion_row,
+        }[table]
+        return [build(data, timestamp) for timestamp, data in samples]
+    
+    def flush(self):
+        """Write all buffered rows to the database"""
+        errors = []
+        for table in TABLE_COLUMNS:
+            try:
+                self._flush_table(table)
+            except Exception as e:
+                errors.append(e)
+        if errors:
+            raise errors[0]
+    
+    def flush_expired(self):
+        """Write the buffered rows of every table whose oldest row reached batch_max_age"""
+        now = time.monotonic()
+        for table, started in self._buffer_started.items():
+            if self._buffers[table] and now - started >= self.batch_max_age:
+                self._flush_table(table)
+    
+    def insert_rows(self, table: str, rows: Sequence[tuple]):
+        """Insert rows into a table as one multi-row INSERT in a single transaction"""
+        if not rows:
+            return
+        columns = TABLE_COLUMNS[table]
+        placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+        sql = "INSERT INTO {} ({}) VALUES {}".format(
+            table, ", ".join(columns), ", ".join([placeholders] * len(rows))
+        )
+        params = [value for row in rows for value in row]
+        
+        conn = self.get_connection()
+        with timers.time("db.cursor"):
+            cur = conn.cursor()
+        
+        try:
+            with timers.time("db.execute"):
+                cur.execute(sql, params)
+            with timers.time("db.commit"):
+                conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            cur.close()
+            self.release_connection()
+    
+    def insert_rows_if_missing(self, table: str, rows: Sequence[tuple]):
+        """Insert rows, skipping any whose (device_id, timestamp) is already stored"""
+        if not rows:
+            return
+        columns = TABLE_COLUMNS[table]
+        placeholders = "(" + ", ".join(
+            "%s::" + _SQL_TYPES[pg_type] for pg_type in TABLE_COLUMN_TYPES[table]
+        ) + ")"
+        sql = """
+            INSERT INTO {table} ({columns})
+            SELECT {values} FROM (VALUES {rows}) AS v({columns})
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {table} t
+                WHERE t.timestamp = v.timestamp
+                AND t.device_id IS NOT DISTINCT FROM v.device_id
+            )
+        """.format(
+            table=table,
+            columns=", ".join(columns),
+            values=", ".join("v." + column for column in columns),
+            rows=", ".join([placeholders] * len(rows)),
+        )
+        params = [value for row in rows for value in row]
+        
         conn = self.get_connection()
         cur = conn.cursor()
         
         try:
-            cur.execute("""
-                INSERT INTO raspberry_pi (
-                    timestamp, device_id, cpu_temp, cpu_percent, cpu_count, cpu_freq_mhz,
-                    mem_total_gb, mem_used_gb, mem_available_gb, mem_percent,
-                    disk_total_gb, disk_used_gb, disk_free_gb, disk_percent,
-                    load_avg_1min, load_avg_5min, load_avg_15min
-                ) VALUES (
-                    NOW(), %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s,
-                    %s, %s, %s, %s,
-                    %s, %s, %s
-                )
-            """, (
-                Config.DEVICE_ID,
-                data.cpu_temp,
-                float(data.cpu_percent) if data.cpu_percent is not None else None,
-                int(data.cpu_count) if data.cpu_count is not None else None,
-                float(data.cpu_freq_mhz) if data.cpu_freq_mhz is not None else None,
-                float(data.mem_total_gb),
-                float(data.mem_used_gb),
-                float(data.mem_available_gb),
-                float(data.mem_percent),
-                float(data.disk_total_gb),
-                float(data.disk_used_gb),
-                float(data.disk_free_gb),
-                float(data.disk_percent),
-                float(data.load_avg_1min),
-                float(data.load_avg_5min),
-                float(data.load_avg_15min),
-            ))
+            cur.execute(sql, params)
             conn.commit()
         except Exception as e:
             conn.rollback()
             raise e
         finally:
             cur.close()
+            self.release_connection()
+    
+    def replay_records(self, records: Sequence[SpoolRecord]):
+        """Write spooled records back with their original timestamps, without duplicates"""
+        self.ensure_schema()
+        by_table: Dict[str, List[tuple]] = {}
+        for record in records:
+            types = TABLE_COLUMN_TYPES[record.table][2:]
+            values = tuple(
+                int(value) if pg_type == "int4" and value is not None else value
+                for pg_type, value in zip(types, record.values)
+            )
+            by_table.setdefault(record.table, []).append(
+                (record.timestamp, self.device_id) + values
+            )
+        for table, rows in by_table.items():
+            self.insert_rows_if_missing(table, rows)
+    
+    def copy_rows(self, table: str, rows: Sequence[tuple], binary: bool = False):
+        """Load rows into a table with COPY ... FROM STDIN in a single transaction"""
+        if not rows:
+            return
+        columns = TABLE_COLUMNS[table]
+        if binary:
+            buf = io.BytesIO(encode_copy_binary(TABLE_COLUMN_TYPES[table], rows))
+            sql = "COPY {} ({}) FROM STDIN WITH (FORMAT binary)".format(table, ", ".join(columns))
+        else:
+            buf = io.StringIO(encode_copy_text(rows))
+            sql = "COPY {} ({}) FROM STDIN".format(table, ", ".join(columns))
+        
+        conn = self.get_connection()
+        with timers.time("db.cursor"):
+            cur = conn.cursor()
+        
+        try:
+            with timers.time("db.copy"):
+                cur.copy_expert(sql, buf)
+            with timers.time("db.commit"):
+                conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            cur.close()
+            self.release_connection()
+    
+    def write_rows(self, table: str, rows: Sequence[tuple], method: Optional[str] = None):
+        """Bulk write rows with the configured method (insert, copy or copy_binary)"""
+        method = method or Config.DB_WRITE_METHOD
+        if method == "copy":
+            self.copy_rows(table, rows)
+        elif method == "copy_binary":
+            self.copy_rows(table, rows, binary=True)
+        elif method == "insert":
+            self.insert_rows(table, rows)
+        else:
+            raise ValueError(f"Unknown write method: {method}")
+    
+    def _write(self, table: str, rows: List[tuple]):
+        """Write rows directly, or buffer them when batching is enabled"""
+        if self.batch_size <= 1:
+            self._store(table, rows, self.write_rows if len(rows) > 1 else self.insert_rows)
+            return
+        
+        if not self._buffers[table]:
+            self._buffer_started[table] = time.monotonic()
+        self._buffers[table].extend(rows)
+        
+        if len(self._buffers[table]) >= self.batch_size:
+            self._flush_table(table)
+        
+        # Age check covers every table, so a slow source is not held back
+        # waiting for its own next sample
+        self.flush_expired()
+    
+    def _flush_table(self, table: str):
+        """Write the buffered rows of one table, keeping them buffered if the write fails"""
+        rows = self._buffers[table]
+        if not rows:
+            return
+        self._buffers[table] = []
+        try:
+            self._store(table, rows, self.write_rows)
+        except Exception:
+            self._restore(table, rows)
+            raise
+    
+    def _restore(self, table: str, rows: List[tuple]):
+        """Put the rows of a failed flush back in front of the buffer, dropping the oldest beyond buffer_max_rows"""
+        rows = rows + self._buffers[table]
+        dropped = len(rows) - self.buffer_max_rows
+        if dropped > 0:
+            logger.warning(f"Write buffer of {table} is full, dropped the {dropped} oldest row(s)")
+            rows = rows[dropped:]
+        self._buffers[table] = rows
+    
+    def _store(self, table: str, rows: List[tuple], write):
+        """Write rows, falling back to the spool if the database write fails"""
+        try:
+            self.ensure_schema()
+            write(table, rows)
+        except Exception as e:
+            if self.spool is None or not self.spool.accepts(table):
+                raise e
+            self.spool.append_rows(table, rows)
+            if not self._spooling:
+                logger.warning(f"Database write failed, spooling samples to {self.spool.path}: {e}")
+                self._spooling = True
+            return
+        if self._spooling:
+            logger.info(f"Database writes recovered ({len(self.spool)} samples spooled)")
+            self._spooling = False
+    
+    def _partitioned_tables(self, cur, warn: bool = True) -> List[str]:
+        """Sample tables that were created as partitioned tables"""
+        cur.execute(
+            "SELECT c.relname FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = ANY(%s) AND pg_table_is_visible(c.oid)",
+            (list(TABLE_COLUMNS),),
+        )
+        tables = [row[0] for row in cur.fetchall()]
+        for table in TABLE_COLUMNS:
+            if warn and table not in tables:
+                logger.warning(f"Table {table} is not partitioned (created before DB_PARTITIONING "
+                               f"was enabled), skipping partition maintenance for it")
+        return [table for table in TABLE_COLUMNS if table in tables]
+    
+    def _partitions(self, cur, table: str) -> Dict[str, Optional[Tuple[datetime, datetime]]]:
+        """Partitions of table mapped to their (lower, upper) bounds, None for the default partition"""
+        cur.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = %s::regclass",
+            (table,),
+        )
+        return {name: parse_partition_bounds(bound) for name, bound in cur.fetchall()}
+    
+    def _existing_indexes(self, cur) -> set:
+        """Names of the indexes in the current schema"""
+        cur.execute("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema()")
+        return {row[0] for row in cur.fetchall()}
+    
+    def _index_valid(self, cur, name: str) -> Optional[bool]:
+        """Whether an index is valid, None if it does not exist"""
+        cur.execute(
+            "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            (name,),
+        )
+        row = cur.fetchone()
+        return None if row is None else row[0]
+    
+    def _build_index(self, cur, name: str, table: str, method: str, columns: str) -> bool:
+        """Build an index concurrently unless a valid one exists; returns True if it was built"""
+        valid = self._index_valid(cur, name)
+        if valid:
+            return False
+        if valid is not None:
+            # Left invalid by an interrupted concurrent build
+            cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        cur.execute(create_index_sql(name, table, method, columns, concurrently=True))
+        return True
+    
+    def _build_partitioned_index(self, cur, table: str, suffix: str, method: str, columns: str) -> bool:
+        """Build a partitioned index partition by partition; returns True if it was built"""
+        name = index_name(table, suffix)
+        if self._index_valid(cur, name):
+            return False
+        # The parent index stays invalid until every partition has its index attached
+        cur.execute(create_index_sql(name, table, method, columns, only=True))
+        cur.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            (name,),
+        )
+        attached = {row[0] for row in cur.fetchall()}
+        for partition in self._partitions(cur, table):
+            child = index_name(partition, suffix)
+            if child in attached:
+                continue
+            self._build_index(cur, child, partition, method, columns)
+            cur.execute(f"ALTER INDEX {name} ATTACH PARTITION {child}")
+        return True
+    
+    def _sensehat_row(self, data: SenseHatData, timestamp: Optional[datetime]) -> tuple:
+        """Build a sensehat row in SENSEHAT_COLUMNS order"""
+        return (
+            timestamp or utcnow(),
+            self.device_id,
+            float(data.temperature),
+            float(data.humidity),
+            float(data.pressure),
+            float(data.pitch),
+            float(data.roll),
+            float(data.yaw),
+            float(data.accel_x),
+            float(data.accel_y),
+            float(data.accel_z),
+            float(data.gyro_x),
+            float(data.gyro_y),
+            float(data.gyro_z),
+            float(data.compass_x),
+            float(data.compass_y),
+            float(data.compass_z),
+        )
+    
+    def _raspberry_pi_row(self, data: RaspberryPiData, timestamp: Optional[datetime]) -> tuple:
+        """Build a raspberry_pi row in RASPBERRY_PI_COLUMNS order"""
+        return (
+            timestamp or utcnow(),
+            self.device_id,
+            data.cpu_temp,
+            float(data.cpu_percent) if data.cpu_percent is not None else None,
+            int(data.cpu_count) if data.cpu_count is not None else None,
+            float(data.cpu_freq_mhz) if data.cpu_freq_mhz is not None else None,
+            float(data.mem_total_gb),
+            float(data.mem_used_gb),
+            float(data.mem_available_gb),
+            float(data.mem_percent),
+            float(data.disk_total_gb),
+            float(data.disk_used_gb),
+            float(data.disk_free_gb),
+            float(data.disk_percent),
+            float(data.load_avg_1min),
+            float(data.load_avg_5min),
+            float(data.load_avg_15min),
+        )
+    
+    def _sensehat_motion_row(self, data: SenseHatMotionData, timestamp: Optional[datetime]) -> tuple:
+        """Build a sensehat_motion row in SENSEHAT_MOTION_COLUMNS order"""
+        return (
+            timestamp or utcnow(),
+            self.device_id,
+            int(data.sample_count),
+        ) + tuple(float(getattr(data, column)) for column in SENSEHAT_MOTION_COLUMNS[3:])
+
+
+def _copy_text_value(value) -> str:
+    """Format one value for the COPY text format"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, str):
+        return (value.replace("\\", "\\\\").replace("\t", "\\t")
+                .replace("\n", "\\n").replace("\r", "\\r"))
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return repr(value)
+
+
+def encode_copy_text(rows: Sequence[tuple]) -> str:
+    """Encode rows as COPY text format (tab separated, \\N for NULL)"""
+    return "".join(
+        "\t".join([_copy_text_value(value) for value in row]) + "\n"
+        for row in rows
+    )
+
 
+def encode_copy_binary(types: Sequence[str], rows: Sequence[tuple]) -> bytes:
+    """Encode rows as COPY binary format for the given column types"""
+    field_count = struct.pack("!h", len(types))
+    parts = [_COPY_BINARY_HEADER]
+    for row in rows:
+        parts.append(field_count)
+        for pg_type, value in zip(types, row):
+            if value is None:
+                parts.append(_NULL_FIELD)
+            elif pg_type == "float8":
+                parts.append(_FLOAT8.pack(8, value))
+            elif pg_type == "int4":
+                parts.append(_INT4.pack(4, value))
+            elif pg_type == "timestamp":
+                delta = value - _PG_EPOCH
+                micros = (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+                parts.append(_INT8.pack(8, micros))
+            else:
+                encoded = value.encode("utf-8")
+                parts.append(struct.pack("!i", len(encoded)) + encoded)
+    parts.append(_COPY_BINARY_TRAILER)
+    return b"".join(parts)
+
+
+def connect_kwargs() -> Dict[str, Any]:
+    """psycopg2.connect() arguments: server, keepalives, UTC session and statement timeout"""
+    kwargs = dict(
+        host=Config.POSTGRES_HOST,
+        port=Config.POSTGRES_PORT,
+        database=Config.POSTGRES_DB,
+        user=Config.POSTGRES_USER,
+        password=Config.POSTGRES_PASSWORD,
+        connect_timeout=Config.POSTGRES_CONNECT_TIMEOUT,
+        # Detect half-open TCP connections (e.g. after a network drop) instead of hanging
+        keepalives=1,
+        keepalives_idle=Config.DB_KEEPALIVE_IDLE,
+        keepalives_interval=Config.DB_KEEPALIVE_INTERVAL,
+        keepalives_count=Config.DB_KEEPALIVE_COUNT,
+    )
+    # Rows carry naive UTC timestamps (utcnow); a UTC session keeps DEFAULT NOW() and
+    # comparisons with NOW() consistent with them whatever the server's TimeZone is
+    options = ["-c TimeZone=UTC"]
+    if Config.DB_STATEMENT_TIMEOUT > 0:
+        options.append(f"-c statement_timeout={int(Config.DB_STATEMENT_TIMEOUT * 1000)}")
+    kwargs["options"] = " ".join(options)
+    return kwargs
+
+
+def connect() -> connection:
+    """Open a new connection with keepalives and a statement timeout"""
+    return psycopg2.connect(**connect_kwargs())
+
+
+# Connection pool shared by every Database in the process, created on first use
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Get the process-wide connection pool"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    connect,
+                    max_idle=Config.DB_POOL_MAX_IDLE,
+                    max_size=Config.DB_POOL_MAX_SIZE,
+                    timeout=Config.DB_POOL_TIMEOUT,
+                    check_interval=Config.DB_POOL_CHECK_INTERVAL,
+                    backoff_min=Config.DB_RECONNECT_BACKOFF_MIN,
+                    backoff_max=Config.DB_RECONNECT_BACKOFF_MAX,
+                )
+    return _pool
 
-# Global database instance
-_db = Database()
 
-# Initialize database on module import
-_db.init_database()
+# Global database instance, created on first use without connecting
+_db: Optional[Database] = None
+_db_lock = threading.Lock()
 
 
 def get_database() -> Database:
     """Get the global database instance"""
+    global _db
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                _db = Database()
     return _db
 
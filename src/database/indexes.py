@@ -0,0 +1,53 @@
+"""
+Index profiles for the sample tables
+
+btree: separate btree indexes on timestamp and device_id (the original schema)
+brin:  a BRIN index on timestamp, which stays tiny and is nearly free to
+       maintain on append-only data, plus a (device_id, timestamp) btree
+       that serves per-device time-range queries from a single index
+"""
+from typing import List, Tuple
+
+# Profile -> (index name suffix, access method, indexed columns)
+INDEX_PROFILES = {
+    "btree": (
+        ("timestamp", "btree", "timestamp"),
+        ("device_id", "btree", "device_id"),
+    ),
+    "brin": (
+        ("timestamp_brin", "brin", "timestamp"),
+        ("device_timestamp", "btree", "device_id, timestamp"),
+    ),
+}
+
+
+def index_name(table: str, suffix: str) -> str:
+    """Name of an index of table, e.g. idx_sensehat_timestamp"""
+    return f"idx_{table}_{suffix}"
+
+
+def profile_indexes(table: str, profile: str) -> List[Tuple[str, str, str]]:
+    """(index name, access method, columns) of every index a profile puts on table"""
+    return [
+        (index_name(table, suffix), method, columns)
+        for suffix, method, columns in INDEX_PROFILES[profile]
+    ]
+
+
+def other_profile_indexes(table: str, profile: str) -> List[str]:
+    """Names of the indexes other profiles put on table"""
+    keep = {name for name, _, _ in profile_indexes(table, profile)}
+    return [
+        name
+        for other in INDEX_PROFILES
+        for name, _, _ in profile_indexes(table, other)
+        if name not in keep
+    ]
+
+
+def create_index_sql(name: str, table: str, method: str, columns: str,
+                     concurrently: bool = False, only: bool = False) -> str:
+    """CREATE INDEX statement (ONLY creates a partitioned index without building the partitions)"""
+    return "CREATE INDEX {}IF NOT EXISTS {} ON {}{} USING {} ({})".format(
+        "CONCURRENTLY " if concurrently else "", name, "ONLY " if only else "", table, method, columns
+    )
@@ -0,0 +1,78 @@
+"""
+Time-based range partitioning of the sample tables
+
+With DB_PARTITIONING set to daily or weekly the tables are created as
+PARTITION BY RANGE (timestamp) parents. A PartitionMaintainer creates the
+upcoming partitions ahead of time and drops whole partitions once they fall
+out of the retention window, so old data never has to be DELETEd row by row.
+"""
+import logging
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+logger = logging.getLogger("sense_logger")
+
+PARTITION_PERIODS = {
+    "daily": timedelta(days=1),
+    "weekly": timedelta(weeks=1),
+}
+
+# Seconds before a failed maintenance run is retried
+RETRY_INTERVAL = 60.0
+
+_BOUNDS = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def partition_start(when: datetime, period: str) -> datetime:
+    """Start of the partition containing when (midnight, Mondays for weekly)"""
+    start = when.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "weekly":
+        start -= timedelta(days=start.weekday())
+    return start
+
+
+def partition_name(table: str, start: datetime) -> str:
+    """Name of the partition of table starting at start, e.g. sensehat_p20240101"""
+    return f"{table}_p{start:%Y%m%d}"
+
+
+def parse_partition_bounds(bound: str) -> Optional[Tuple[datetime, datetime]]:
+    """Parse pg_get_expr(relpartbound) into (lower, upper), None for the default partition"""
+    match = _BOUNDS.search(bound)
+    if match is None:
+        return None
+    return datetime.fromisoformat(match.group(1)), datetime.fromisoformat(match.group(2))
+
+
+class PartitionMaintainer(threading.Thread):
+    """Background thread that creates upcoming partitions and drops expired ones"""
+    
+    def __init__(self, db, interval: float = 3600.0):
+        super().__init__(name="partition-maintainer", daemon=True)
+        self.db = db
+        self.interval = interval
+        self._stop_event = threading.Event()
+    
+    def run(self):
+        while not self._stop_event.is_set():
+            self._stop_event.wait(self.step())
+    
+    def step(self) -> float:
+        """Run maintenance once; returns the seconds to wait before the next run"""
+        try:
+            self.db.ensure_schema()
+            self.db.create_partitions()
+            self.db.drop_expired_partitions()
+        except Exception as e:
+            # Retry soon, the next partition may be needed before the next run
+            logger.error(f"Partition maintenance failed: {e}")
+            return min(self.interval, RETRY_INTERVAL)
+        return self.interval
+    
+    def stop(self, timeout: Optional[float] = 5.0):
+        """Stop the maintenance thread"""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
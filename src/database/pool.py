@@ -0,0 +1,151 @@
+"""
+Thread-safe PostgreSQL connection pool
+
+Every Database in the process borrows its connections from one pool, which
+bounds the number of server connections, checks idle connections before
+handing them out again and spaces out reconnect attempts with jittered
+exponential backoff so an outage does not turn into a reconnect storm.
+"""
+import logging
+import random
+import threading
+from time import monotonic
+from typing import Callable, List, Tuple
+
+from psycopg2.extensions import (
+    TRANSACTION_STATUS_INERROR,
+    TRANSACTION_STATUS_INTRANS,
+    TRANSACTION_STATUS_UNKNOWN,
+    connection,
+)
+
+logger = logging.getLogger("sense_logger")
+
+
+class ConnectionPool:
+    """Bounded pool of connections with liveness checks and reconnect backoff"""
+    
+    def __init__(self, connect: Callable[[], connection], max_idle: int = 2, max_size: int = 4,
+                 timeout: float = 30.0, check_interval: float = 30.0,
+                 backoff_min: float = 1.0, backoff_max: float = 60.0):
+        self._connect = connect
+        self.max_idle = max_idle  # idle connections kept open for reuse (opened on demand)
+        self.max_size = max_size  # open connections, idle or borrowed
+        self.timeout = timeout  # seconds to wait for a free connection
+        self.check_interval = check_interval  # idle seconds after which a connection is checked
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self._idle: List[Tuple[connection, float]] = []  # (connection, time it was returned)
+        self._size = 0
+        self._failures = 0
+        self._retry_at = 0.0
+        self._cond = threading.Condition()
+    
+    @property
+    def size(self) -> int:
+        return self._size
+    
+    def getconn(self) -> connection:
+        """Borrow a live connection, opening a new one if none is idle"""
+        deadline = monotonic() + self.timeout
+        while True:
+            with self._cond:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - monotonic()
+                    if remaining <= 0 or not self._cond.wait(remaining):
+                        raise ConnectionError(f"No free database connection after {self.timeout:.0f}s")
+                if self._idle:
+                    conn, returned = self._idle.pop()
+                else:
+                    conn = None
+                    self._size += 1
+            
+            if conn is None:
+                try:
+                    return self._open()
+                except Exception:
+                    self._release_slot()
+                    raise
+            if self._alive(conn, returned):
+                return conn
+            logger.debug("Discarding dead database connection")
+            self._discard(conn)
+    
+    def putconn(self, conn: connection, discard: bool = False):
+        """Return a borrowed connection, closing it if it is broken or not needed"""
+        if not discard and not conn.closed:
+            status = conn.get_transaction_status()
+            if status == TRANSACTION_STATUS_UNKNOWN:
+                discard = True
+            elif status in (TRANSACTION_STATUS_INTRANS, TRANSACTION_STATUS_INERROR):
+                try:
+                    conn.rollback()
+                except Exception:
+                    discard = True
+        
+        with self._cond:
+            if not discard and not conn.closed and len(self._idle) < self.max_idle:
+                self._idle.append((conn, monotonic()))
+                self._cond.notify()
+                return
+        self._discard(conn)
+    
+    def closeall(self):
+        """Close every idle connection"""
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+    
+    def _open(self) -> connection:
+        """Connect, unless the backoff after a failed attempt has not expired yet"""
+        with self._cond:
+            wait = self._retry_at - monotonic()
+        if wait > 0:
+            raise ConnectionError(f"Database unavailable, next connection attempt in {wait:.1f}s")
+        
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._failures += 1
+                delay = min(self.backoff_max, self.backoff_min * 2 ** (self._failures - 1))
+                # Jitter spreads the reconnects of several loggers after a server restart
+                self._retry_at = monotonic() + random.uniform(delay / 2, delay)
+            raise
+        
+        with self._cond:
+            if self._failures:
+                logger.info(f"Database connection restored after {self._failures} failed attempt(s)")
+            self._failures = 0
+            self._retry_at = 0.0
+        return conn
+    
+    def _alive(self, conn: connection, returned: float) -> bool:
+        """Check a connection that sat idle longer than check_interval"""
+        if conn.closed:
+            return False
+        if monotonic() - returned < self.check_interval:
+            return True
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.fetchone()
+            cur.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+    
+    def _discard(self, conn: connection):
+        try:
+            if not conn.closed:
+                conn.close()
+        except Exception:
+            pass
+        self._release_slot()
+    
+    def _release_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
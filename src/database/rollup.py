@@ -0,0 +1,279 @@
+"""
+Continuous rollup tables with per-bucket aggregates
+
+Each raw table gets one rollup table per resolution (e.g. sensehat_1m,
+sensehat_1h) holding the sample count and avg/min/max and non-null count of
+every field per device and time bucket. Rollups are maintained incrementally: a watermark
+in rollup_state records the last raw id folded in, so every run only reads
+rows inserted since the previous one, including late spool replays.
+
+Ids are taken from the sequence when a row is inserted but become visible
+only when its transaction commits, so the writer and the spool replayer can
+commit a lower id after a higher one was read. The watermark therefore only
+moves past ids that can no longer appear: up to MAX(id) when no transaction
+was in flight, otherwise up to an earlier MAX(id) (pending_id) once every
+transaction in flight when it was read has finished (see safe_bound).
+"""
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+# Import config - handle both relative and absolute imports
+try:
+    from config import Config
+except ImportError:
+    from ..config import Config
+
+from .db import TABLE_COLUMNS
+
+logger = logging.getLogger("sense_logger")
+
+# Resolution suffix -> (date_trunc unit, bucket length in seconds)
+ROLLUP_RESOLUTIONS = {
+    "1m": ("minute", 60),
+    "1h": ("hour", 3600),
+}
+
+# Raw tables that are rolled up
+ROLLUP_SOURCES = ("sensehat", "raspberry_pi")
+
+
+def rollup_table_name(table: str, resolution: str) -> str:
+    """Name of the rollup table of table at resolution, e.g. sensehat_1m"""
+    return f"{table}_{resolution}"
+
+
+def rollup_fields(table: str) -> Tuple[str, ...]:
+    """Raw value columns that are aggregated"""
+    return TABLE_COLUMNS[table][2:]
+
+
+def source_interval(table: str) -> float:
+    """Seconds between the raw rows of table: the sampling interval of its source"""
+    return {"sensehat": Config.SENSEHAT_INTERVAL, "raspberry_pi": Config.SYSTEM_INTERVAL}[table]
+
+
+def select_resolution(start: datetime, end: datetime, raw_interval: float, max_points: int = 1000) -> str:
+    """Pick the finest resolution ("raw", "1m" or "1h") that returns at most max_points rows per device"""
+    span = (end - start).total_seconds()
+    if raw_interval > 0 and span / raw_interval <= max_points:
+        return "raw"
+    for resolution, (_, seconds) in ROLLUP_RESOLUTIONS.items():
+        if span / seconds <= max_points:
+            return resolution
+    return list(ROLLUP_RESOLUTIONS)[-1]
+
+
+def safe_bound(last_id: int, pending: Optional[Tuple[int, int]], max_id: int,
+               xmin: int, xmax: int) -> Tuple[int, Optional[Tuple[int, int]]]:
+    """Highest id that can be folded in, and the (pending_id, pending_xmax) to keep
+    
+    max_id, xmin and xmax come from one snapshot: the largest visible id, the
+    oldest transaction still in flight and the first transaction not yet started.
+    """
+    if xmin >= xmax:
+        # Nothing in flight: every id up to max_id is committed or rolled back
+        return max(last_id, max_id), None
+    bound = last_id
+    if pending is not None and xmin >= pending[1]:
+        # Every transaction in flight when pending_id was read has finished
+        bound = max(last_id, pending[0])
+        pending = None
+    if pending is None and max_id > bound:
+        pending = (max_id, xmax)
+    return bound, pending
+
+
+def resolution_table(table: str, start: datetime, end: datetime, max_points: int = 1000,
+                     raw_interval: Optional[float] = None) -> str:
+    """Table to query for a time range: the raw table or one of its rollups
+    
+    raw_interval defaults to the sampling interval of the table's source.
+    """
+    if raw_interval is None:
+        raw_interval = source_interval(table)
+    resolution = select_resolution(start, end, raw_interval, max_points)
+    return table if resolution == "raw" else rollup_table_name(table, resolution)
+
+
+class Rollups:
+    """Creates and incrementally updates the rollup tables"""
+    
+    def __init__(self, db, chunk_size: int = 50000):
+        self.db = db
+        self.chunk_size = chunk_size
+    
+    def init_tables(self):
+        """Create the rollup tables and the watermark table"""
+        conn = self.db.get_connection()
+        cur = conn.cursor()
+        
+        try:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS rollup_state (
+                    rollup VARCHAR(64) PRIMARY KEY,
+                    last_id BIGINT NOT NULL
+                )
+            """)
+            # MAX(id) read while transactions were in flight, and the xmax of its snapshot
+            cur.execute("ALTER TABLE rollup_state ADD COLUMN IF NOT EXISTS pending_id BIGINT")
+            cur.execute("ALTER TABLE rollup_state ADD COLUMN IF NOT EXISTS pending_xmax BIGINT")
+            for table in ROLLUP_SOURCES:
+                columns = ",\n                    ".join(
+                    f"{field}_{stat} FLOAT" for field in rollup_fields(table) for stat in ("avg", "min", "max")
+                )
+                columns += "".join(
+                    f",\n                    {field}_count INTEGER" for field in rollup_fields(table)
+                )
+                for resolution in ROLLUP_RESOLUTIONS:
+                    # device_id is '' for rows logged without a DEVICE_ID
+                    cur.execute("""
+                        CREATE TABLE IF NOT EXISTS {} (
+                            timestamp TIMESTAMP NOT NULL,
+                            device_id VARCHAR(50) NOT NULL DEFAULT '',
+                            sample_count INTEGER NOT NULL,
+                            {},
+                            PRIMARY KEY (timestamp, device_id)
+                        )
+                    """.format(rollup_table_name(table, resolution), columns))
+                    # Tables created before the per-field counts fall back to sample_count
+                    for field in rollup_fields(table):
+                        cur.execute("ALTER TABLE {} ADD COLUMN IF NOT EXISTS {}_count INTEGER".format(
+                            rollup_table_name(table, resolution), field))
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            cur.close()
+            self.db.release_connection()
+    
+    def update(self) -> Dict[str, int]:
+        """Fold all raw rows inserted since the last run into every rollup table
+        
+        Returns the number of buckets written per rollup table.
+        """
+        written = {}
+        for table in ROLLUP_SOURCES:
+            for resolution in ROLLUP_RESOLUTIONS:
+                rollup = rollup_table_name(table, resolution)
+                written[rollup] = self._update_rollup(table, resolution)
+        return written
+    
+    def _update_rollup(self, table: str, resolution: str) -> int:
+        """Process new committed rows of table in chunks of chunk_size ids, one transaction per chunk"""
+        rollup = rollup_table_name(table, resolution)
+        conn = self.db.get_connection()
+        cur = conn.cursor()
+        written = 0
+        
+        try:
+            cur.execute("SELECT last_id, pending_id, pending_xmax FROM rollup_state WHERE rollup = %s", (rollup,))
+            row = cur.fetchone()
+            last_id = row[0] if row else 0
+            stored = (row[1], row[2]) if row and row[1] is not None else None
+            # The newest id and the transactions in flight, from the same snapshot
+            cur.execute(
+                "SELECT COALESCE(MAX(id), 0), "
+                "pg_snapshot_xmin(pg_current_snapshot())::text::bigint, "
+                "pg_snapshot_xmax(pg_current_snapshot())::text::bigint FROM {}".format(table)
+            )
+            max_id, xmin, xmax = cur.fetchone()
+            conn.commit()
+            
+            bound, pending = safe_bound(last_id, stored, max_id, xmin, xmax)
+            pending_id, pending_xmax = pending if pending else (None, None)
+            while True:
+                upper = min(last_id + self.chunk_size, bound)
+                if upper > last_id:
+                    cur.execute(self._upsert_sql(table, resolution), (last_id, upper))
+                    written += max(cur.rowcount, 0)
+                elif pending == stored:
+                    break
+                cur.execute(
+                    "INSERT INTO rollup_state (rollup, last_id, pending_id, pending_xmax) VALUES (%s, %s, %s, %s) "
+                    "ON CONFLICT (rollup) DO UPDATE SET last_id = EXCLUDED.last_id, "
+                    "pending_id = EXCLUDED.pending_id, pending_xmax = EXCLUDED.pending_xmax",
+                    (rollup, upper, pending_id, pending_xmax),
+                )
+                # The aggregates and the watermark commit together, so no row is counted twice
+                conn.commit()
+                last_id, stored = upper, pending
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            cur.close()
+            self.db.release_connection()
+        return written
+    
+    def _upsert_sql(self, table: str, resolution: str) -> str:
+        """Aggregate raw rows with last_id < id <= upper and merge them into existing buckets"""
+        unit = ROLLUP_RESOLUTIONS[resolution][0]
+        fields = rollup_fields(table)
+        columns = ["timestamp", "device_id", "sample_count"]
+        aggregates = ["date_trunc('{}', timestamp)".format(unit), "COALESCE(device_id, '')", "COUNT(*)"]
+        updates = ["sample_count = r.sample_count + EXCLUDED.sample_count"]
+        for field in fields:
+            stored_count = f"COALESCE(r.{field}_count, r.sample_count)"
+            columns += [f"{field}_avg", f"{field}_min", f"{field}_max", f"{field}_count"]
+            aggregates += [f"AVG({field})", f"MIN({field})", f"MAX({field})", f"COUNT({field})"]
+            updates += [
+                # Mean of the stored and the new part of the bucket, weighted by their non-null values
+                f"{field}_avg = CASE WHEN r.{field}_avg IS NULL THEN EXCLUDED.{field}_avg "
+                f"WHEN EXCLUDED.{field}_avg IS NULL THEN r.{field}_avg "
+                f"ELSE (r.{field}_avg * {stored_count} + EXCLUDED.{field}_avg * EXCLUDED.{field}_count) "
+                f"/ ({stored_count} + EXCLUDED.{field}_count) END",
+                f"{field}_min = LEAST(r.{field}_min, EXCLUDED.{field}_min)",
+                f"{field}_max = GREATEST(r.{field}_max, EXCLUDED.{field}_max)",
+                f"{field}_count = {stored_count} + EXCLUDED.{field}_count",
+            ]
+        return """
+            INSERT INTO {rollup} AS r ({columns})
+            SELECT {aggregates} FROM {table}
+            WHERE id > %s AND id <= %s
+            GROUP BY 1, 2
+            ON CONFLICT (timestamp, device_id) DO UPDATE SET {updates}
+        """.format(
+            rollup=rollup_table_name(table, resolution),
+            columns=", ".join(columns),
+            aggregates=", ".join(aggregates),
+            table=table,
+            updates=", ".join(updates),
+        )
+
+
+class RollupWorker(threading.Thread):
+    """Background thread that keeps the rollup tables up to date"""
+    
+    def __init__(self, rollups: Rollups, interval: float = 60.0):
+        super().__init__(name="rollup-worker", daemon=True)
+        self.rollups = rollups
+        self.interval = interval
+        self._tables_ready = False
+        self._stop_event = threading.Event()
+    
+    def run(self):
+        while not self._stop_event.is_set():
+            self._stop_event.wait(self.step())
+    
+    def step(self) -> float:
+        """Update the rollups once; returns the seconds to wait before the next update"""
+        try:
+            if not self._tables_ready:
+                self.rollups.db.ensure_schema()
+                self.rollups.init_tables()
+                self._tables_ready = True
+            written = self.rollups.update()
+            if any(written.values()):
+                logger.debug(f"Rollup buckets written: {written}")
+        except Exception as e:
+            logger.error(f"Rollup update failed: {e}")
+        return self.interval
+    
+    def stop(self, timeout: Optional[float] = 5.0):
+        """Stop the rollup thread"""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
@@ -0,0 +1,234 @@
+"""
+On-disk spool for samples that could not be written to PostgreSQL
+
+The spool is a fixed-size ring file: a small header followed by `capacity`
+fixed-size record slots. Records are appended in sequence order; once the file
+is full the oldest record is overwritten. A background SpoolReplayer drains the
+spool back into the database when the connection returns.
+"""
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+logger = logging.getLogger("sense_logger")
+
+# Header: magic, version, capacity, head sequence (oldest record), tail sequence (next record)
+_HEADER = struct.Struct("<8sIIQQ")
+_HEADER_SIZE = 64
+_MAGIC = b"SNSSPOOL"
+_VERSION = 1
+
+# Maximum number of value columns per record (sensehat and raspberry_pi have 15;
+# the wider sensehat_motion aggregates are not spooled)
+MAX_VALUES = 15
+
+# Record: sequence, timestamp (microseconds since the Unix epoch), table id,
+# null bitmap, values, CRC32 of everything before it
+_RECORD = struct.Struct("<QqBxH%ddI" % MAX_VALUES)
+RECORD_SIZE = _RECORD.size
+
+_TABLE_IDS = {"sensehat": 1, "raspberry_pi": 2}
+_TABLE_NAMES = {table_id: table for table, table_id in _TABLE_IDS.items()}
+_EPOCH = datetime(1970, 1, 1)
+
+
+class SpoolRecord(NamedTuple):
+    """A spooled sample: table, original timestamp and value columns"""
+    seq: int
+    table: str
+    timestamp: datetime
+    values: Tuple[Optional[float], ...]
+
+
+class Spool:
+    """Bounded, append-only ring file of fixed-size sample records"""
+    
+    def __init__(self, path: str, capacity: int = 200000, fsync_records: int = 50,
+                 fsync_interval: float = 10.0):
+        self.path = path
+        self.fsync_records = fsync_records
+        self.fsync_interval = fsync_interval
+        self.evicted = 0
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        
+        header = os.pread(self._fd, _HEADER.size, 0)
+        if len(header) == _HEADER.size:
+            magic, version, file_capacity, head, tail = _HEADER.unpack(header)
+            if magic == _MAGIC and version == _VERSION and file_capacity > 0:
+                # Keep the layout of an existing spool so no records are lost
+                self.capacity, self.head, self.tail = file_capacity, head, tail
+                if file_capacity != capacity:
+                    logger.info(f"Spool {path} keeps its existing capacity of {file_capacity} records")
+                return
+            logger.warning(f"Spool {path} has an unknown format, starting a new one")
+        
+        self.capacity, self.head, self.tail = capacity, 0, 0
+        os.ftruncate(self._fd, 0)
+        os.ftruncate(self._fd, _HEADER_SIZE + capacity * RECORD_SIZE)
+        self._write_header()
+        os.fsync(self._fd)
+    
+    def __len__(self) -> int:
+        return self.tail - self.head
+    
+    @staticmethod
+    def accepts(table: str) -> bool:
+        """Whether rows of table fit in a spool record"""
+        return table in _TABLE_IDS
+    
+    def append_rows(self, table: str, rows: Sequence[tuple]):
+        """Append database rows (timestamp, device_id, *values) to the spool"""
+        table_id = _TABLE_IDS[table]
+        with self._lock:
+            for row in rows:
+                self._append(table_id, row[0], row[2:])
+            self._write_header()
+            self._unsynced += len(rows)
+            if (self._unsynced >= self.fsync_records
+                    or time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+    
+    def peek(self, limit: int) -> List[SpoolRecord]:
+        """Return up to limit of the oldest records without removing them"""
+        records = []
+        with self._lock:
+            for seq in range(self.head, min(self.tail, self.head + limit)):
+                data = os.pread(self._fd, RECORD_SIZE, self._offset(seq))
+                record = self._decode(seq, data)
+                if record is not None:
+                    records.append(record)
+                else:
+                    logger.warning(f"Skipping corrupt spool record {seq}")
+        return records
+    
+    def consume(self, seq: int):
+        """Remove all records up to and including seq"""
+        with self._lock:
+            if seq >= self.head:
+                self.head = min(seq + 1, self.tail)
+                self._write_header()
+                self._unsynced += 1
+    
+    def sync(self):
+        """Flush pending records and header to disk"""
+        with self._lock:
+            self._sync()
+    
+    def close(self):
+        """Sync and close the spool file"""
+        with self._lock:
+            if self._fd is not None:
+                self._sync()
+                os.close(self._fd)
+                self._fd = None
+    
+    def _append(self, table_id: int, timestamp: datetime, values: Sequence[Optional[float]]):
+        """Write one record at the tail, evicting the oldest record when full"""
+        if self.tail - self.head >= self.capacity:
+            self.head += 1
+            self.evicted += 1
+        
+        nulls = 0
+        floats = [0.0] * MAX_VALUES
+        for i, value in enumerate(values):
+            if value is None:
+                nulls |= 1 << i
+            else:
+                floats[i] = float(value)
+        delta = timestamp - _EPOCH
+        micros = (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+        
+        packed = _RECORD.pack(self.tail, micros, table_id, nulls, *floats, 0)
+        crc = zlib.crc32(packed[:-4])
+        os.pwrite(self._fd, packed[:-4] + struct.pack("<I", crc), self._offset(self.tail))
+        self.tail += 1
+    
+    def _decode(self, seq: int, data: bytes) -> Optional[SpoolRecord]:
+        """Decode a record, returning None if it is torn or overwritten"""
+        if len(data) != RECORD_SIZE or zlib.crc32(data[:-4]) != struct.unpack("<I", data[-4:])[0]:
+            return None
+        fields = _RECORD.unpack(data)
+        record_seq, micros, table_id, nulls = fields[:4]
+        if record_seq != seq or table_id not in _TABLE_NAMES:
+            return None
+        values = tuple(
+            None if nulls & (1 << i) else value
+            for i, value in enumerate(fields[4:4 + MAX_VALUES])
+        )
+        return SpoolRecord(seq, _TABLE_NAMES[table_id], _EPOCH + timedelta(microseconds=micros), values)
+    
+    def _offset(self, seq: int) -> int:
+        return _HEADER_SIZE + (seq % self.capacity) * RECORD_SIZE
+    
+    def _write_header(self):
+        os.pwrite(self._fd, _HEADER.pack(_MAGIC, _VERSION, self.capacity, self.head, self.tail), 0)
+    
+    def _sync(self):
+        if self._unsynced:
+            os.fsync(self._fd)
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+
+class SpoolReplayer(threading.Thread):
+    """Background thread that drains a spool into the database at a throttled rate"""
+    
+    def __init__(self, spool: Spool, db, rate: float = 500.0, batch_size: int = 200,
+                 poll_interval: float = 5.0, max_backoff: float = 300.0):
+        super().__init__(name="spool-replayer", daemon=True)
+        self.spool = spool
+        self.db = db
+        self.rate = rate
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.replayed = 0
+        self._backoff = poll_interval
+        self._stop_event = threading.Event()
+    
+    def run(self):
+        while not self._stop_event.is_set():
+            self._stop_event.wait(self.step())
+    
+    def step(self) -> float:
+        """Replay one batch; returns the seconds to wait before the next step"""
+        records = self.spool.peek(self.batch_size)
+        if not records:
+            if len(self.spool):
+                # Only corrupt records left in this window, drop them
+                self.spool.consume(self.spool.head + self.batch_size - 1)
+                return 0.0
+            return self.poll_interval
+        
+        try:
+            self.db.replay_records(records)
+        except Exception as e:
+            backoff = self._backoff
+            logger.debug(f"Spool replay failed, retrying in {backoff:.0f}s: {e}")
+            self._backoff = min(backoff * 2, self.max_backoff)
+            return backoff
+        
+        self._backoff = self.poll_interval
+        self.spool.consume(records[-1].seq)
+        self.replayed += len(records)
+        if not len(self.spool):
+            logger.info(f"Spool drained ({self.replayed} samples replayed)")
+        return len(records) / self.rate if self.rate > 0 else 0.0
+    
+    def stop(self, timeout: Optional[float] = 5.0):
+        """Stop the replay thread"""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
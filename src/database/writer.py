@@ -0,0 +1,163 @@
+"""
+Bounded sample queue and background database writer
+
+Sensor readers put timestamped samples into a SampleQueue; a WriterThread
+drains it in batches so a slow database never delays the next sensor read.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, fields, replace
+from datetime import datetime
+from typing import Any, List, Optional
+
+logger = logging.getLogger("sense_logger")
+
+QUEUE_POLICIES = ("block", "drop_oldest", "aggregate")
+
+
+@dataclass
+class Sample:
+    """A sensor reading waiting to be written"""
+    table: str
+    timestamp: datetime
+    data: Any  # SenseHatData or RaspberryPiData
+    count: int = 1  # number of readings averaged into data (aggregate policy)
+
+
+def merge_samples(current: Sample, new: Sample) -> Sample:
+    """Fold new into current as a running mean of every numeric field"""
+    total = current.count + new.count
+    values = {}
+    for field in fields(current.data):
+        old = getattr(current.data, field.name)
+        value = getattr(new.data, field.name)
+        if old is None or value is None:
+            values[field.name] = value if old is None else old
+        elif int in getattr(field.type, "__args__", (field.type,)):
+            # Counts such as cpu_count are not averaged
+            values[field.name] = value
+        else:
+            values[field.name] = old + (value - old) * new.count / total
+    return Sample(current.table, new.timestamp, replace(current.data, **values), total)
+
+
+class SampleQueue:
+    """Thread-safe bounded queue of samples with a configurable backpressure policy"""
+    
+    def __init__(self, maxsize: int = 1000, policy: str = "drop_oldest"):
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown queue policy: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self.aggregated = 0
+        self.max_depth = 0
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+    
+    @property
+    def depth(self) -> int:
+        return len(self._items)
+    
+    def put(self, sample: Sample, timeout: Optional[float] = None) -> bool:
+        """Add a sample, applying the backpressure policy when the queue is full
+        
+        Returns False if the sample was dropped.
+        """
+        with self._lock:
+            if len(self._items) >= self.maxsize:
+                if self.policy == "block":
+                    if not self._not_full.wait_for(lambda: len(self._items) < self.maxsize, timeout):
+                        self.dropped += 1
+                        return False
+                elif self.policy == "aggregate" and self._aggregate(sample):
+                    return True
+                else:
+                    self._items.popleft()
+                    self.dropped += 1
+            
+            self._items.append(sample)
+            if len(self._items) > self.max_depth:
+                self.max_depth = len(self._items)
+            self._not_empty.notify()
+            return True
+    
+    def get_batch(self, max_items: int, timeout: Optional[float] = None) -> List[Sample]:
+        """Remove and return up to max_items samples, waiting up to timeout for the first"""
+        with self._lock:
+            if not self._items:
+                self._not_empty.wait(timeout)
+            batch = []
+            while self._items and len(batch) < max_items:
+                batch.append(self._items.popleft())
+            if batch:
+                self._not_full.notify_all()
+            return batch
+    
+    def stats(self) -> str:
+        return (f"depth={self.depth} max_depth={self.max_depth} "
+                f"dropped={self.dropped} aggregated={self.aggregated}")
+    
+    def _aggregate(self, sample: Sample) -> bool:
+        """Merge sample into the newest queued sample of the same table"""
+        for i in range(len(self._items) - 1, -1, -1):
+            if self._items[i].table == sample.table:
+                self._items[i] = merge_samples(self._items[i], sample)
+                self.aggregated += 1
+                return True
+        return False
+
+
+class WriterThread(threading.Thread):
+    """Drains a SampleQueue into the database in batches"""
+    
+    def __init__(self, queue: SampleQueue, db, batch_size: int = 100, idle_timeout: float = 1.0):
+        super().__init__(name="db-writer", daemon=True)
+        self.queue = queue
+        self.db = db
+        self.batch_size = batch_size
+        self.idle_timeout = idle_timeout
+        self.written = 0
+        self.failed = 0
+        self.writes = 0
+        self.write_seconds = 0.0  # total time spent in write_samples
+        self.last_write_seconds = 0.0
+        self._stop_event = threading.Event()
+    
+    def run(self):
+        while not self._stop_event.is_set() or self.queue.depth:
+            batch = self.queue.get_batch(self.batch_size, timeout=self.idle_timeout)
+            by_table = {}
+            for sample in batch:
+                by_table.setdefault(sample.table, []).append((sample.timestamp, sample.data))
+            for table, samples in by_table.items():
+                start = time.perf_counter()
+                try:
+                    self.db.write_samples(table, samples)
+                    self.written += len(samples)
+                except Exception as e:
+                    self.failed += len(samples)
+                    logger.error(f"Error writing {len(samples)} {table} sample(s): {e}")
+                self._record_write(time.perf_counter() - start)
+            try:
+                # Write out buffered rows that reached DB_BATCH_MAX_AGE even when idle
+                self.db.flush_expired()
+            except Exception as e:
+                logger.error(f"Error flushing buffered samples: {e}")
+    
+    def _record_write(self, seconds: float):
+        self.writes += 1
+        self.write_seconds += seconds
+        self.last_write_seconds = seconds
+    
+    def stop(self, timeout: Optional[float] = 30.0):
+        """Write the remaining queued samples and stop"""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+        if self.is_alive():
+            logger.warning(f"Writer did not finish, {self.queue.depth} samples still queued")
@@ -0,0 +1,10 @@
+"""
+Sample filters that reduce what is written to the database
+"""
+from .deadband import Deadband, DeadbandFilter, create_deadband_filter, parse_deadbands
+from .swinging_door import SwingingDoor, SwingingDoorFilter, reconstruct
+
+__all__ = [
+    'Deadband', 'DeadbandFilter', 'create_deadband_filter', 'parse_deadbands',
+    'SwingingDoor', 'SwingingDoorFilter', 'reconstruct',
+]
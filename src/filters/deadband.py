@@ -0,0 +1,131 @@
+"""
+Deadband filtering of samples before they are written
+
+A sample is only written when at least one of its fields moved beyond that
+field's deadband since the last written sample of the same table, or when
+the heartbeat interval has passed since then. Comparing against the last
+written values (not the last read ones) keeps slow drifts from slipping
+through in steps smaller than the deadband.
+"""
+import math
+from dataclasses import fields
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+# Import config - handle both relative and absolute imports
+try:
+    from config import Config
+except ImportError:
+    from ..config import Config
+
+
+class Deadband(NamedTuple):
+    """Threshold a field must move by before a sample is written"""
+    value: float
+    relative: bool = False  # value is a fraction of the last written value
+    
+    def exceeded(self, last: Any, value: Any) -> bool:
+        """Whether value moved beyond the deadband around last"""
+        if last is None or value is None:
+            return last is not value
+        delta = abs(value - last)
+        limit = self.value * abs(last) if self.relative else self.value
+        return delta > limit
+    
+    @classmethod
+    def parse(cls, text: str) -> "Deadband":
+        """Parse an absolute (0.1) or relative (2%) threshold"""
+        text = text.strip()
+        try:
+            if text.endswith("%"):
+                deadband = cls(float(text[:-1]) / 100, relative=True)
+            else:
+                deadband = cls(float(text))
+        except ValueError:
+            raise ValueError(f"Invalid deadband: {text!r} (use e.g. 0.1 or 2%)")
+        if not deadband.value >= 0:
+            raise ValueError(f"Invalid deadband: {text!r} (must not be negative)")
+        return deadband
+
+
+def parse_deadbands(spec: str) -> Dict[str, Deadband]:
+    """Parse "field=0.1,table.field=2%,..." into deadbands by (table-qualified) field name"""
+    deadbands = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, sep, threshold = item.partition("=")
+        if not sep or not name.strip():
+            raise ValueError(f"Invalid deadband setting: {item!r} (use field=threshold)")
+        deadbands[name.strip()] = Deadband.parse(threshold)
+    return deadbands
+
+
+class DeadbandFilter:
+    """Decides per sample whether it has to be written"""
+    
+    def __init__(self, deadbands: Optional[Dict[str, Deadband]] = None,
+                 default: Deadband = Deadband(0.0), heartbeat: float = 300.0):
+        self.deadbands = deadbands or {}  # by "table.field" or "field"
+        self.default = default  # for fields without their own deadband
+        self.heartbeat = heartbeat  # seconds after which a sample is written regardless (0 = never)
+        self.seen: Dict[str, int] = {}
+        self.stored: Dict[str, int] = {}
+        self._last: Dict[str, Tuple[datetime, Dict[str, Any]]] = {}  # table -> last written sample
+        self._bands: Dict[Tuple[str, str], Deadband] = {}
+    
+    def accept(self, table: str, timestamp: datetime, data: Any) -> bool:
+        """Whether a sample (a dataclass instance) should be written"""
+        return self.accept_values(table, timestamp, {field.name: getattr(data, field.name) for field in fields(data)})
+    
+    def accept_values(self, table: str, timestamp: datetime, values: Dict[str, Any]) -> bool:
+        """Whether a sample given as field values should be written"""
+        self.seen[table] = self.seen.get(table, 0) + 1
+        last = self._last.get(table)
+        if last is not None and not self._due(table, timestamp, values, *last):
+            return False
+        self._last[table] = (timestamp, values)
+        self.stored[table] = self.stored.get(table, 0) + 1
+        return True
+    
+    def compression_ratio(self, table: Optional[str] = None) -> float:
+        """Samples read per sample written, of one table or all tables"""
+        seen = self.seen.get(table, 0) if table else sum(self.seen.values())
+        stored = self.stored.get(table, 0) if table else sum(self.stored.values())
+        return seen / stored if stored else 1.0
+    
+    def stats(self) -> str:
+        return ", ".join(
+            f"{table} {self.stored.get(table, 0)}/{seen} written ({self.compression_ratio(table):.1f}:1)"
+            for table, seen in sorted(self.seen.items())
+        )
+    
+    def _due(self, table: str, timestamp: datetime, values: Dict[str, Any],
+             last_timestamp: datetime, last_values: Dict[str, Any]) -> bool:
+        if self.heartbeat > 0 and (timestamp - last_timestamp).total_seconds() >= self.heartbeat:
+            return True
+        for name, value in values.items():
+            last = last_values.get(name)
+            if isinstance(value, float) and isinstance(last, float) and math.isnan(value) and math.isnan(last):
+                continue
+            if self._deadband(table, name).exceeded(last, value):
+                return True
+        return False
+    
+    def _deadband(self, table: str, name: str) -> Deadband:
+        band = self._bands.get((table, name))
+        if band is None:
+            band = self.deadbands.get(f"{table}.{name}") or self.deadbands.get(name) or self.default
+            self._bands[(table, name)] = band
+        return band
+
+
+def create_deadband_filter() -> Optional[DeadbandFilter]:
+    """Filter configured by DEADBAND_*, None if disabled"""
+    if not Config.DEADBAND_ENABLED:
+        return None
+    return DeadbandFilter(
+        parse_deadbands(Config.DEADBAND),
+        default=Deadband.parse(Config.DEADBAND_DEFAULT),
+        heartbeat=Config.DEADBAND_HEARTBEAT,
+    )
@@ -0,0 +1,166 @@
+"""
+Swinging-door compression of per-field sample streams
+
+Each field is reduced to the corner points of a piecewise-linear curve that
+stays within the field's deviation of every original value. A door keeps
+only the last archived point, the last value and the two slopes bounding
+the corridor, so the state per field is constant however long the stream
+runs. reconstruct() interpolates the corner points back to any timestamps.
+"""
+import math
+from bisect import bisect_left
+from dataclasses import fields
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .deadband import Deadband
+
+try:
+    from utils.ringbuffer import to_epoch
+except ImportError:
+    from ..utils.ringbuffer import to_epoch
+
+# (seconds since the epoch, value); a None value marks the start of a gap
+Point = Tuple[float, Optional[float]]
+
+
+class SwingingDoor:
+    """Swinging-door trending over one field"""
+    
+    def __init__(self, deviation: Deadband = Deadband(0.0), max_interval: float = 0.0):
+        self.deviation = deviation  # relative deviations are taken of the archived value
+        self.max_interval = max_interval  # seconds after which a point is archived regardless (0 = never)
+        self.seen = 0
+        self.kept = 0
+        self._archived: Optional[Tuple[float, float]] = None
+        self._last: Optional[Tuple[float, float]] = None
+        self._limit = 0.0
+        self._upper = math.inf
+        self._lower = -math.inf
+        self._gap = False
+    
+    def add(self, t: float, value: Optional[float]) -> List[Point]:
+        """Feed the next value and return the corner points it completes"""
+        self.seen += 1
+        if value is None or math.isnan(value):
+            points = self.flush()
+            self._archived = self._last = None
+            if not self._gap:
+                self._gap = True
+                points.append(self._keep(t, None))
+            return points
+        self._gap = False
+        if self._archived is None:
+            return [self._archive(t, value)]
+        
+        t0, v0 = self._archived
+        if t <= t0:
+            return []  # out of order
+        upper = min(self._upper, (value + self._limit - v0) / (t - t0))
+        lower = max(self._lower, (value - self._limit - v0) / (t - t0))
+        if lower <= upper and not (self.max_interval and t - t0 > self.max_interval):
+            self._upper, self._lower = upper, lower
+            self._last = (t, value)
+            return []
+        
+        # The corridor closed: the previous value is the corner, and the door restarts there
+        if self._last[0] == t0:
+            return [self._archive(t, value)]
+        points = [self._corner()]
+        last_t, last_value = self._last
+        self._upper = (value + self._limit - last_value) / (t - last_t)
+        self._lower = (value - self._limit - last_value) / (t - last_t)
+        self._last = (t, value)
+        return points
+    
+    def flush(self) -> List[Point]:
+        """Archive the last value if it is not a corner point yet (e.g. at the end of a stream)"""
+        if self._last is None or self._last == self._archived:
+            return []
+        return [self._corner()]
+    
+    def _corner(self) -> Point:
+        """Archive the last value, moved onto the corridor if it lies outside
+        
+        Every value since the archived point is within the deviation of a line
+        whose slope is inside the corridor, and so is the last value itself, so
+        the corner never moves by more than the deviation.
+        """
+        (t0, v0), (t, value) = self._archived, self._last
+        slope = min(max((value - v0) / (t - t0), self._lower), self._upper)
+        return self._archive(t, v0 + slope * (t - t0))
+    
+    def _archive(self, t: float, value: float) -> Point:
+        self._archived = self._last = (t, value)
+        self._limit = self.deviation.value * abs(value) if self.deviation.relative else self.deviation.value
+        self._upper = math.inf
+        self._lower = -math.inf
+        return self._keep(t, value)
+    
+    def _keep(self, t: float, value: Optional[float]) -> Point:
+        self.kept += 1
+        return (t, value)
+
+
+class SwingingDoorFilter:
+    """Swinging doors for every field of every table"""
+    
+    def __init__(self, deviations: Optional[Dict[str, Deadband]] = None,
+                 default: Deadband = Deadband(0.0), max_interval: float = 0.0):
+        self.deviations = deviations or {}  # by "table.field" or "field", as for DeadbandFilter
+        self.default = default
+        self.max_interval = max_interval
+        self.doors: Dict[Tuple[str, str], SwingingDoor] = {}
+    
+    def add(self, table: str, timestamp: datetime, data: Any) -> Dict[str, List[Point]]:
+        """Feed a sample (a dataclass instance); returns the new corner points by field"""
+        values = {field.name: getattr(data, field.name) for field in fields(data)}
+        return self.add_values(table, to_epoch(timestamp), values)
+    
+    def add_values(self, table: str, t: float, values: Dict[str, Optional[float]]) -> Dict[str, List[Point]]:
+        """Feed a sample given as field values at t seconds since the epoch"""
+        points = {}
+        for name, value in values.items():
+            emitted = self._door(table, name).add(t, value)
+            if emitted:
+                points[name] = emitted
+        return points
+    
+    def flush(self, table: str) -> Dict[str, List[Point]]:
+        """Corner points still pending in the doors of table"""
+        points = {}
+        for (door_table, name), door in self.doors.items():
+            if door_table == table:
+                emitted = door.flush()
+                if emitted:
+                    points[name] = emitted
+        return points
+    
+    def stats(self) -> str:
+        return ", ".join(
+            f"{table}.{name} {door.kept}/{door.seen} kept"
+            for (table, name), door in sorted(self.doors.items())
+        )
+    
+    def _door(self, table: str, name: str) -> SwingingDoor:
+        door = self.doors.get((table, name))
+        if door is None:
+            deviation = self.deviations.get(f"{table}.{name}") or self.deviations.get(name) or self.default
+            door = self.doors[(table, name)] = SwingingDoor(deviation, self.max_interval)
+        return door
+
+
+def reconstruct(points: Sequence[Point], times: Sequence[float]) -> List[Optional[float]]:
+    """Values at times interpolated from corner points (None outside them or within a gap)"""
+    corners = [t for t, _ in points]
+    values = []
+    for t in times:
+        i = bisect_left(corners, t)
+        if i < len(corners) and corners[i] == t:
+            values.append(points[i][1])
+        elif i == 0 or i == len(corners) or points[i - 1][1] is None or points[i][1] is None:
+            values.append(None)
+        else:
+            (t0, v0), (t1, v1) = points[i - 1], points[i]
+            values.append(v0 + (v1 - v0) * (t - t0) / (t1 - t0))
+    return values
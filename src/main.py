@@ -1,10 +1,23 @@
 """
 Main entry point for Raspberry Pi Sense HAT Monitor
 """
+import signal
+import sys
 import time
+from typing import List, Optional
 from config import Config
-from database import get_database
+from database import (
+    get_database, Database, PartitionMaintainer, Rollups, RollupWorker, Spool, SpoolReplayer,
+    Sample, SampleQueue, WriterThread,
+)
+from database.partitions import PARTITION_PERIODS
+from database.db import get_pool, utcnow
+from filters import DeadbandFilter, create_deadband_filter
+from utils.instrumentation import timers
 from utils.logger import setup_logger
+from utils.metrics import Metrics, MetricsServer
+from utils.ringbuffer import SampleHistory, create_history
+from utils.scheduler import MultiRateScheduler
 
 # Setup logger
 logger = setup_logger()
@@ -18,6 +31,9 @@ if Config.FAKE_DATA:
 else:
     from sensors import SenseHatReader, SystemReader
 
+# Log scheduler lateness statistics every this many ticks (at DEBUG level)
+STATS_LOG_TICKS = 100
+
 
 def main():
     """Main logging loop"""
@@ -25,8 +41,6 @@ def main():
     sensehat_reader = SenseHatReader()
     system_reader = SystemReader()
     
-    interval = Config.SAMPLE_INTERVAL
-    
     device_info = f" (Device: {Config.DEVICE_ID})" if Config.DEVICE_ID else ""
     mode_info = " [FAKE DATA MODE]" if Config.FAKE_DATA else ""
     logger.info(f"Starting logger{device_info}{mode_info}...")
@@ -34,24 +48,176 @@ def main():
     if not Config.FAKE_DATA and not sensehat_reader.is_available():
         logger.warning("Sense HAT not available, continuing with system metrics only")
     
-    while True:
+    deadband = create_deadband_filter()
+    if deadband is not None:
+        logger.info(f"Deadband filter enabled (heartbeat {deadband.heartbeat:g}s)")
+    if Config.INSTRUMENTATION:
+        timers.enabled = True
+        logger.info("Timing hot-path stages (INSTRUMENTATION)")
+    history = create_history()
+    if history is not None:
+        logger.info(f"Keeping {Config.HISTORY_SECONDS:g}s of samples in memory "
+                    f"({history.nbytes / 1024 / 1024:.1f} MB)")
+    
+    replayer = None
+    if Config.SPOOL_PATH:
+        db.spool = Spool(
+            Config.SPOOL_PATH,
+            capacity=Config.SPOOL_MAX_RECORDS,
+            fsync_records=Config.SPOOL_FSYNC_RECORDS,
+            fsync_interval=Config.SPOOL_FSYNC_INTERVAL,
+        )
+        # The replayer gets its own connection so it never shares a transaction with the main loop
+        replayer = SpoolReplayer(db.spool, Database(batch_size=1), rate=Config.SPOOL_REPLAY_RATE)
+        replayer.start()
+        logger.info(f"Spooling to {Config.SPOOL_PATH} ({len(db.spool)} samples pending)")
+    
+    maintainer = None
+    if Config.DB_PARTITIONING in PARTITION_PERIODS:
+        maintainer = PartitionMaintainer(Database(batch_size=1), Config.DB_PARTITION_MAINTENANCE_INTERVAL)
+        maintainer.start()
+    elif Config.DB_RETENTION_DAYS > 0:
+        logger.warning("DB_RETENTION_DAYS requires DB_PARTITIONING=daily or weekly, no data is dropped")
+    
+    rollup_worker = None
+    if Config.ROLLUP_INTERVAL > 0:
+        rollup_worker = RollupWorker(Rollups(Database(batch_size=1)), Config.ROLLUP_INTERVAL)
+        rollup_worker.start()
+    
+    # systemd stops the service with SIGTERM; turn it into a normal exit so
+    # buffered rows are flushed below
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    
+    # Sensor reads and database writes run in separate threads, joined by a bounded queue
+    queue = SampleQueue(Config.QUEUE_SIZE, Config.QUEUE_POLICY)
+    writer = WriterThread(queue, db)
+    writer.start()
+    
+    metrics = None
+    metrics_server = None
+    if Config.METRICS_PORT:
+        metrics = Metrics(queue, writer, db.spool, deadband=deadband,
+                          timers=timers if timers.enabled else None)
         try:
-            # Read and write Sense HAT data (if available or in fake mode)
-            if Config.FAKE_DATA or sensehat_reader.is_available():
-                try:
-                    sense_data = sensehat_reader.read()
-                    db.write_sensehat_data(sense_data)
-                    logger.debug(f"Wrote Sense HAT: {sense_data}")
-                except Exception as e:
-                    logger.error(f"Sense HAT error: {e}", exc_info=True)
-            
-            # Read and write system metrics
-            system_data = system_reader.read()
-            db.write_raspberry_pi_data(system_data)
-            logger.debug(f"Wrote System: {system_data}")
+            metrics_server = MetricsServer(metrics, Config.METRICS_PORT, Config.METRICS_HOST)
+            metrics_server.start()
+            logger.info(f"Serving metrics on http://{Config.METRICS_HOST}:{Config.METRICS_PORT}/metrics")
+        except OSError as e:
+            logger.error(f"Could not start metrics server: {e}")
+    
+    if Config.IMU_RATE_HZ > 0 and (Config.FAKE_DATA or sensehat_reader.is_available()):
+        # Each Sense HAT row then carries the window means; the full aggregates go to sensehat_motion
+        sensehat_reader.start_imu_capture(Config.IMU_RATE_HZ)
+        logger.info(f"Capturing motion sensors at {Config.IMU_RATE_HZ:g} Hz")
+    
+    try:
+        # One scheduler drives every source at its own rate; the slow-moving
+        # environment and disk readings are refreshed before the rows that reuse them
+        scheduler = MultiRateScheduler(align=Config.SAMPLE_ALIGN, missed=Config.SAMPLE_MISSED_TICKS)
+        if Config.FAKE_DATA or sensehat_reader.is_available():
+            scheduler.add("environment", Config.SENSEHAT_ENV_INTERVAL)
+            scheduler.add("sensehat", Config.SENSEHAT_INTERVAL)
+        scheduler.add("disk", Config.DISK_INTERVAL)
+        scheduler.add("system", Config.SYSTEM_INTERVAL)
+        if metrics is not None:
+            metrics.jobs = scheduler.jobs
+        run_loop(queue, sensehat_reader, system_reader, scheduler, history, metrics, deadband)
+    except (KeyboardInterrupt, SystemExit):
+        logger.info("Stopping logger...")
+    finally:
+        if metrics_server is not None:
+            metrics_server.stop()
+        if deadband is not None:
+            logger.info(f"Deadband filter: {deadband.stats()}")
+        if timers.enabled:
+            log_timers()
+        sensehat_reader.stop_imu_capture()
+        writer.stop()
+        try:
+            db.flush()
         except Exception as e:
-            logger.error(f"Error in main loop: {e}", exc_info=True)
-        time.sleep(interval)
+            logger.error(f"Could not flush buffered data: {e}")
+        if replayer is not None:
+            replayer.stop()
+            replayer.db.close()
+        if maintainer is not None:
+            maintainer.stop()
+            maintainer.db.close()
+        if rollup_worker is not None:
+            rollup_worker.stop()
+            rollup_worker.rollups.db.close()
+        if db.spool is not None:
+            db.spool.close()
+        db.close()
+        get_pool().closeall()
+
+
+def run_loop(queue: SampleQueue, sensehat_reader, system_reader, scheduler: MultiRateScheduler,
+             history: Optional[SampleHistory] = None, metrics: Optional[Metrics] = None,
+             deadband: Optional[DeadbandFilter] = None):
+    """Read each source when its schedule is due and queue the samples for the writer"""
+    ticks = 0
+    log_interval = Config.INSTRUMENTATION_LOG_INTERVAL
+    next_timer_log = time.monotonic() + log_interval
+    while True:
+        with timers.time("loop.sleep"):
+            due = scheduler.wait()
+        for source, tick in due:
+            if tick.missed:
+                logger.warning(f"Sampling {source} overran, {tick.missed} tick(s) missed "
+                               f"({scheduler.missed_policy}, lateness {tick.lateness:.3f}s)")
+            try:
+                with timers.time(f"loop.read.{source}"):
+                    samples = read_source(source, sensehat_reader, system_reader)
+            except Exception as e:
+                logger.error(f"Error reading {source}: {e}", exc_info=True)
+                continue
+            for sample in samples:
+                if history is not None:
+                    history.record(sample.table, sample.timestamp, sample.data)
+                if metrics is not None:
+                    metrics.observe(sample.table, sample.timestamp, sample.data)
+                # The history and metrics see every sample, only the database write is suppressed
+                if deadband is None or deadband.accept(sample.table, sample.timestamp, sample.data):
+                    queue.put(sample)
+        
+        ticks += 1
+        if ticks % STATS_LOG_TICKS == 0:
+            for source, job in scheduler.jobs.items():
+                logger.debug(f"Scheduler {source}: {job.stats}")
+            logger.debug(f"Queue: {queue.stats()}")
+            if deadband is not None:
+                logger.debug(f"Deadband filter: {deadband.stats()}")
+        if timers.enabled and log_interval > 0 and time.monotonic() >= next_timer_log:
+            next_timer_log += log_interval
+            log_timers()
+
+
+def log_timers():
+    """Log the time spent per stage since startup"""
+    for line in timers.summary():
+        logger.info(f"Stage {line}")
+
+
+def read_source(source: str, sensehat_reader, system_reader) -> List[Sample]:
+    """Read one source and return the samples to queue (none for environment and disk)"""
+    samples = []
+    if source == "environment":
+        sensehat_reader.read_environment()
+    elif source == "sensehat":
+        sense_data = sensehat_reader.read(refresh_environment=False)
+        timestamp = utcnow()
+        samples.append(Sample("sensehat", timestamp, sense_data))
+        logger.debug(f"Queued Sense HAT: {sense_data}")
+        if sensehat_reader.last_motion is not None:
+            samples.append(Sample("sensehat_motion", timestamp, sensehat_reader.last_motion))
+    elif source == "disk":
+        system_reader.read_disk()
+    elif source == "system":
+        system_data = system_reader.read(refresh_disk=False)
+        samples.append(Sample("raspberry_pi", utcnow(), system_data))
+        logger.debug(f"Queued System: {system_data}")
+    return samples
 
 
 if __name__ == "__main__":
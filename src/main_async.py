@@ -0,0 +1,263 @@
+"""
+asyncio entry point for Raspberry Pi Sense HAT Monitor
+
+Runs the whole logger on one event loop instead of a thread per concern:
+every source is sampled on its own deadline grid (a Sense HAT task and a
+system task, each refreshing the slow-moving readings first), blocking
+I2C and psutil reads run in a small executor, rows are written over an
+asynchronous database connection and the spool replay, partition and rollup
+jobs run as tasks. A slow database round trip never delays a sensor read.
+"""
+import asyncio
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from config import Config
+from database import (
+    get_database, AsyncDatabase, AsyncWriter, Database, PartitionMaintainer, Rollups, RollupWorker,
+    Spool, SpoolReplayer, Sample, SampleQueue,
+)
+from database.partitions import PARTITION_PERIODS
+from database.db import get_pool, utcnow
+from filters import DeadbandFilter, create_deadband_filter
+from utils.logger import setup_logger
+from utils.metrics import Metrics, serve_metrics
+from utils.ringbuffer import SampleHistory, create_history
+from utils.scheduler import DeadlineScheduler
+
+# Setup logger
+logger = setup_logger()
+
+# Import sensor readers based on mode
+if Config.FAKE_DATA:
+    from sensors.fake import FakeSenseHatReader, FakeSystemReader
+    SenseHatReader = FakeSenseHatReader
+    SystemReader = FakeSystemReader
+    logger.info("FAKE_DATA mode enabled - using fake sensor data")
+else:
+    from sensors import SenseHatReader, SystemReader
+
+# Log scheduler lateness statistics every this many seconds (at DEBUG level)
+STATS_LOG_INTERVAL = 300.0
+
+# Sources sampled by one task each, in this order: like MultiRateScheduler in main.py, the
+# environment and disk readings are refreshed before the rows that reuse them when due together
+SOURCE_GROUPS = (("environment", "sensehat"), ("disk", "system"))
+
+
+async def main():
+    """Run the sampling, writer and maintenance tasks until SIGINT or SIGTERM"""
+    db = get_database()
+    sensehat_reader = SenseHatReader()
+    system_reader = SystemReader()
+    
+    device_info = f" (Device: {Config.DEVICE_ID})" if Config.DEVICE_ID else ""
+    mode_info = " [FAKE DATA MODE]" if Config.FAKE_DATA else ""
+    logger.info(f"Starting asyncio logger{device_info}{mode_info}...")
+    
+    sensehat_enabled = Config.FAKE_DATA or sensehat_reader.is_available()
+    if not sensehat_enabled:
+        logger.warning("Sense HAT not available, continuing with system metrics only")
+    
+    deadband = create_deadband_filter()
+    if deadband is not None:
+        logger.info(f"Deadband filter enabled (heartbeat {deadband.heartbeat:g}s)")
+    history = create_history()
+    if history is not None:
+        logger.info(f"Keeping {Config.HISTORY_SECONDS:g}s of samples in memory "
+                    f"({history.nbytes / 1024 / 1024:.1f} MB)")
+    
+    # Sensor reads and blocking writes (schema setup, COPY, spool appends) get their
+    # own executors so slow maintenance jobs never hold them up
+    sensor_executor = ThreadPoolExecutor(Config.ASYNC_SENSOR_WORKERS, thread_name_prefix="sensor-read")
+    write_executor = ThreadPoolExecutor(1, thread_name_prefix="db-write")
+    db_executor = ThreadPoolExecutor(1, thread_name_prefix="db-maintenance")
+    
+    # Background jobs with a step() method; they take turns on the single
+    # maintenance thread, so they can share one Database
+    maintenance_db = Database(batch_size=1)
+    workers = []
+    if Config.SPOOL_PATH:
+        db.spool = Spool(
+            Config.SPOOL_PATH,
+            capacity=Config.SPOOL_MAX_RECORDS,
+            fsync_records=Config.SPOOL_FSYNC_RECORDS,
+            fsync_interval=Config.SPOOL_FSYNC_INTERVAL,
+        )
+        workers.append(SpoolReplayer(db.spool, maintenance_db, rate=Config.SPOOL_REPLAY_RATE))
+        logger.info(f"Spooling to {Config.SPOOL_PATH} ({len(db.spool)} samples pending)")
+    if Config.DB_PARTITIONING in PARTITION_PERIODS:
+        workers.append(PartitionMaintainer(maintenance_db, Config.DB_PARTITION_MAINTENANCE_INTERVAL))
+    elif Config.DB_RETENTION_DAYS > 0:
+        logger.warning("DB_RETENTION_DAYS requires DB_PARTITIONING=daily or weekly, no data is dropped")
+    if Config.ROLLUP_INTERVAL > 0:
+        workers.append(RollupWorker(Rollups(maintenance_db), Config.ROLLUP_INTERVAL))
+    
+    queue = SampleQueue(Config.QUEUE_SIZE, Config.QUEUE_POLICY)
+    writer = AsyncWriter(queue, AsyncDatabase(db, write_executor))
+    
+    if Config.IMU_RATE_HZ > 0 and sensehat_enabled:
+        sensehat_reader.start_imu_capture(Config.IMU_RATE_HZ)
+        logger.info(f"Capturing motion sensors at {Config.IMU_RATE_HZ:g} Hz")
+    
+    readers = source_readers(sensehat_reader, system_reader)
+    jobs: Dict[str, DeadlineScheduler] = {}
+    for source, interval in (
+        ("environment", Config.SENSEHAT_ENV_INTERVAL),
+        ("sensehat", Config.SENSEHAT_INTERVAL),
+        ("disk", Config.DISK_INTERVAL),
+        ("system", Config.SYSTEM_INTERVAL),
+    ):
+        if sensehat_enabled or source not in ("environment", "sensehat"):
+            jobs[source] = DeadlineScheduler(interval, align=Config.SAMPLE_ALIGN, missed=Config.SAMPLE_MISSED_TICKS)
+    
+    metrics = None
+    metrics_server = None
+    if Config.METRICS_PORT:
+        metrics = Metrics(queue, writer, db.spool, jobs, deadband)
+        try:
+            metrics_server = await serve_metrics(metrics, Config.METRICS_PORT, Config.METRICS_HOST)
+            logger.info(f"Serving metrics on http://{Config.METRICS_HOST}:{Config.METRICS_PORT}/metrics")
+        except OSError as e:
+            logger.error(f"Could not start metrics server: {e}")
+    
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    
+    writer_task = asyncio.create_task(writer.run())
+    tasks = []
+    for group in SOURCE_GROUPS:
+        group_jobs = {source: jobs[source] for source in group if source in jobs}
+        if group_jobs:
+            tasks.append(asyncio.create_task(sample_sources(group_jobs, readers, sensor_executor, writer,
+                                                            history, metrics, deadband)))
+    tasks += [asyncio.create_task(run_worker(worker, db_executor)) for worker in workers]
+    tasks.append(asyncio.create_task(log_stats(jobs, queue, deadband)))
+    
+    try:
+        await stop.wait()
+        logger.info("Stopping logger...")
+    finally:
+        if metrics_server is not None:
+            metrics_server.close()
+        if deadband is not None:
+            logger.info(f"Deadband filter: {deadband.stats()}")
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        sensehat_reader.stop_imu_capture()
+        writer.stop()
+        try:
+            await asyncio.wait_for(writer_task, 30)
+        except asyncio.TimeoutError:
+            logger.warning(f"Writer did not finish, {queue.depth} samples still queued")
+        writer.db.close()
+        sensor_executor.shutdown()
+        write_executor.shutdown()
+        db_executor.shutdown()
+        maintenance_db.close()
+        if db.spool is not None:
+            db.spool.close()
+        db.close()
+        get_pool().closeall()
+
+
+def source_readers(sensehat_reader, system_reader) -> Dict[str, Callable[[], List[Sample]]]:
+    """Blocking read functions of every source, each returning the samples to queue"""
+    def read_environment():
+        sensehat_reader.read_environment()
+        return []
+    
+    def read_sensehat():
+        sense_data = sensehat_reader.read(refresh_environment=False)
+        timestamp = utcnow()
+        samples = [Sample("sensehat", timestamp, sense_data)]
+        if sensehat_reader.last_motion is not None:
+            samples.append(Sample("sensehat_motion", timestamp, sensehat_reader.last_motion))
+        return samples
+    
+    def read_disk():
+        system_reader.read_disk()
+        return []
+    
+    def read_system():
+        return [Sample("raspberry_pi", utcnow(), system_reader.read(refresh_disk=False))]
+    
+    return {
+        "environment": read_environment,
+        "sensehat": read_sensehat,
+        "disk": read_disk,
+        "system": read_system,
+    }
+
+
+async def sample_sources(jobs: Dict[str, DeadlineScheduler], readers: Dict[str, Callable[[], List[Sample]]],
+                         executor, writer: AsyncWriter, history: Optional[SampleHistory] = None,
+                         metrics: Optional[Metrics] = None, deadband: Optional[DeadbandFilter] = None):
+    """Read a group of sources on their deadline grids and queue their samples for the writer
+    
+    Sources that are due together are read one after another, in the order of jobs.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(max(0.0, min(job.next_deadline for job in jobs.values()) - time.monotonic()))
+        for source, job in jobs.items():
+            tick = job.poll()
+            if tick is None:
+                continue
+            if tick.missed:
+                logger.warning(f"Sampling {source} overran, {tick.missed} tick(s) missed "
+                               f"({job.missed_policy}, lateness {tick.lateness:.3f}s)")
+            try:
+                samples = await loop.run_in_executor(executor, readers[source])
+            except Exception as e:
+                logger.error(f"Error reading {source}: {e}", exc_info=True)
+                continue
+            for sample in samples:
+                if history is not None:
+                    history.record(sample.table, sample.timestamp, sample.data)
+                if metrics is not None:
+                    metrics.observe(sample.table, sample.timestamp, sample.data)
+                # The history and metrics see every sample, only the database write is suppressed
+                if deadband is None or deadband.accept(sample.table, sample.timestamp, sample.data):
+                    writer.put(sample)
+                logger.debug(f"Queued {sample.table}: {sample.data}")
+
+
+async def run_worker(worker, executor):
+    """Run a background job's step() in the executor, sleeping as long as it asks
+    
+    A step that raises is logged and retried with exponential backoff, so one
+    failure does not end the job.
+    """
+    loop = asyncio.get_running_loop()
+    failures = 0
+    while True:
+        try:
+            delay = await loop.run_in_executor(executor, worker.step)
+            failures = 0
+        except Exception as e:
+            failures += 1
+            delay = min(Config.DB_RECONNECT_BACKOFF_MAX, Config.DB_RECONNECT_BACKOFF_MIN * 2 ** (failures - 1))
+            logger.error(f"{type(worker).__name__} failed, retrying in {delay:g}s: {e}", exc_info=True)
+        await asyncio.sleep(delay)
+
+
+async def log_stats(jobs: Dict[str, DeadlineScheduler], queue: SampleQueue,
+                    deadband: Optional[DeadbandFilter] = None):
+    """Log scheduler, queue and deadband statistics periodically"""
+    while True:
+        await asyncio.sleep(STATS_LOG_INTERVAL)
+        for source, job in jobs.items():
+            logger.debug(f"Scheduler {source}: {job.stats}")
+        logger.debug(f"Queue: {queue.stats()}")
+        if deadband is not None:
+            logger.debug(f"Deadband filter: {deadband.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,140 @@
+"""
+Maintenance commands for Raspberry Pi Sense HAT Monitor
+
+Usage:
+    python manage.py rollup                    # fold new rows into the rollup tables
+    python manage.py resolution sensehat 30d   # table to query for a 30-day range
+    python manage.py migrate-indexes --profile brin
+    python manage.py deadband 7d               # how much the deadband filter would save
+"""
+import argparse
+import sys
+from datetime import timedelta
+
+from config import Config
+from database import Database, Rollups, resolution_table
+from database.indexes import INDEX_PROFILES
+from database.db import TABLE_COLUMNS, utcnow
+from filters import Deadband, DeadbandFilter, parse_deadbands
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+
+
+def parse_duration(value: str) -> timedelta:
+    """Parse a duration such as 90m, 6h, 30d or 52w"""
+    try:
+        return timedelta(**{_UNITS[value[-1]]: float(value[:-1])})
+    except (KeyError, ValueError):
+        raise argparse.ArgumentTypeError(f"Invalid duration: {value} (use e.g. 90m, 6h, 30d, 52w)")
+
+
+def rollup(args) -> int:
+    """Create the rollup tables if needed and bring them up to date"""
+    db = Database(batch_size=1)
+    try:
+        db.ensure_schema()
+        rollups = Rollups(db)
+        rollups.init_tables()
+        for table, written in rollups.update().items():
+            logger.info(f"{table}: {written} bucket(s) written")
+    finally:
+        db.close()
+    return 0
+
+
+def resolution(args) -> int:
+    """Print the table that serves a time range of the given length"""
+    end = utcnow()
+    print(resolution_table(args.table, end - args.range, end, max_points=args.max_points))
+    return 0
+
+
+def migrate_indexes(args) -> int:
+    """Switch the sample tables to an index profile without blocking the logger"""
+    db = Database(batch_size=1)
+    try:
+        changed = db.migrate_indexes(args.profile)
+        logger.info(f"Index profile {args.profile or Config.DB_INDEX_PROFILE}: "
+                    f"{len(changed)} index(es) built or dropped")
+    finally:
+        db.close()
+    return 0
+
+
+def deadband(args) -> int:
+    """Replay stored samples through the deadband filter and report how many it would write"""
+    deadbands = parse_deadbands(Config.DEADBAND if args.deadband is None else args.deadband)
+    default = Deadband.parse(Config.DEADBAND_DEFAULT if args.default is None else args.default)
+    heartbeat = Config.DEADBAND_HEARTBEAT if args.heartbeat is None else args.heartbeat
+    
+    db = Database(batch_size=1)
+    try:
+        conn = db.get_connection()
+        for table in args.tables:
+            columns = TABLE_COLUMNS[table]
+            filters = {}  # one per device, as every logger filters its own samples
+            # Server-side cursor, so long ranges are streamed instead of loaded at once
+            cur = conn.cursor(name=f"deadband_{table}")
+            cur.itersize = 10000
+            cur.execute(
+                "SELECT {} FROM {} WHERE timestamp >= %s ORDER BY device_id, timestamp".format(
+                    ", ".join(columns), table
+                ),
+                (utcnow() - args.range,),
+            )
+            for row in cur:
+                if row[1] not in filters:
+                    filters[row[1]] = DeadbandFilter(deadbands, default, heartbeat)
+                filters[row[1]].accept_values(table, row[0], dict(zip(columns[2:], row[2:])))
+            cur.close()
+            
+            seen = sum(f.seen.get(table, 0) for f in filters.values())
+            stored = sum(f.stored.get(table, 0) for f in filters.values())
+            ratio = f"{seen / stored:.1f}:1" if stored else "n/a"
+            print(f"{table}: {stored} of {seen} samples would be written ({ratio})")
+        conn.commit()
+    finally:
+        db.close()
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    commands.add_parser("rollup", help="update the rollup tables once").set_defaults(func=rollup)
+    
+    parser_resolution = commands.add_parser("resolution", help="pick the table for a time range")
+    parser_resolution.add_argument("table", choices=["sensehat", "raspberry_pi"])
+    parser_resolution.add_argument("range", type=parse_duration, help="range length, e.g. 6h or 30d")
+    parser_resolution.add_argument("--max-points", type=int, default=1000,
+                                   help="maximum rows per device (default: 1000)")
+    parser_resolution.set_defaults(func=resolution)
+    
+    parser_indexes = commands.add_parser("migrate-indexes", help="switch to an index profile")
+    parser_indexes.add_argument("--profile", choices=sorted(INDEX_PROFILES),
+                                help="index profile (default: DB_INDEX_PROFILE)")
+    parser_indexes.set_defaults(func=migrate_indexes)
+    
+    parser_deadband = commands.add_parser("deadband", help="report the deadband filter's compression")
+    parser_deadband.add_argument("range", type=parse_duration, help="stored samples to replay, e.g. 1d or 4w")
+    parser_deadband.add_argument("--tables", nargs="+", choices=sorted(TABLE_COLUMNS),
+                                 default=["sensehat", "raspberry_pi"])
+    parser_deadband.add_argument("--deadband", help="per-field thresholds (default: DEADBAND)")
+    parser_deadband.add_argument("--default", help="threshold of other fields (default: DEADBAND_DEFAULT)")
+    parser_deadband.add_argument("--heartbeat", type=float, help="seconds (default: DEADBAND_HEARTBEAT)")
+    parser_deadband.set_defaults(func=deadband)
+    
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except Exception as e:
+        logger.error(f"{args.command} failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,12 @@
 """
 Data models for Raspberry Pi Sense HAT Monitor
 """
-from .data import SenseHatData, RaspberryPiData
-
-__all__ = ['SenseHatData', 'RaspberryPiData']
+from .data import SenseHatData, RaspberryPiData, SenseHatMotionData
+from .batch import SampleBatch, SenseHatBatch, RaspberryPiBatch, SenseHatMotionBatch
+from .codec import RecordCodec, RecordReader, RecordWriter
 
+__all__ = [
+    'SenseHatData', 'RaspberryPiData', 'SenseHatMotionData',
+    'SampleBatch', 'SenseHatBatch', 'RaspberryPiBatch', 'SenseHatMotionBatch',
+    'RecordCodec', 'RecordReader', 'RecordWriter',
+]
@@ -0,0 +1,157 @@
+"""
+Columnar batches of samples
+
+A batch stores many samples of one model as a struct of arrays: the
+timestamps as microseconds since the Unix epoch in an array('q') and every
+field as an array('d') (None stored as NaN), instead of one Python object
+per sample and per value. Batches grow by appending, slice like lists and
+convert to and from (timestamp, model) pairs, database rows and NumPy arrays.
+"""
+import math
+from array import array
+from dataclasses import fields
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .data import RaspberryPiData, SenseHatData, SenseHatMotionData
+
+_EPOCH = datetime(1970, 1, 1)
+_NAN = float("nan")
+
+
+def _micros(timestamp) -> int:
+    """Microseconds since the Unix epoch of a naive UTC datetime or of epoch seconds"""
+    if not isinstance(timestamp, datetime):
+        return round(float(timestamp) * 1000000)
+    delta = timestamp - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def _column(values) -> array:
+    """array('d') of a sequence, copied in one go from NumPy arrays and other buffers"""
+    if hasattr(values, "astype") and hasattr(values, "tobytes"):
+        column = array('d')
+        column.frombytes(values.astype("float64").tobytes())
+        return column
+    return array('d', (_NAN if value is None else value for value in values))
+
+
+class SampleBatch:
+    """Struct-of-arrays container for samples of one model (see the subclasses)"""
+    
+    model: type = None
+    table: str = None
+    
+    def __init__(self):
+        self.field_names: Tuple[str, ...] = tuple(field.name for field in fields(self.model))
+        # Integer fields (e.g. cpu_count) are stored as doubles and converted back
+        self._int_fields = frozenset(
+            field.name for field in fields(self.model)
+            if int in getattr(field.type, "__args__", (field.type,))
+        )
+        self.timestamps = array('q')  # microseconds since the Unix epoch
+        self.columns: Dict[str, array] = {name: array('d') for name in self.field_names}
+    
+    def __len__(self) -> int:
+        return len(self.timestamps)
+    
+    def __getitem__(self, index):
+        """A (timestamp, model) pair, or a new batch for a slice"""
+        if isinstance(index, slice):
+            batch = type(self)()
+            batch.timestamps = self.timestamps[index]
+            batch.columns = {name: column[index] for name, column in self.columns.items()}
+            return batch
+        return self.timestamp(index), self.sample(index)
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the arrays' contents"""
+        return len(self) * (self.timestamps.itemsize + len(self.columns) * array('d').itemsize)
+    
+    def append(self, timestamp: datetime, data: Any):
+        """Add a sample (a model instance)"""
+        self.timestamps.append(_micros(timestamp))
+        for name, column in self.columns.items():
+            value = getattr(data, name)
+            column.append(_NAN if value is None else value)
+    
+    def extend(self, samples: Iterable[Tuple[datetime, Any]]):
+        """Add (timestamp, model) samples"""
+        for timestamp, data in samples:
+            self.append(timestamp, data)
+    
+    def timestamp(self, index: int) -> datetime:
+        return _EPOCH + timedelta(microseconds=self.timestamps[index])
+    
+    def sample(self, index: int) -> Any:
+        """The model instance of one sample"""
+        return self.model(**{name: self._value(name, column[index]) for name, column in self.columns.items()})
+    
+    def to_models(self) -> List[Tuple[datetime, Any]]:
+        """All samples as (timestamp, model) pairs"""
+        return [self[i] for i in range(len(self))]
+    
+    @classmethod
+    def from_models(cls, samples: Iterable[Tuple[datetime, Any]]) -> "SampleBatch":
+        batch = cls()
+        batch.extend(samples)
+        return batch
+    
+    @classmethod
+    def from_columns(cls, timestamps: Sequence[Any],
+                     columns: Dict[str, Sequence[Optional[float]]]) -> "SampleBatch":
+        """Build a batch from one sequence (list or NumPy array) per field
+        
+        Timestamps are naive UTC datetimes or seconds since the epoch, e.g. the
+        times and one device's columns generated by sensors.fake_batch.FakeFleet.
+        """
+        batch = cls()
+        batch.timestamps = array('q', (_micros(timestamp) for timestamp in timestamps))
+        batch.columns = {name: _column(columns[name]) for name in batch.field_names}
+        if any(len(column) != len(batch.timestamps) for column in batch.columns.values()):
+            raise ValueError("every column needs one value per timestamp")
+        return batch
+    
+    def rows(self, device_id: Optional[str] = None) -> List[tuple]:
+        """Database rows (timestamp, device_id, fields...) in the table's column order"""
+        timestamps = [_EPOCH + timedelta(microseconds=micros) for micros in self.timestamps]
+        values = [
+            [self._value(name, value) for value in column] for name, column in self.columns.items()
+        ]
+        return [(timestamp, device_id) + row for timestamp, row in zip(timestamps, zip(*values))]
+    
+    def to_numpy(self) -> Dict[str, Any]:
+        """The timestamps (datetime64[us]) and columns as NumPy arrays sharing the batch's memory
+        
+        The batch cannot grow while these views exist; delete them (or copy
+        the arrays) before appending more samples.
+        """
+        import numpy as np
+        result = {"timestamp": np.frombuffer(self.timestamps, dtype=np.int64).view("datetime64[us]")}
+        for name, column in self.columns.items():
+            result[name] = np.frombuffer(column, dtype=np.float64)
+        return result
+    
+    def _value(self, name: str, value: float):
+        if math.isnan(value):
+            return None
+        return int(value) if name in self._int_fields else value
+
+
+class SenseHatBatch(SampleBatch):
+    """Batch of SenseHatData samples (sensehat table)"""
+    model = SenseHatData
+    table = "sensehat"
+
+
+class RaspberryPiBatch(SampleBatch):
+    """Batch of RaspberryPiData samples (raspberry_pi table)"""
+    model = RaspberryPiData
+    table = "raspberry_pi"
+
+
+class SenseHatMotionBatch(SampleBatch):
+    """Batch of SenseHatMotionData samples (sensehat_motion table)"""
+    model = SenseHatMotionData
+    table = "sensehat_motion"
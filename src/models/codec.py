@@ -0,0 +1,236 @@
+"""
+Compact binary record format for samples
+
+A record stream is a header followed by fixed-size records of one model:
+
+    header   magic b"SNSREC", version, model id, float width (4 or 8),
+             device id length, device id (UTF-8)
+    record   timestamp (int64 microseconds since the Unix epoch),
+             null bitmap of the Optional fields (only for models that have any),
+             one float32/float64 per float field, one int32 per int field
+
+All values are little-endian. Records have no padding, so a stream read into
+memory can be decoded in place from a memoryview (or viewed as a NumPy
+structured array with RecordCodec.dtype()) without copying. float32 halves the
+size of a record at the cost of about seven significant digits.
+"""
+import struct
+from dataclasses import fields
+from datetime import datetime, timedelta
+from operator import attrgetter
+from typing import Any, BinaryIO, Iterable, Iterator, Optional, Tuple
+
+from .batch import _EPOCH, _micros
+from .data import RaspberryPiData, SenseHatData, SenseHatMotionData
+
+MAGIC = b"SNSREC"
+VERSION = 1
+
+# Header: magic, version, model id, float width, device id length
+_HEADER = struct.Struct("<6sBBBH")
+
+# Model ids (sensehat and raspberry_pi match the spool's table ids)
+MODEL_IDS = {SenseHatData: 1, RaspberryPiData: 2, SenseHatMotionData: 3}
+_MODELS = {model_id: model for model, model_id in MODEL_IDS.items()}
+
+
+class RecordCodec:
+    """Packs and unpacks (timestamp, model) samples as fixed-size records"""
+    
+    def __init__(self, model: type, float_width: int = 8):
+        if model not in MODEL_IDS:
+            raise ValueError(f"No record format for {model.__name__}")
+        if float_width not in (4, 8):
+            raise ValueError("float_width must be 4 or 8")
+        self.model = model
+        self.float_width = float_width
+        
+        model_fields = fields(model)
+        self.field_names = tuple(field.name for field in model_fields)
+        self._int_fields = tuple(
+            int in getattr(field.type, "__args__", (field.type,)) for field in model_fields
+        )
+        # Positions of the Optional fields, bit i of the null bitmap is the i-th of them
+        self._nullable = tuple(
+            i for i, field in enumerate(model_fields) if type(None) in getattr(field.type, "__args__", ())
+        )
+        if len(self._nullable) > 32:
+            raise ValueError("At most 32 Optional fields fit in the null bitmap")
+        
+        nullable = len(self._nullable)
+        bitmap = "" if not nullable else "B" if nullable <= 8 else "H" if nullable <= 16 else "I"
+        float_code = "f" if float_width == 4 else "d"
+        self._struct = struct.Struct(
+            "<q" + bitmap + "".join("i" if is_int else float_code for is_int in self._int_fields)
+        )
+        self.record_size = self._struct.size
+        self._values = attrgetter(*self.field_names)
+    
+    def pack(self, timestamp: datetime, data: Any) -> bytes:
+        return self._struct.pack(*self._fields(timestamp, data))
+    
+    def pack_into(self, buffer, offset: int, timestamp: datetime, data: Any):
+        """Write one record into a writable buffer (bytearray, memoryview, mmap) at offset"""
+        self._struct.pack_into(buffer, offset, *self._fields(timestamp, data))
+    
+    def encode(self, samples: Iterable[Tuple[datetime, Any]]) -> bytearray:
+        """Records of all samples in one preallocated buffer"""
+        samples = list(samples)
+        buffer = bytearray(len(samples) * self.record_size)
+        pack_into = self._struct.pack_into
+        for i, (timestamp, data) in enumerate(samples):
+            pack_into(buffer, i * self.record_size, *self._fields(timestamp, data))
+        return buffer
+    
+    def unpack(self, buffer, offset: int = 0) -> Tuple[datetime, Any]:
+        """The sample of the record at offset of a bytes-like object"""
+        return self._sample(self._struct.unpack_from(buffer, offset))
+    
+    def iter_unpack(self, buffer) -> Iterator[Tuple[datetime, Any]]:
+        """Samples of consecutive records, read in place from a bytes-like object"""
+        if len(buffer) % self.record_size:
+            raise ValueError(
+                f"Buffer of {len(buffer)} bytes is not a whole number of {self.record_size}-byte records"
+            )
+        return map(self._sample, self._struct.iter_unpack(buffer))
+    
+    def dtype(self):
+        """NumPy structured dtype of a record, for np.frombuffer() views of a stream's records"""
+        import numpy as np
+        float_type = "<f4" if self.float_width == 4 else "<f8"
+        layout = [("timestamp", "<i8")]  # microseconds since the Unix epoch
+        if self._nullable:
+            layout.append(("nulls", "<u%d" % (self.record_size - 8 - self._values_size())))
+        layout += [(name, "<i4" if is_int else float_type)
+                   for name, is_int in zip(self.field_names, self._int_fields)]
+        return np.dtype(layout)
+    
+    def _values_size(self) -> int:
+        return sum(4 if is_int else self.float_width for is_int in self._int_fields)
+    
+    def _fields(self, timestamp: datetime, data: Any) -> tuple:
+        values = self._values(data)
+        if not self._nullable:
+            return (_micros(timestamp),) + values
+        nulls = 0
+        values = list(values)
+        for bit, i in enumerate(self._nullable):
+            if values[i] is None:
+                nulls |= 1 << bit
+                values[i] = 0
+        return (_micros(timestamp), nulls, *values)
+    
+    def _sample(self, record: tuple) -> Tuple[datetime, Any]:
+        timestamp = _EPOCH + timedelta(microseconds=record[0])
+        if not self._nullable:
+            return timestamp, self.model(*record[1:])
+        nulls = record[1]
+        values = record[2:]
+        if nulls:
+            values = list(values)
+            for bit, i in enumerate(self._nullable):
+                if nulls & (1 << bit):
+                    values[i] = None
+        return timestamp, self.model(*values)
+
+
+def encode_header(model: type, device_id: Optional[str] = None, float_width: int = 8) -> bytes:
+    device = (device_id or "").encode("utf-8")
+    return _HEADER.pack(MAGIC, VERSION, MODEL_IDS[model], float_width, len(device)) + device
+
+
+def decode_header(buffer) -> Tuple[RecordCodec, Optional[str], int]:
+    """Codec, device id and header length of the stream starting a bytes-like object"""
+    if len(buffer) < _HEADER.size:
+        raise ValueError("Truncated record stream header")
+    magic, version, model_id, float_width, device_length = _HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError("Not a record stream")
+    if version != VERSION:
+        raise ValueError(f"Unsupported record stream version {version}")
+    if model_id not in _MODELS:
+        raise ValueError(f"Unknown model id {model_id}")
+    end = _HEADER.size + device_length
+    if len(buffer) < end:
+        raise ValueError("Truncated record stream header")
+    device_id = bytes(buffer[_HEADER.size:end]).decode("utf-8") or None
+    return RecordCodec(_MODELS[model_id], float_width), device_id, end
+
+
+def decode(buffer) -> Tuple[Optional[str], Iterator[Tuple[datetime, Any]]]:
+    """Device id and samples of a whole stream held in memory, decoded in place"""
+    view = memoryview(buffer)
+    codec, device_id, offset = decode_header(view)
+    return device_id, codec.iter_unpack(view[offset:])
+
+
+class RecordWriter:
+    """Writes a record stream of one model and device to a binary file object"""
+    
+    def __init__(self, file: BinaryIO, model: type, device_id: Optional[str] = None, float_width: int = 8):
+        self.file = file
+        self.codec = RecordCodec(model, float_width)
+        self.device_id = device_id
+        self.count = 0
+        file.write(encode_header(model, device_id, float_width))
+    
+    def write(self, timestamp: datetime, data: Any):
+        self.file.write(self.codec.pack(timestamp, data))
+        self.count += 1
+    
+    def write_many(self, samples: Iterable[Tuple[datetime, Any]]):
+        buffer = self.codec.encode(samples)
+        self.file.write(buffer)
+        self.count += len(buffer) // self.codec.record_size
+    
+    def flush(self):
+        self.file.flush()
+
+
+class RecordReader:
+    """Reads the samples of a record stream from a binary file object, chunk by chunk
+    
+    Records are read into one reused buffer and decoded from a memoryview of
+    it. A torn record at the end of the file (e.g. after a power cut while
+    spooling) ends the stream and sets truncated.
+    """
+    
+    def __init__(self, file: BinaryIO, chunk_records: int = 4096):
+        self.file = file
+        header = self._read(_HEADER.size)
+        if len(header) == _HEADER.size:
+            header += self._read(_HEADER.unpack(header)[4])
+        self.codec, self.device_id, _ = decode_header(header)
+        self.model = self.codec.model
+        self.truncated = False
+        self._buffer = bytearray(chunk_records * self.codec.record_size)
+    
+    def __iter__(self) -> Iterator[Tuple[datetime, Any]]:
+        view = memoryview(self._buffer)
+        record_size = self.codec.record_size
+        while True:
+            filled = self._readinto(view)
+            whole = filled - filled % record_size
+            yield from self.codec.iter_unpack(view[:whole])
+            if filled < len(view):
+                self.truncated = whole != filled
+                return
+    
+    def _read(self, size: int) -> bytes:
+        data = b""
+        while len(data) < size:
+            chunk = self.file.read(size - len(data))
+            if not chunk:
+                break
+            data += chunk
+        return data
+    
+    def _readinto(self, view: memoryview) -> int:
+        """Fill view from the file, returning the bytes read (fewer only at the end of the file)"""
+        filled = 0
+        while filled < len(view):
+            read = self.file.readinto(view[filled:])
+            if not read:
+                break
+            filled += read
+        return filled
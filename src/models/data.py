@@ -1,11 +1,15 @@
 """
 Data models for sensor and system metrics
 """
+import sys
 from dataclasses import dataclass
 from typing import Optional
 
+# dataclass(slots=True) needs Python 3.10; older versions keep an instance __dict__
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_SLOTS)
 class SenseHatData:
     """Model for Sense HAT sensor data"""
     temperature: float
@@ -25,7 +29,7 @@ class SenseHatData:
     compass_z: float
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class RaspberryPiData:
     """Model for Raspberry Pi system metrics"""
     cpu_temp: Optional[float]
@@ -44,3 +48,44 @@ class RaspberryPiData:
     load_avg_5min: float
     load_avg_15min: float
 
+
+@dataclass(**_SLOTS)
+class SenseHatMotionData:
+    """Model for windowed aggregates of high-rate Sense HAT motion samples"""
+    sample_count: int
+    accel_x_mean: float
+    accel_x_min: float
+    accel_x_max: float
+    accel_x_rms: float
+    accel_y_mean: float
+    accel_y_min: float
+    accel_y_max: float
+    accel_y_rms: float
+    accel_z_mean: float
+    accel_z_min: float
+    accel_z_max: float
+    accel_z_rms: float
+    gyro_x_mean: float
+    gyro_x_min: float
+    gyro_x_max: float
+    gyro_x_rms: float
+    gyro_y_mean: float
+    gyro_y_min: float
+    gyro_y_max: float
+    gyro_y_rms: float
+    gyro_z_mean: float
+    gyro_z_min: float
+    gyro_z_max: float
+    gyro_z_rms: float
+    compass_x_mean: float
+    compass_x_min: float
+    compass_x_max: float
+    compass_x_rms: float
+    compass_y_mean: float
+    compass_y_min: float
+    compass_y_max: float
+    compass_y_rms: float
+    compass_z_mean: float
+    compass_z_min: float
+    compass_z_max: float
+    compass_z_rms: float
@@ -3,6 +3,8 @@ Sensor reading modules
 """
 from .sensehat import SenseHatReader
 from .system import SystemReader
+from .cpu import CpuSampler, CpuUsage
+from .imu import ImuWindowSampler
 
-__all__ = ['SenseHatReader', 'SystemReader']
+__all__ = ['SenseHatReader', 'SystemReader', 'CpuSampler', 'CpuUsage', 'ImuWindowSampler']
 
@@ -0,0 +1,85 @@
+"""
+Non-blocking CPU utilisation sampler
+"""
+import os
+from typing import List, NamedTuple, Optional, Tuple
+
+import psutil
+
+
+class CpuUsage(NamedTuple):
+    """CPU utilisation since the previous sample"""
+    percent: float  # overall utilisation in %
+    per_core: List[float]  # utilisation per core in %
+    busy_us: int  # busy CPU time of all cores in microseconds
+    total_us: int  # total CPU time of all cores in microseconds
+
+
+class CpuSampler:
+    """
+    Computes CPU utilisation from the deltas of the kernel's cumulative counters
+    
+    Each call to sample() returns the utilisation since the previous call without
+    sleeping. The first sample is measured against zeroed counters, i.e. it is
+    the average utilisation since boot.
+    """
+    
+    def __init__(self, stat_path: str = "/proc/stat"):
+        self.stat_path = stat_path
+        self._us_per_tick = 1000000 // os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 10000
+        self._previous: Optional[List[Tuple[int, int]]] = None
+        self._last: Optional[CpuUsage] = None
+    
+    def sample(self) -> CpuUsage:
+        """Return the utilisation since the previous call (overall and per core)"""
+        counters = self._read_counters()
+        previous = self._previous
+        if previous is None or len(previous) != len(counters):
+            previous = [(0, 0)] * len(counters)
+        self._previous = counters
+        
+        percents = []
+        for (busy, total), (prev_busy, prev_total) in zip(counters, previous):
+            delta_total = total - prev_total
+            percents.append(100.0 * (busy - prev_busy) / delta_total if delta_total > 0 else None)
+        
+        if percents[0] is None and self._last is not None:
+            # Called again within the same clock tick, nothing new to report
+            return self._last
+        
+        usage = CpuUsage(
+            percent=percents[0] or 0.0,
+            per_core=[p or 0.0 for p in percents[1:]],
+            busy_us=counters[0][0] - previous[0][0],
+            total_us=counters[0][1] - previous[0][1],
+        )
+        self._last = usage
+        return usage
+    
+    def _read_counters(self) -> List[Tuple[int, int]]:
+        """Read (busy, total) CPU time in microseconds, overall first, then per core"""
+        try:
+            with open(self.stat_path, "r") as f:
+                lines = f.read().splitlines()
+        except (FileNotFoundError, IOError):
+            return self._read_psutil_counters()
+        
+        counters = []
+        for line in lines:
+            if not line.startswith("cpu"):
+                break
+            # user nice system idle iowait irq softirq steal (guest time is already in user)
+            fields = [int(value) for value in line.split()[1:9]]
+            total = sum(fields)
+            idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+            counters.append(((total - idle) * self._us_per_tick, total * self._us_per_tick))
+        return counters
+    
+    def _read_psutil_counters(self) -> List[Tuple[int, int]]:
+        """Fallback for systems without /proc/stat"""
+        counters = []
+        for times in [psutil.cpu_times()] + psutil.cpu_times(percpu=True):
+            total = sum(times) - getattr(times, "guest", 0.0) - getattr(times, "guest_nice", 0.0)
+            idle = times.idle + getattr(times, "iowait", 0.0)
+            counters.append((int((total - idle) * 1000000), int(total * 1000000)))
+        return counters
@@ -12,6 +12,8 @@ try:
 except ImportError:
     from ..models import SenseHatData, RaspberryPiData
 
+from .imu import IMU_AXES, ImuWindowSampler
+
 
 class FakeSenseHatReader:
     """Generates fake Sense HAT sensor data"""
@@ -27,6 +29,10 @@ class FakeSenseHatReader:
         self.base_roll = 0.0
         self.base_yaw = 0.0
         
+        self.environment = None
+        self.imu_sampler = None
+        self.last_motion = None
+        
         import logging
         logging.getLogger("sense_logger").info("Fake Sense HAT reader initialized")
     
@@ -34,8 +40,8 @@ class FakeSenseHatReader:
         """Fake Sense HAT is always available"""
         return True
     
-    def read(self) -> SenseHatData:
-        """Generate fake Sense HAT sensor data with realistic variations"""
+    def read_environment(self):
+        """Generate fake temperature, humidity and pressure and cache them for read()"""
         t = time.time() - self.start_time
         
         # Temperature: varies with sine wave (simulating day/night cycle) + noise
@@ -48,6 +54,15 @@ class FakeSenseHatReader:
         # Pressure: slight variations + noise
         pressure = self.base_pressure + random.uniform(-5, 5)
         
+        self.environment = (temp, humidity, pressure)
+        return self.environment
+    
+    def read(self, refresh_environment: bool = True) -> SenseHatData:
+        """Generate fake Sense HAT sensor data with realistic variations"""
+        if refresh_environment or self.environment is None:
+            self.read_environment()
+        temp, humidity, pressure = self.environment
+        
         # Orientation: slow drift with small random variations
         self.base_pitch += random.uniform(-0.5, 0.5)
         self.base_roll += random.uniform(-0.5, 0.5)
@@ -57,20 +72,13 @@ class FakeSenseHatReader:
         roll = self.base_roll + random.uniform(-2, 2)
         yaw = self.base_yaw + random.uniform(-2, 2)
         
-        # Acceleration: simulate small movements (gravity + small vibrations)
-        accel_x = random.uniform(-0.1, 0.1)
-        accel_y = random.uniform(-0.1, 0.1)
-        accel_z = 1.0 + random.uniform(-0.05, 0.05)  # Gravity
-        
-        # Gyroscope: small rotational movements
-        gyro_x = random.uniform(-5, 5)
-        gyro_y = random.uniform(-5, 5)
-        gyro_z = random.uniform(-5, 5)
-        
-        # Magnetometer: simulate compass readings
-        compass_x = random.uniform(-50, 50)
-        compass_y = random.uniform(-50, 50)
-        compass_z = random.uniform(-50, 50)
+        # Motion sensors: window means when capturing at a high rate, otherwise point samples
+        self.last_motion = self.imu_sampler.collect() if self.imu_sampler is not None else None
+        if self.last_motion is not None:
+            axes = [getattr(self.last_motion, f"{axis}_mean") for axis in IMU_AXES]
+        else:
+            axes = self._read_imu_axes()
+        accel_x, accel_y, accel_z, gyro_x, gyro_y, gyro_z, compass_x, compass_y, compass_z = axes
         
         return SenseHatData(
             temperature=round(temp, 2),
@@ -89,6 +97,34 @@ class FakeSenseHatReader:
             compass_y=round(compass_y, 2),
             compass_z=round(compass_z, 2),
         )
+    
+    def start_imu_capture(self, rate_hz: float):
+        """Generate fake motion samples at rate_hz in the background and aggregate them per read()"""
+        self.imu_sampler = ImuWindowSampler(self._read_imu_axes, rate_hz)
+        self.imu_sampler.start()
+    
+    def stop_imu_capture(self):
+        """Stop background motion sample generation"""
+        if self.imu_sampler is not None:
+            self.imu_sampler.stop()
+            self.imu_sampler = None
+    
+    def _read_imu_axes(self):
+        """Generate one fake accelerometer, gyroscope and magnetometer sample in IMU_AXES order"""
+        return (
+            # Acceleration: simulate small movements (gravity + small vibrations)
+            random.uniform(-0.1, 0.1),
+            random.uniform(-0.1, 0.1),
+            1.0 + random.uniform(-0.05, 0.05),  # Gravity
+            # Gyroscope: small rotational movements
+            random.uniform(-5, 5),
+            random.uniform(-5, 5),
+            random.uniform(-5, 5),
+            # Magnetometer: simulate compass readings
+            random.uniform(-50, 50),
+            random.uniform(-50, 50),
+            random.uniform(-50, 50),
+        )
 
 
 class FakeSystemReader:
@@ -101,10 +137,23 @@ class FakeSystemReader:
         self.base_mem_percent = 50.0  # Base memory usage
         self.base_disk_percent = 40.0  # Base disk usage
         
+        self.disk = None
+        
         import logging
         logging.getLogger("sense_logger").info("Fake system reader initialized")
     
-    def read(self) -> RaspberryPiData:
+    def read_disk(self):
+        """Generate fake disk usage (total, used, free GB and percent) and cache it for read()"""
+        disk_total_gb = 32.0  # Fixed total
+        disk_percent = self.base_disk_percent + random.uniform(-1, 1)
+        disk_percent = max(35, min(45, disk_percent))  # Clamp to realistic range
+        disk_used_gb = disk_total_gb * (disk_percent / 100)
+        disk_free_gb = disk_total_gb - disk_used_gb
+        
+        self.disk = (disk_total_gb, disk_used_gb, disk_free_gb, disk_percent)
+        return self.disk
+    
+    def read(self, refresh_disk: bool = True) -> RaspberryPiData:
         """Generate fake system metrics with realistic variations"""
         t = time.time() - self.start_time
         
@@ -129,11 +178,9 @@ class FakeSystemReader:
         mem_available_gb = mem_total_gb - mem_used_gb
         
         # Disk: simulate gradual changes
-        disk_total_gb = 32.0  # Fixed total
-        disk_percent = self.base_disk_percent + random.uniform(-1, 1)
-        disk_percent = max(35, min(45, disk_percent))  # Clamp to realistic range
-        disk_used_gb = disk_total_gb * (disk_percent / 100)
-        disk_free_gb = disk_total_gb - disk_used_gb
+        if refresh_disk or self.disk is None:
+            self.read_disk()
+        disk_total_gb, disk_used_gb, disk_free_gb, disk_percent = self.disk
         
         # Load average: varies with CPU usage
         load_avg_1min = (cpu_percent / 100) * 2 + random.uniform(-0.2, 0.2)
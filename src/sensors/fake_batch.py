@@ -0,0 +1,126 @@
+"""
+Batched fake sensor data for load generation
+
+FakeFleet produces the readings of many virtual devices at once as NumPy
+arrays, with the same day/night sine, noise ranges and random walks as
+FakeSenseHatReader and FakeSystemReader. All values come from one seeded
+generator, so a load test can be repeated exactly. A call covers any number
+of ticks: every field is an array with one row per timestamp and one column
+per device.
+"""
+import time
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+
+Times = Union[float, Sequence[float], np.ndarray]
+
+
+class FakeFleet:
+    """Generates fake Sense HAT and system readings for a fleet of devices"""
+    
+    def __init__(self, devices: int, seed: Optional[int] = None, start_time: Optional[float] = None):
+        if devices <= 0:
+            raise ValueError("devices must be positive")
+        self.devices = devices
+        self.start_time = time.time() if start_time is None else start_time
+        self.rng = np.random.default_rng(seed)
+        
+        # Every device runs its day/night and workload cycles at its own phase
+        self.phase = self.rng.uniform(0, 2 * np.pi, devices)
+        
+        # Orientation random walks, continued from one call to the next
+        self.base_pitch = np.zeros(devices)
+        self.base_roll = np.zeros(devices)
+        self.base_yaw = np.zeros(devices)
+    
+    def sensehat(self, times: Times) -> Dict[str, np.ndarray]:
+        """SenseHatData fields at the given timestamps (seconds since the epoch), each (ticks, devices)"""
+        t = self._elapsed(times)
+        shape = (t.shape[0], self.devices)
+        uniform = self.rng.uniform
+        
+        # Temperature: day/night sine + noise; humidity follows it inversely
+        temperature = 20.0 + 5 * np.sin(t / 3600 + self.phase) + uniform(-1, 1, shape)
+        humidity = np.clip(50.0 - (temperature - 20.0) * 2 + uniform(-3, 3, shape), 20, 80)
+        pressure = 1013.25 + uniform(-5, 5, shape)
+        
+        # Orientation: slow drift with small random variations
+        self.base_pitch, pitch = _walk(self.base_pitch, uniform(-0.5, 0.5, shape))
+        self.base_roll, roll = _walk(self.base_roll, uniform(-0.5, 0.5, shape))
+        self.base_yaw, yaw = _walk(self.base_yaw, uniform(-1, 1, shape))
+        
+        return {
+            "temperature": _round(temperature, 2),
+            "humidity": _round(humidity, 2),
+            "pressure": _round(pressure, 2),
+            "pitch": _round(pitch + uniform(-2, 2, shape), 2),
+            "roll": _round(roll + uniform(-2, 2, shape), 2),
+            "yaw": _round(yaw + uniform(-2, 2, shape), 2),
+            "accel_x": _round(uniform(-0.1, 0.1, shape), 4),
+            "accel_y": _round(uniform(-0.1, 0.1, shape), 4),
+            "accel_z": _round(1.0 + uniform(-0.05, 0.05, shape), 4),
+            "gyro_x": _round(uniform(-5, 5, shape), 2),
+            "gyro_y": _round(uniform(-5, 5, shape), 2),
+            "gyro_z": _round(uniform(-5, 5, shape), 2),
+            "compass_x": _round(uniform(-50, 50, shape), 2),
+            "compass_y": _round(uniform(-50, 50, shape), 2),
+            "compass_z": _round(uniform(-50, 50, shape), 2),
+        }
+    
+    def system(self, times: Times) -> Dict[str, np.ndarray]:
+        """RaspberryPiData fields at the given timestamps (seconds since the epoch), each (ticks, devices)"""
+        t = self._elapsed(times)
+        shape = (t.shape[0], self.devices)
+        uniform = self.rng.uniform
+        
+        cpu_temp = 45.0 + uniform(-3, 8, shape)
+        # CPU usage: workload sine + noise
+        cpu_percent = np.clip(20.0 + 10 * np.sin(t / 60 + self.phase) + uniform(-5, 5, shape), 5, 95)
+        cpu_freq_mhz = 1500 + uniform(-100, 100, shape)
+        
+        mem_total_gb = np.full(shape, 4.0)
+        mem_percent = np.clip(50.0 + uniform(-5, 5, shape), 30, 80)
+        mem_used_gb = mem_total_gb * (mem_percent / 100)
+        
+        disk_total_gb = np.full(shape, 32.0)
+        disk_percent = np.clip(40.0 + uniform(-1, 1, shape), 35, 45)
+        disk_used_gb = disk_total_gb * (disk_percent / 100)
+        
+        # Load average: follows CPU usage
+        load_avg_1min = (cpu_percent / 100) * 2 + uniform(-0.2, 0.2, shape)
+        load_avg_5min = load_avg_1min * 0.9 + uniform(-0.1, 0.1, shape)
+        load_avg_15min = load_avg_5min * 0.95 + uniform(-0.1, 0.1, shape)
+        
+        return {
+            "cpu_temp": _round(cpu_temp, 2),
+            "cpu_percent": _round(cpu_percent, 2),
+            "cpu_count": np.full(shape, 4, dtype=np.int64),
+            "cpu_freq_mhz": _round(cpu_freq_mhz, 2),
+            "mem_total_gb": mem_total_gb,
+            "mem_used_gb": _round(mem_used_gb, 2),
+            "mem_available_gb": _round(mem_total_gb - mem_used_gb, 2),
+            "mem_percent": _round(mem_percent, 2),
+            "disk_total_gb": disk_total_gb,
+            "disk_used_gb": _round(disk_used_gb, 2),
+            "disk_free_gb": _round(disk_total_gb - disk_used_gb, 2),
+            "disk_percent": _round(disk_percent, 2),
+            "load_avg_1min": _round(load_avg_1min, 2),
+            "load_avg_5min": _round(load_avg_5min, 2),
+            "load_avg_15min": _round(load_avg_15min, 2),
+        }
+    
+    def _elapsed(self, times: Times) -> np.ndarray:
+        """Seconds since start_time as a (ticks, 1) column"""
+        return (np.atleast_1d(np.asarray(times, dtype=np.float64)) - self.start_time)[:, None]
+
+
+def _walk(base: np.ndarray, steps: np.ndarray):
+    """Random walk positions after each step; returns the new base and all positions"""
+    positions = base + np.cumsum(steps, axis=0)
+    return positions[-1].copy(), positions
+
+
+def _round(values: np.ndarray, decimals: int) -> np.ndarray:
+    """Round in place, like the scalar readers round every field"""
+    return np.round(values, decimals, out=values)
@@ -0,0 +1,119 @@
+"""
+High-rate IMU capture with windowed aggregates
+
+An ImuWindowSampler polls the accelerometer, gyroscope and magnetometer in a
+background thread and folds every sample into running per-axis aggregates.
+collect() closes the current window and returns its mean, min, max and RMS.
+"""
+import logging
+import math
+import threading
+import time
+from array import array
+from typing import Callable, Optional, Sequence
+
+# Import models - handle both relative and absolute imports
+try:
+    from models import SenseHatMotionData
+except ImportError:
+    from ..models import SenseHatMotionData
+
+# Import scheduler - handle both relative and absolute imports
+try:
+    from utils.scheduler import DeadlineScheduler
+except ImportError:
+    from ..utils.scheduler import DeadlineScheduler
+
+logger = logging.getLogger("sense_logger")
+
+IMU_AXES = (
+    "accel_x", "accel_y", "accel_z",
+    "gyro_x", "gyro_y", "gyro_z",
+    "compass_x", "compass_y", "compass_z",
+)
+
+
+class _Window:
+    """Preallocated per-axis accumulators for one aggregation window"""
+    
+    def __init__(self):
+        size = len(IMU_AXES)
+        self.sum = array("d", bytes(8 * size))
+        self.sum_sq = array("d", bytes(8 * size))
+        self.min = array("d", bytes(8 * size))
+        self.max = array("d", bytes(8 * size))
+        self.count = 0
+    
+    def reset(self):
+        for i in range(len(IMU_AXES)):
+            self.sum[i] = 0.0
+            self.sum_sq[i] = 0.0
+            self.min[i] = math.inf
+            self.max[i] = -math.inf
+        self.count = 0
+    
+    def add(self, values: Sequence[float]):
+        for i, value in enumerate(values):
+            self.sum[i] += value
+            self.sum_sq[i] += value * value
+            if value < self.min[i]:
+                self.min[i] = value
+            if value > self.max[i]:
+                self.max[i] = value
+        self.count += 1
+
+
+class ImuWindowSampler(threading.Thread):
+    """Polls the IMU at a fixed rate and aggregates the samples per window"""
+    
+    def __init__(self, read_axes: Callable[[], Sequence[float]], rate_hz: float):
+        super().__init__(name="imu-sampler", daemon=True)
+        self.read_axes = read_axes
+        self.rate_hz = rate_hz
+        self.errors = 0
+        # Two windows: the sampler fills one while collect() reads the other
+        self._windows = (_Window(), _Window())
+        for window in self._windows:
+            window.reset()
+        self._active = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+    
+    def run(self):
+        scheduler = DeadlineScheduler(1.0 / self.rate_hz, missed="skip")
+        while not self._stop_event.is_set():
+            if scheduler.poll() is None:
+                self._stop_event.wait(max(0.0, scheduler.next_deadline - time.monotonic()))
+                continue
+            try:
+                values = self.read_axes()
+            except Exception as e:
+                self.errors += 1
+                logger.debug(f"IMU read failed: {e}")
+                continue
+            with self._lock:
+                self._windows[self._active].add(values)
+    
+    def collect(self) -> Optional[SenseHatMotionData]:
+        """Close the current window and return its aggregates (None if it is empty)"""
+        with self._lock:
+            window = self._windows[self._active]
+            self._active ^= 1
+            self._windows[self._active].reset()
+        
+        if not window.count:
+            return None
+        n = window.count
+        stats = {"sample_count": n}
+        for i, axis in enumerate(IMU_AXES):
+            stats[f"{axis}_mean"] = window.sum[i] / n
+            stats[f"{axis}_min"] = window.min[i]
+            stats[f"{axis}_max"] = window.max[i]
+            stats[f"{axis}_rms"] = math.sqrt(window.sum_sq[i] / n)
+        return SenseHatMotionData(**stats)
+    
+    def stop(self, timeout: Optional[float] = 2.0):
+        """Stop polling"""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
@@ -1,13 +1,23 @@
 """
 Sense HAT sensor reader
 """
+import threading
+from typing import Optional, Tuple
 from sense_hat import SenseHat
 
 # Import models - handle both relative and absolute imports
 try:
-    from models import SenseHatData
+    from models import SenseHatData, SenseHatMotionData
 except ImportError:
-    from ..models import SenseHatData
+    from ..models import SenseHatData, SenseHatMotionData
+
+# Import instrumentation - handle both relative and absolute imports
+try:
+    from utils.instrumentation import timers
+except ImportError:
+    from ..utils.instrumentation import timers
+
+from .imu import IMU_AXES, ImuWindowSampler
 
 
 class SenseHatReader:
@@ -16,6 +26,13 @@ class SenseHatReader:
     def __init__(self):
         self.sense = None
         self.available = False
+        # Last (temperature, humidity, pressure) reading
+        self.environment: Optional[Tuple[float, float, float]] = None
+        # High-rate motion capture (see start_imu_capture) and its last window
+        self.imu_sampler: Optional[ImuWindowSampler] = None
+        self.last_motion: Optional[SenseHatMotionData] = None
+        # The sampler thread and read() share the I2C bus
+        self._lock = threading.RLock()
         self._initialize()
     
     def _initialize(self):
@@ -38,40 +55,50 @@ class SenseHatReader:
         """Check if Sense HAT is available"""
         return self.available
     
-    def read(self) -> SenseHatData:
-        """Read all Sense HAT sensor data and return as model"""
+    def read_environment(self) -> Tuple[float, float, float]:
+        """Read temperature, humidity and pressure and cache them for read()"""
         if not self.available:
             raise RuntimeError("Sense HAT is not available")
         
-        # Environmental sensors
-        temp = self.sense.get_temperature()
-        hum = self.sense.get_humidity()
-        pres = self.sense.get_pressure()
-
+        with self._lock:
+            with timers.time("sensehat.temperature"):
+                temperature = self.sense.get_temperature()
+            with timers.time("sensehat.humidity"):
+                humidity = self.sense.get_humidity()
+            with timers.time("sensehat.pressure"):
+                pressure = self.sense.get_pressure()
+            self.environment = (temperature, humidity, pressure)
+        return self.environment
+    
+    def read(self, refresh_environment: bool = True) -> SenseHatData:
+        """Read all Sense HAT sensor data and return as model
+        
+        With refresh_environment=False only the motion sensors are read and the
+        environmental values cached by the last read_environment() are reused.
+        """
+        if not self.available:
+            raise RuntimeError("Sense HAT is not available")
+        
+        # Environmental sensors (slow-moving, may be sampled at a lower rate)
+        if refresh_environment or self.environment is None:
+            self.read_environment()
+        temp, hum, pres = self.environment
+        
         # Orientation (requires calibration)
-        orientation = self.sense.get_orientation()
+        with self._lock, timers.time("sensehat.orientation"):
+            orientation = self.sense.get_orientation()
         pitch = orientation.get("pitch")
         roll = orientation.get("roll")
         yaw = orientation.get("yaw")
-
-        # Acceleration (raw)
-        accel_raw = self.sense.get_accelerometer_raw()
-        ax = accel_raw["x"]
-        ay = accel_raw["y"]
-        az = accel_raw["z"]
-
-        # Gyroscope (raw)
-        gyro_raw = self.sense.get_gyroscope_raw()
-        gx = gyro_raw["x"]
-        gy = gyro_raw["y"]
-        gz = gyro_raw["z"]
-
-        # Magnetometer/Compass (raw)
-        compass_raw = self.sense.get_compass_raw()
-        mx = compass_raw["x"]
-        my = compass_raw["y"]
-        mz = compass_raw["z"]
-
+        
+        # Motion sensors: window means when capturing at a high rate, otherwise point reads
+        self.last_motion = self.imu_sampler.collect() if self.imu_sampler is not None else None
+        if self.last_motion is not None:
+            axes = [getattr(self.last_motion, f"{axis}_mean") for axis in IMU_AXES]
+        else:
+            axes = self._read_imu_axes()
+        ax, ay, az, gx, gy, gz, mx, my, mz = axes
+        
         return SenseHatData(
             temperature=temp,
             humidity=hum,
@@ -89,4 +116,34 @@ class SenseHatReader:
             compass_y=my,
             compass_z=mz,
         )
-
+    
+    def start_imu_capture(self, rate_hz: float):
+        """Poll the motion sensors at rate_hz in the background and aggregate them per read()"""
+        if not self.available:
+            raise RuntimeError("Sense HAT is not available")
+        self.imu_sampler = ImuWindowSampler(self._read_imu_axes, rate_hz)
+        self.imu_sampler.start()
+    
+    def stop_imu_capture(self):
+        """Stop background motion sensor polling"""
+        if self.imu_sampler is not None:
+            self.imu_sampler.stop()
+            self.imu_sampler = None
+    
+    def _read_imu_axes(self) -> Tuple[float, ...]:
+        """Read accelerometer, gyroscope and magnetometer in IMU_AXES order"""
+        with self._lock:
+            # Acceleration (raw)
+            with timers.time("sensehat.accelerometer"):
+                accel_raw = self.sense.get_accelerometer_raw()
+            # Gyroscope (raw)
+            with timers.time("sensehat.gyroscope"):
+                gyro_raw = self.sense.get_gyroscope_raw()
+            # Magnetometer/Compass (raw)
+            with timers.time("sensehat.compass"):
+                compass_raw = self.sense.get_compass_raw()
+        return (
+            accel_raw["x"], accel_raw["y"], accel_raw["z"],
+            gyro_raw["x"], gyro_raw["y"], gyro_raw["z"],
+            compass_raw["x"], compass_raw["y"], compass_raw["z"],
+        )
@@ -2,6 +2,7 @@
 Raspberry Pi system metrics reader
 """
 import os
+from typing import Optional, Tuple
 import psutil
 
 # Import models - handle both relative and absolute imports
@@ -10,44 +11,77 @@ try:
 except ImportError:
     from ..models import RaspberryPiData
 
+# Import instrumentation - handle both relative and absolute imports
+try:
+    from utils.instrumentation import timers
+except ImportError:
+    from ..utils.instrumentation import timers
+
+from .cpu import CpuSampler, CpuUsage
+
 
 class SystemReader:
     """Reads Raspberry Pi system metrics"""
     
-    def read(self) -> RaspberryPiData:
-        """Read all system metrics and return as model"""
+    def __init__(self):
+        self.cpu_sampler = CpuSampler()
+        # Utilisation details (including per core) of the most recent read
+        self.last_cpu_usage: Optional[CpuUsage] = None
+        # Last (total GB, used GB, free GB, percent) disk reading
+        self.disk: Optional[Tuple[float, float, float, float]] = None
+    
+    def read_disk(self) -> Tuple[float, float, float, float]:
+        """Read root filesystem usage (total, used, free GB and percent) and cache it for read()"""
+        with timers.time("system.disk"):
+            disk = psutil.disk_usage("/")
+        self.disk = (
+            disk.total / (1024**3),  # GB
+            disk.used / (1024**3),  # GB
+            disk.free / (1024**3),  # GB
+            disk.percent,
+        )
+        return self.disk
+    
+    def read(self, refresh_disk: bool = True) -> RaspberryPiData:
+        """Read all system metrics and return as model
+        
+        With refresh_disk=False the disk usage cached by the last read_disk() is reused.
+        """
         # CPU temperature (Raspberry Pi specific)
         cpu_temp = None
         try:
-            with open("/sys/class/thermal/thermal_zone0/temp", "r") as f:
+            with timers.time("system.cpu_temp"), open("/sys/class/thermal/thermal_zone0/temp", "r") as f:
                 cpu_temp = float(f.read().strip()) / 1000.0  # Convert from millidegrees
         except (FileNotFoundError, IOError):
             pass
         
-        # CPU usage
-        cpu_percent = psutil.cpu_percent(interval=1)
+        # CPU usage since the previous read (non-blocking)
+        with timers.time("system.cpu_percent"):
+            self.last_cpu_usage = self.cpu_sampler.sample()
+        cpu_percent = self.last_cpu_usage.percent
         cpu_count = psutil.cpu_count()
         
         # CPU frequency
-        cpu_freq = psutil.cpu_freq()
+        with timers.time("system.cpu_freq"):
+            cpu_freq = psutil.cpu_freq()
         cpu_freq_current = cpu_freq.current if cpu_freq else None
         
         # Memory
-        mem = psutil.virtual_memory()
+        with timers.time("system.memory"):
+            mem = psutil.virtual_memory()
         mem_total = mem.total / (1024**3)  # GB
         mem_used = mem.used / (1024**3)  # GB
         mem_available = mem.available / (1024**3)  # GB
         mem_percent = mem.percent
         
-        # Disk
-        disk = psutil.disk_usage("/")
-        disk_total = disk.total / (1024**3)  # GB
-        disk_used = disk.used / (1024**3)  # GB
-        disk_free = disk.free / (1024**3)  # GB
-        disk_percent = disk.percent
+        # Disk (slow-moving, may be sampled at a lower rate)
+        if refresh_disk or self.disk is None:
+            self.read_disk()
+        disk_total, disk_used, disk_free, disk_percent = self.disk
         
         # Load average (1, 5, 15 minutes)
-        load_avg = os.getloadavg()
+        with timers.time("system.load_avg"):
+            load_avg = os.getloadavg()
         
         return RaspberryPiData(
             cpu_temp=cpu_temp,
@@ -2,6 +2,11 @@
 Utility modules
 """
 from .logger import setup_logger
+from .ringbuffer import RingBuffer, RingWindow, SampleHistory
+from .scheduler import DeadlineScheduler, MultiRateScheduler, LatenessStats, Tick
 
-__all__ = ['setup_logger']
+__all__ = [
+    'setup_logger', 'RingBuffer', 'RingWindow', 'SampleHistory',
+    'DeadlineScheduler', 'MultiRateScheduler', 'LatenessStats', 'Tick',
+]
 
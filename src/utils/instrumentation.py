@@ -0,0 +1,137 @@
+"""
+Per-stage timers for the logging loop's hot path
+
+Code on the hot path wraps each stage in `with timers.time("stage"):` (one
+sensor call, cursor creation, execute, commit, the scheduler sleep, ...).
+When instrumentation is enabled (INSTRUMENTATION=true) every duration goes
+into a fixed-bucket histogram per stage, which the loop logs every
+INSTRUMENTATION_LOG_INTERVAL seconds and the metrics endpoint exports. When
+disabled, time() returns a shared no-op context manager, so a stage costs a
+method call and a with statement.
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Sequence
+
+# Bucket upper bounds in seconds: powers of two from ~1 us to ~67 s
+DEFAULT_BOUNDS = tuple(2.0 ** exponent for exponent in range(-20, 7))
+
+
+class Histogram:
+    """Counts of durations in fixed buckets, plus their count, sum and maximum
+    
+    Updates are not locked: each stage is timed from one thread at a time, and
+    a rare lost increment between two threads does not matter for profiling.
+    """
+    
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BOUNDS):
+        self.bounds = tuple(bounds)
+        self.reset()
+    
+    def reset(self):
+        # The last bucket counts everything above the largest bound
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def record(self, seconds: float):
+        self.buckets[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+    
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+    
+    def quantile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of durations (capped at the maximum)"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+    
+    def __str__(self) -> str:
+        return (f"n={self.count} mean={self.mean * 1000:.3f}ms p50<={self.quantile(0.5) * 1000:.3f}ms "
+                f"p99<={self.quantile(0.99) * 1000:.3f}ms max={self.max * 1000:.3f}ms")
+
+
+class _NullTimer:
+    """Context manager that does nothing (instrumentation disabled)"""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    """Context manager recording the time spent inside it into a histogram"""
+    
+    __slots__ = ("histogram", "start")
+    
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.record(time.perf_counter() - self.start)
+        return False
+
+
+class StageTimers:
+    """Histograms of the time spent in each named stage"""
+    
+    def __init__(self, enabled: bool = False, bounds: Sequence[float] = DEFAULT_BOUNDS):
+        self.enabled = enabled
+        self.bounds = tuple(bounds)
+        self.histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+    
+    def time(self, stage: str):
+        """Context manager timing a stage (a no-op while disabled)"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self.histogram(stage))
+    
+    def record(self, stage: str, seconds: float):
+        """Record a duration measured elsewhere"""
+        if self.enabled:
+            self.histogram(stage).record(seconds)
+    
+    def histogram(self, stage: str) -> Histogram:
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(stage, Histogram(self.bounds))
+        return histogram
+    
+    def summary(self) -> List[str]:
+        """One line per stage, slowest total time first"""
+        stages = sorted(list(self.histograms.items()), key=lambda item: item[1].total, reverse=True)
+        return [f"{stage}: {histogram}" for stage, histogram in stages if histogram.count]
+    
+    def reset(self):
+        for histogram in list(self.histograms.values()):
+            histogram.reset()
+
+
+# Process-wide timers shared by the sensors, the database and the loop
+timers = StageTimers()
@@ -1,32 +1,148 @@
 """
 Logging utility for Raspberry Pi Sense HAT Monitor
+
+Log calls only put the record on a bounded queue; a QueueListener thread
+formats it and does the console and file I/O, so the sampling thread never
+waits for stdout or the SD card. Repeated warnings and errors are collapsed
+(see DuplicateFilter) and the log file is rotated by size into gzip-compressed
+backups.
 """
+import atexit
+import copy
+import gzip
 import logging
+import logging.handlers
 import os
+import queue
+import re
+import shutil
+import threading
+import time
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
 # Import config - handle both relative and absolute imports
 try:
     from config import Config
 except ImportError:
-    from logger.config import Config
+    from ..config import Config
+
+_DIGITS = re.compile(r"\d+")
+
+# Queue handler and listener of the logger set up last (replaced by the next setup_logger call)
+_queue_handler: Optional["DroppingQueueHandler"] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class DuplicateFilter(logging.Filter):
+    """
+    Collapses repeated warnings and errors
+    
+    Records at WARNING and above with the same level, message (numbers ignored,
+    so "next attempt in 2s" repeats "next attempt in 1s") and exception type
+    pass at most once per interval seconds. The next one that passes carries
+    the number of records suppressed since, e.g. "(last message repeated 59
+    times)". Suppressed records are dropped before their traceback is formatted.
+    """
+    
+    def __init__(self, interval: float = 60.0, max_keys: int = 1000,
+                 clock=time.monotonic):
+        super().__init__()
+        self.interval = interval
+        self.max_keys = max_keys
+        self.suppressed_total = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (time the last record passed, records suppressed since, last suppressed message)
+        self._seen: Dict[Tuple, Tuple[float, int, str]] = {}
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING or self.interval <= 0:
+            return True
+        message = record.getMessage().rstrip()
+        key = (
+            record.name, record.levelno, _DIGITS.sub("#", message),
+            record.exc_info[0] if record.exc_info else None,
+        )
+        now = self._clock()
+        with self._lock:
+            passed_at, suppressed, _ = self._seen.get(key, (None, 0, None))
+            if passed_at is not None and now - passed_at < self.interval:
+                self._seen[key] = (passed_at, suppressed + 1, message)
+                self.suppressed_total += 1
+                return False
+            if len(self._seen) >= self.max_keys:
+                self._prune(now)
+            self._seen[key] = (now, 0, message)
+        if suppressed:
+            record.msg = f"{message} (last message repeated {suppressed} times)"
+            record.args = None
+        return True
+    
+    def pending(self) -> List[str]:
+        """Summaries of the records suppressed since their message last passed"""
+        with self._lock:
+            return [f"{message} (last message repeated {suppressed} times)"
+                    for _, suppressed, message in self._seen.values() if suppressed]
+    
+    def _prune(self, now: float):
+        """Forget keys whose interval is over, keeping the counts that still have to be reported"""
+        for key, (passed_at, suppressed, _) in list(self._seen.items()):
+            if not suppressed and now - passed_at >= self.interval:
+                del self._seen[key]
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full
+    
+    Unlike QueueHandler, records are queued unformatted: the message, its
+    arguments and the exception are only formatted by the listener's handlers.
+    """
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # QueueHandler.prepare() formats the record (including the traceback) on the caller's thread
+        return copy.copy(record)
+    
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def gzip_rotator(source: str, dest: str):
+    """Rotate a log file into a gzip-compressed backup"""
+    with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def gzip_namer(name: str) -> str:
+    return name + ".gz"
 
 
 def setup_logger(name: str = "sense_logger") -> logging.Logger:
     """
-    Setup logger with file and console handlers
+    Setup logger with file and console handlers behind a queue
     
     Args:
         name: Logger name
-        
+    
     Returns:
         Configured logger instance
     """
+    global _queue_handler, _listener
+    
     logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, Config.LOG_LEVEL, logging.INFO))
     
-    # Clear existing handlers
+    # Clear existing handlers and stop their listener
     logger.handlers.clear()
+    stop_logging()
     
     # Create formatter
     formatter = logging.Formatter(
@@ -38,9 +154,11 @@ def setup_logger(name: str = "sense_logger") -> logging.Logger:
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers: List[logging.Handler] = [console_handler]
     
-    # File handler (if LOG_DIR is configured)
+    # Size-rotated file handler with compressed backups (if LOG_DIR is configured)
+    file_error = None
+    log_file = None
     if Config.LOG_DIR:
         try:
             # Create log directory if it doesn't exist
@@ -49,14 +167,54 @@ def setup_logger(name: str = "sense_logger") -> logging.Logger:
             
             # Create file handler
             log_file = log_dir / Config.LOG_FILE
-            file_handler = logging.FileHandler(log_file)
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=Config.LOG_MAX_BYTES, backupCount=Config.LOG_BACKUP_COUNT
+            )
+            file_handler.rotator = gzip_rotator
+            file_handler.namer = gzip_namer
             file_handler.setLevel(logging.DEBUG)
             file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
-            
-            logger.info(f"Logging to file: {log_file}")
+            handlers.append(file_handler)
         except (PermissionError, OSError) as e:
-            logger.warning(f"Could not create log file: {e}. Logging to console only.")
+            file_error = e
+    
+    # The caller's thread only enqueues; the listener thread formats and writes
+    _queue_handler = DroppingQueueHandler(queue.Queue(Config.LOG_QUEUE_SIZE))
+    _queue_handler.set_name(name)
+    _queue_handler.addFilter(DuplicateFilter(Config.LOG_DEDUP_INTERVAL))
+    logger.addHandler(_queue_handler)
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    
+    if log_file is not None:
+        logger.info(f"Logging to file: {log_file}")
+    elif file_error is not None:
+        logger.warning(f"Could not create log file: {file_error}. Logging to console only.")
     
     return logger
 
+
+def stop_logging():
+    """Report suppressed repeats and dropped records, then write out the queue (called at exit)"""
+    global _queue_handler, _listener
+    queue_handler, listener = _queue_handler, _listener
+    _queue_handler = _listener = None
+    if listener is None:
+        return
+    
+    summaries = [(logging.INFO, message) for log_filter in queue_handler.filters
+                 if isinstance(log_filter, DuplicateFilter) for message in log_filter.pending()]
+    if queue_handler.dropped:
+        summaries.append((logging.WARNING, f"{queue_handler.dropped} log records dropped (log queue full)"))
+    # Write out the queue first, then the summaries straight to the handlers
+    listener.stop()
+    for level, message in summaries:
+        listener.handle(logging.makeLogRecord({
+            "name": queue_handler.get_name(), "levelno": level,
+            "levelname": logging.getLevelName(level), "msg": message,
+        }))
+    for handler in listener.handlers:
+        handler.close()
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,187 @@
+"""
+Prometheus metrics endpoint served from memory
+
+Exposes the latest reading of every field and the logger's own health
+(scheduler lateness, queue depth, write latency, spool size) in the
+Prometheus text exposition format. Everything is rendered from state the
+logger already holds, so a scrape never touches the database.
+"""
+import asyncio
+import math
+import threading
+from dataclasses import fields
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from .ringbuffer import to_epoch
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Metrics:
+    """Collects what the logger knows and renders it as Prometheus text"""
+    
+    def __init__(self, queue=None, writer=None, spool=None, jobs=None, deadband=None, timers=None):
+        self.queue = queue  # SampleQueue
+        self.writer = writer  # WriterThread or AsyncWriter
+        self.spool = spool
+        self.jobs = jobs or {}  # source -> DeadlineScheduler
+        self.deadband = deadband  # DeadbandFilter
+        self.timers = timers  # StageTimers
+        self.latest: Dict[str, Tuple[datetime, Any]] = {}  # table -> (timestamp, data)
+    
+    def observe(self, table: str, timestamp: datetime, data: Any):
+        """Remember the newest sample of a table"""
+        self.latest[table] = (timestamp, data)
+    
+    def render(self) -> str:
+        """All metrics in the Prometheus text format"""
+        lines: List[str] = []
+        
+        for table, (timestamp, data) in sorted(self.latest.items()):
+            _metric(lines, f"{table}_timestamp_seconds", "gauge",
+                    f"Time of the latest {table} sample", to_epoch(timestamp))
+            for field in fields(data):
+                _metric(lines, f"{table}_{field.name}", "gauge", None, getattr(data, field.name))
+        
+        if self.jobs:
+            _header(lines, "sense_logger_tick_lateness_seconds", "gauge", "Lateness of the last sampling tick")
+            for source, job in self.jobs.items():
+                _sample(lines, "sense_logger_tick_lateness_seconds", job.stats.last, source=source)
+            _header(lines, "sense_logger_tick_lateness_max_seconds", "gauge", "Largest sampling tick lateness")
+            for source, job in self.jobs.items():
+                _sample(lines, "sense_logger_tick_lateness_max_seconds", job.stats.max, source=source)
+            _header(lines, "sense_logger_ticks_total", "counter", "Sampling ticks fired")
+            for source, job in self.jobs.items():
+                _sample(lines, "sense_logger_ticks_total", job.stats.ticks, source=source)
+            _header(lines, "sense_logger_ticks_missed_total", "counter", "Sampling ticks skipped or coalesced")
+            for source, job in self.jobs.items():
+                _sample(lines, "sense_logger_ticks_missed_total", job.stats.missed, source=source)
+        
+        if self.queue is not None:
+            _metric(lines, "sense_logger_queue_depth", "gauge", "Samples waiting for the writer", self.queue.depth)
+            _metric(lines, "sense_logger_queue_dropped_total", "counter",
+                    "Samples dropped because the queue was full", self.queue.dropped)
+            _metric(lines, "sense_logger_queue_aggregated_total", "counter",
+                    "Samples averaged into a queued sample", self.queue.aggregated)
+        
+        if self.writer is not None:
+            writer = self.writer
+            _metric(lines, "sense_logger_samples_written_total", "counter", "Samples written", writer.written)
+            _metric(lines, "sense_logger_samples_failed_total", "counter", "Samples that failed to write",
+                    writer.failed)
+            _header(lines, "sense_logger_write_duration_seconds", "summary", "Time spent writing sample batches")
+            _sample(lines, "sense_logger_write_duration_seconds_sum", writer.write_seconds)
+            _sample(lines, "sense_logger_write_duration_seconds_count", writer.writes)
+            _metric(lines, "sense_logger_last_write_duration_seconds", "gauge",
+                    "Duration of the last batch write", writer.last_write_seconds)
+        
+        if self.deadband is not None:
+            _header(lines, "sense_logger_deadband_samples_total", "counter", "Samples checked by the deadband filter")
+            for table, seen in sorted(self.deadband.seen.items()):
+                _sample(lines, "sense_logger_deadband_samples_total", seen, table=table)
+            _header(lines, "sense_logger_deadband_written_total", "counter", "Samples passed on to be written")
+            for table, stored in sorted(self.deadband.stored.items()):
+                _sample(lines, "sense_logger_deadband_written_total", stored, table=table)
+        
+        if self.timers is not None:
+            name = "sense_logger_stage_duration_seconds"
+            _header(lines, name, "histogram", "Time spent in each hot-path stage")
+            for stage, histogram in sorted(list(self.timers.histograms.items())):
+                cumulative = 0
+                for bound, count in zip(histogram.bounds, histogram.buckets):
+                    cumulative += count
+                    _sample(lines, f"{name}_bucket", cumulative, stage=stage, le=repr(bound))
+                _sample(lines, f"{name}_bucket", histogram.count, stage=stage, le="+Inf")
+                _sample(lines, f"{name}_sum", histogram.total, stage=stage)
+                _sample(lines, f"{name}_count", histogram.count, stage=stage)
+        
+        if self.spool is not None:
+            _metric(lines, "sense_logger_spool_samples", "gauge", "Samples waiting in the spool", len(self.spool))
+        
+        return "\n".join(lines) + "\n"
+
+
+def _header(lines: List[str], name: str, kind: str, help_text: Optional[str]):
+    if help_text:
+        lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def _sample(lines: List[str], name: str, value, **labels):
+    """Add a sample line, skipping missing values"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return
+    text = str(value) if isinstance(value, int) else repr(float(value))
+    if labels:
+        name += "{" + ",".join(f'{key}="{label}"' for key, label in labels.items()) + "}"
+    lines.append(f"{name} {text}")
+
+
+def _metric(lines: List[str], name: str, kind: str, help_text: Optional[str], value):
+    _header(lines, name, kind, help_text)
+    _sample(lines, name, value)
+
+
+class MetricsServer(threading.Thread):
+    """Background thread serving GET /metrics over HTTP"""
+    
+    def __init__(self, metrics: Metrics, port: int, host: str = "127.0.0.1"):
+        super().__init__(name="metrics-server", daemon=True)
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+    
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+    
+    def run(self):
+        self.server.serve_forever()
+    
+    def stop(self):
+        """Stop serving and close the socket"""
+        if self.is_alive():
+            self.server.shutdown()
+        self.server.server_close()
+
+
+async def serve_metrics(metrics: Metrics, port: int, host: str = "127.0.0.1") -> asyncio.AbstractServer:
+    """Serve GET /metrics from the running event loop"""
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await reader.readline()
+            while (await reader.readline()).strip():
+                pass
+            parts = request.split()
+            if len(parts) >= 2 and parts[0] == b"GET" and parts[1].split(b"?")[0] == b"/metrics":
+                status, body = "200 OK", metrics.render().encode()
+            else:
+                status, body = "404 Not Found", b"Not Found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {CONTENT_TYPE}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    return await asyncio.start_server(handle, host, port)
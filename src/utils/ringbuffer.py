@@ -0,0 +1,157 @@
+"""
+In-memory history of recent samples
+
+Each table keeps its last `capacity` samples in a preallocated columnar ring
+buffer: one array('d') per field plus one for the timestamps (seconds since
+the Unix epoch, UTC). Memory use is fixed when the buffer is created. Every
+value is written twice, at slot i and i + capacity, so any run of recent
+samples is one contiguous slice and can be returned as a memoryview without
+copying, even across the wrap-around point.
+"""
+import math
+import threading
+from array import array
+from bisect import bisect_left
+from dataclasses import fields
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional, Sequence, Tuple
+
+# Import config and models - handle both relative and absolute imports
+try:
+    from config import Config
+    from models import RaspberryPiData, SenseHatData, SenseHatMotionData
+except ImportError:
+    from ..config import Config
+    from ..models import RaspberryPiData, SenseHatData, SenseHatMotionData
+
+_EPOCH = datetime(1970, 1, 1)
+_BYTES_PER_VALUE = array('d').itemsize
+
+
+def to_epoch(timestamp: datetime) -> float:
+    """Seconds since the Unix epoch of a naive UTC datetime"""
+    return (timestamp - _EPOCH).total_seconds()
+
+
+class RingWindow(NamedTuple):
+    """Samples selected from a RingBuffer, oldest first
+    
+    The views share memory with the buffer: they stay valid until that many
+    newer samples have been appended, so copy them (e.g. with list() or
+    array('d', view)) to keep them longer.
+    """
+    timestamps: memoryview  # seconds since the Unix epoch
+    columns: Dict[str, memoryview]  # NaN where the value was None
+
+
+class RingBuffer:
+    """Fixed-size columnar buffer of the last capacity samples"""
+    
+    def __init__(self, columns: Sequence[str], capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.column_names: Tuple[str, ...] = tuple(columns)
+        self._timestamps = array('d', bytes(2 * capacity * _BYTES_PER_VALUE))
+        self._columns = {name: array('d', bytes(2 * capacity * _BYTES_PER_VALUE)) for name in self.column_names}
+        self._next = 0  # slot of the next sample
+        self._count = 0
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the arrays"""
+        return (len(self.column_names) + 1) * 2 * self.capacity * _BYTES_PER_VALUE
+    
+    def append(self, timestamp: float, values: Sequence[Optional[float]]):
+        """Add a sample (values in column order, None stored as NaN)
+        
+        Samples must be appended in timestamp order for window() to work.
+        """
+        with self._lock:
+            i = self._next
+            mirror = i + self.capacity
+            self._timestamps[i] = self._timestamps[mirror] = timestamp
+            for name, value in zip(self.column_names, values):
+                column = self._columns[name]
+                column[i] = column[mirror] = float("nan") if value is None else value
+            self._next = (i + 1) % self.capacity
+            if self._count < self.capacity:
+                self._count += 1
+    
+    def last(self) -> Optional[Tuple[float, Dict[str, float]]]:
+        """Timestamp and values of the newest sample, None while empty"""
+        with self._lock:
+            if not self._count:
+                return None
+            i = (self._next - 1) % self.capacity
+            return self._timestamps[i], {name: column[i] for name, column in self._columns.items()}
+    
+    def last_n(self, n: int) -> RingWindow:
+        """The newest n samples (fewer if the buffer holds fewer)"""
+        with self._lock:
+            return self._slice(min(max(n, 0), self._count), 0)
+    
+    def window(self, start: float, end: Optional[float] = None) -> RingWindow:
+        """Samples with start <= timestamp < end (end defaults to after the newest)"""
+        with self._lock:
+            timestamps = self._slice(self._count, 0).timestamps
+            lo = bisect_left(timestamps, start)
+            hi = len(timestamps) if end is None else max(lo, bisect_left(timestamps, end, lo))
+            return self._slice(hi - lo, len(timestamps) - hi)
+    
+    def _slice(self, n: int, skip: int) -> RingWindow:
+        """n samples ending skip samples before the newest, as views into the mirrored arrays"""
+        stop = self._next + self.capacity - skip
+        start = stop - n
+        return RingWindow(
+            memoryview(self._timestamps)[start:stop],
+            {name: memoryview(column)[start:stop] for name, column in self._columns.items()},
+        )
+
+
+class SampleHistory:
+    """Ring buffers of recent samples per table, filled from the sample dataclasses"""
+    
+    def __init__(self):
+        self.buffers: Dict[str, RingBuffer] = {}
+    
+    def add(self, table: str, model: type, capacity: int) -> RingBuffer:
+        """Keep the last capacity samples of table, with one column per field of model"""
+        buffer = RingBuffer([field.name for field in fields(model)], capacity)
+        self.buffers[table] = buffer
+        return buffer
+    
+    def record(self, table: str, timestamp: datetime, data: Any):
+        """Append a sample of table if its history is kept"""
+        buffer = self.buffers.get(table)
+        if buffer is not None:
+            buffer.append(to_epoch(timestamp), [getattr(data, name) for name in buffer.column_names])
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(buffer.nbytes for buffer in self.buffers.values())
+    
+    def __getitem__(self, table: str) -> RingBuffer:
+        return self.buffers[table]
+
+
+def create_history() -> Optional[SampleHistory]:
+    """History of HISTORY_SECONDS of every table at its sampling interval, None if disabled"""
+    if Config.HISTORY_SECONDS <= 0:
+        return None
+    tables = [
+        ("sensehat", SenseHatData, Config.SENSEHAT_INTERVAL),
+        ("raspberry_pi", RaspberryPiData, Config.SYSTEM_INTERVAL),
+    ]
+    if Config.IMU_RATE_HZ > 0:
+        tables.append(("sensehat_motion", SenseHatMotionData, Config.SENSEHAT_INTERVAL))
+    
+    history = SampleHistory()
+    for table, model, interval in tables:
+        capacity = min(Config.HISTORY_MAX_SAMPLES, math.ceil(Config.HISTORY_SECONDS / interval))
+        history.add(table, model, max(capacity, 1))
+    return history
@@ -0,0 +1,158 @@
+"""
+Drift-free tick scheduler for the sampling loop
+"""
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+MISSED_TICK_POLICIES = ("skip", "coalesce")
+
+
+@dataclass
+class Tick:
+    """One scheduler tick"""
+    index: int
+    deadline: float  # time.monotonic() value the tick was due at
+    lateness: float  # seconds between the deadline and the tick actually firing
+    missed: int  # grid points skipped or coalesced before this tick
+
+
+class LatenessStats:
+    """Running statistics of tick lateness"""
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        """Clear all statistics"""
+        self.ticks = 0
+        self.missed = 0
+        self.last = 0.0
+        self.max = 0.0
+        self.total = 0.0
+    
+    def record(self, lateness: float, missed: int):
+        """Record the lateness of one tick"""
+        self.ticks += 1
+        self.missed += missed
+        self.last = lateness
+        self.total += lateness
+        if lateness > self.max:
+            self.max = lateness
+    
+    @property
+    def mean(self) -> float:
+        return self.total / self.ticks if self.ticks else 0.0
+    
+    def __str__(self) -> str:
+        return (f"ticks={self.ticks} missed={self.missed} lateness "
+                f"last={self.last * 1000:.1f}ms mean={self.mean * 1000:.1f}ms max={self.max * 1000:.1f}ms")
+
+
+class DeadlineScheduler:
+    """
+    Fires ticks on a fixed grid of time.monotonic() deadlines
+    
+    The period does not drift with the time spent between ticks. When the caller
+    overruns one or more deadlines the missed grid points are either skipped
+    (the next tick waits for the next grid point) or coalesced (one tick fires
+    immediately for all of them and the grid continues from there).
+    """
+    
+    def __init__(self, interval: float, align: bool = False, missed: str = "skip",
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep,
+                 wall_clock: Callable[[], float] = time.time):
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        if missed not in MISSED_TICK_POLICIES:
+            raise ValueError(f"Unknown missed tick policy: {missed}")
+        self.interval = interval
+        self.missed_policy = missed
+        self.stats = LatenessStats()
+        self._clock = clock
+        self._sleep = sleep
+        self._index = 0
+        self._missed = 0
+        
+        self.next_deadline = clock()
+        if align:
+            # Start on the next wall-clock multiple of the interval (e.g. :00, :05, ...)
+            self.next_deadline += (interval - wall_clock() % interval) % interval
+    
+    def poll(self) -> Optional[Tick]:
+        """Return the tick if it is due, or None without sleeping"""
+        now = self._clock()
+        deadline = self.next_deadline
+        
+        if now - deadline >= self.interval:
+            # Overrun: at least one later grid point has already passed
+            behind = int((now - deadline) // self.interval)
+            if self.missed_policy == "skip":
+                # Drop every passed grid point and wait for the next one
+                self._missed += behind + 1
+                deadline += (behind + 1) * self.interval
+            else:
+                # Fire one tick right away for the most recent passed grid point
+                self._missed += behind
+                deadline += behind * self.interval
+            self.next_deadline = deadline
+        
+        if now < deadline:
+            return None
+        
+        lateness = now - deadline
+        self.next_deadline = deadline + self.interval
+        tick = Tick(self._index, deadline, lateness, self._missed)
+        self._index += 1
+        self._missed = 0
+        self.stats.record(lateness, tick.missed)
+        return tick
+    
+    def wait(self) -> Tick:
+        """Sleep until the next deadline and return the tick"""
+        while True:
+            tick = self.poll()
+            if tick is not None:
+                return tick
+            self._sleep(max(0.0, self.next_deadline - self._clock()))
+
+
+class MultiRateScheduler:
+    """
+    Runs several DeadlineSchedulers with their own intervals from one loop
+    
+    wait() sleeps until the earliest deadline of all jobs and returns every job
+    that is due, in the order the jobs were added.
+    """
+    
+    def __init__(self, align: bool = False, missed: str = "skip",
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep,
+                 wall_clock: Callable[[], float] = time.time):
+        self.align = align
+        self.missed_policy = missed
+        self.jobs: Dict[str, DeadlineScheduler] = {}
+        self._clock = clock
+        self._sleep = sleep
+        self._wall_clock = wall_clock
+    
+    def add(self, name: str, interval: float) -> DeadlineScheduler:
+        """Add a job that is due every interval seconds"""
+        job = DeadlineScheduler(interval, align=self.align, missed=self.missed_policy,
+                                clock=self._clock, sleep=self._sleep, wall_clock=self._wall_clock)
+        self.jobs[name] = job
+        return job
+    
+    def wait(self) -> List[Tuple[str, Tick]]:
+        """Sleep until at least one job is due and return the due (name, tick) pairs"""
+        while True:
+            due = []
+            for name, job in self.jobs.items():
+                tick = job.poll()
+                if tick is not None:
+                    due.append((name, tick))
+            if due:
+                return due
+            next_deadline = min(job.next_deadline for job in self.jobs.values())
+            self._sleep(max(0.0, next_deadline - self._clock()))
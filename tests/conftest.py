@@ -65,6 +65,29 @@ def mock_psutil():
         yield
 
 
+@pytest.fixture(autouse=True)
+def schema_ready():
+    """Mark the database schema as created so tests only see their own statements"""
+    from src.database import db
+    
+    state = db._schema
+    saved = (state.ready, state.backoff, state.retry_at)
+    state.ready, state.backoff, state.retry_at = True, 0.0, 0.0
+    yield state
+    state.ready, state.backoff, state.retry_at = saved
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool():
+    """Give every test its own connection pool so mocked connections are not shared"""
+    from src.database import db
+    
+    saved = db._pool
+    db._pool = None
+    yield
+    db._pool = saved
+
+
 @pytest.fixture
 def mock_db_connection():
     """Fixture to mock PostgreSQL connection"""
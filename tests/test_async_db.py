@@ -0,0 +1,210 @@
+"""
+Tests for the asynchronous write path
+"""
+import pytest
+import sys
+import os
+import asyncio
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from unittest.mock import patch, AsyncMock, MagicMock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from psycopg2.extensions import POLL_OK, POLL_READ
+
+from src.database import Database, Spool
+from src.database import db as db_module
+from src.database.async_db import AsyncDatabase, AsyncWriter, wait_ready
+from src.database.writer import Sample, SampleQueue
+from src.models import RaspberryPiData
+
+
+def make_data(value=10.0):
+    return RaspberryPiData(
+        cpu_temp=None, cpu_percent=value, cpu_count=4, cpu_freq_mhz=1500.0,
+        mem_total_gb=4.0, mem_used_gb=2.0, mem_available_gb=2.0, mem_percent=50.0,
+        disk_total_gb=32.0, disk_used_gb=16.0, disk_free_gb=16.0, disk_percent=50.0,
+        load_avg_1min=0.5, load_avg_5min=0.6, load_avg_15min=0.7,
+    )
+
+
+def make_conn():
+    """Mock asynchronous connection whose operations complete immediately"""
+    conn = MagicMock()
+    conn.closed = 0
+    conn.poll.return_value = POLL_OK
+    return conn
+
+
+class TestWaitReady:
+    """Tests for driving asynchronous connections"""
+    
+    def test_waits_for_socket(self):
+        """Test the connection is polled again once its socket is readable"""
+        reader, writer = socket.socketpair()
+        conn = MagicMock()
+        conn.fileno.return_value = reader.fileno()
+        conn.poll.side_effect = [POLL_READ, POLL_OK]
+        
+        async def run():
+            asyncio.get_running_loop().call_later(0.01, writer.send, b"x")
+            await wait_ready(conn)
+        
+        try:
+            asyncio.run(run())
+        finally:
+            reader.close()
+            writer.close()
+        assert conn.poll.call_count == 2
+
+
+class TestAsyncDatabase:
+    """Tests for AsyncDatabase"""
+    
+    @patch('database.db.psycopg2.connect')
+    def test_write_samples(self, mock_connect):
+        """Test samples are written as one multi-row INSERT over an asynchronous connection"""
+        conn = make_conn()
+        mock_connect.return_value = conn
+        adb = AsyncDatabase(Database())
+        
+        asyncio.run(adb.write_samples("raspberry_pi", [(datetime(2024, 1, 1), make_data())] * 3))
+        
+        assert mock_connect.call_args[1]["async_"] is True
+        sql, params = conn.cursor.return_value.execute.call_args[0]
+        assert sql.startswith("INSERT INTO raspberry_pi")
+        assert len(params) == 3 * 17
+    
+    @patch('database.db.psycopg2.connect')
+    def test_spool_on_failure(self, mock_connect, tmp_path):
+        """Test rows are spooled when the database is unreachable, without reconnecting each time"""
+        mock_connect.side_effect = Exception("connection refused")
+        db = Database()
+        db.spool = Spool(str(tmp_path / "spool.bin"), capacity=10)
+        adb = AsyncDatabase(db)
+        
+        async def run():
+            await adb.write_samples("raspberry_pi", [(datetime(2024, 1, 1), make_data())])
+            await adb.write_samples("raspberry_pi", [(datetime(2024, 1, 1), make_data())])
+        
+        asyncio.run(run())
+        
+        assert len(db.spool) == 2
+        assert mock_connect.call_count == 1
+        db.spool.close()
+    
+    @patch('database.db.psycopg2.connect')
+    def test_batch_size(self, mock_connect):
+        """Test rows are buffered until DB_BATCH_SIZE rows of a table are queued"""
+        conn = make_conn()
+        mock_connect.return_value = conn
+        adb = AsyncDatabase(Database(), batch_size=3, batch_max_age=60)
+        execute = conn.cursor.return_value.execute
+        
+        async def run():
+            await adb.write_samples("raspberry_pi", [(datetime(2024, 1, 1), make_data())] * 2)
+            assert execute.call_count == 0
+            await adb.write_samples("raspberry_pi", [(datetime(2024, 1, 1), make_data())])
+        
+        asyncio.run(run())
+        
+        assert execute.call_count == 1
+        assert len(execute.call_args[0][1]) == 3 * 17
+    
+    @patch('database.db.psycopg2.connect')
+    def test_flush_expired(self, mock_connect):
+        """Test buffered rows are written once the oldest reached DB_BATCH_MAX_AGE"""
+        conn = make_conn()
+        mock_connect.return_value = conn
+        adb = AsyncDatabase(Database(), batch_size=100, batch_max_age=0)
+        
+        asyncio.run(adb.write_samples("raspberry_pi", [(datetime(2024, 1, 1), make_data())]))
+        
+        assert conn.cursor.return_value.execute.call_count == 1
+        assert adb._buffers["raspberry_pi"] == []
+    
+    def test_copy_runs_in_executor(self):
+        """Test COPY write methods use the blocking Database in the executor"""
+        db = Database()
+        db.ensure_schema = MagicMock()
+        threads = []
+        db.write_rows = MagicMock(side_effect=lambda *args: threads.append(threading.current_thread().name))
+        executor = ThreadPoolExecutor(1, thread_name_prefix="db-write")
+        adb = AsyncDatabase(db, executor, batch_size=1)
+        
+        with patch.object(db_module.Config, 'DB_WRITE_METHOD', 'copy_binary'):
+            asyncio.run(adb.write_samples("raspberry_pi", [(datetime(2024, 1, 1), make_data())] * 2))
+        executor.shutdown()
+        
+        assert db.write_rows.call_args[0][0] == "raspberry_pi"
+        assert db.write_rows.call_args[0][2] == "copy_binary"
+        assert threads[0].startswith("db-write")
+    
+    @patch('database.db.psycopg2.connect')
+    def test_spool_append_in_executor(self, mock_connect, tmp_path):
+        """Test spool appends (and their fsync) run off the event loop thread"""
+        mock_connect.side_effect = Exception("connection refused")
+        db = Database()
+        db.spool = Spool(str(tmp_path / "spool.bin"), capacity=10)
+        threads = []
+        append_rows = db.spool.append_rows
+        
+        def record_thread(*args):
+            threads.append(threading.current_thread())
+            return append_rows(*args)
+        
+        db.spool.append_rows = record_thread
+        adb = AsyncDatabase(db)
+        
+        asyncio.run(adb.write_samples("raspberry_pi", [(datetime(2024, 1, 1), make_data())]))
+        
+        assert len(db.spool) == 1
+        assert threads and threads[0] is not threading.main_thread()
+        db.spool.close()
+    
+    @patch('database.db.psycopg2.connect')
+    def test_failed_statement_closes_connection(self, mock_connect):
+        """Test a connection is not reused after a statement failed"""
+        conn = make_conn()
+        conn.cursor.return_value.execute.side_effect = Exception("statement timeout")
+        mock_connect.return_value = conn
+        adb = AsyncDatabase(Database())
+        
+        with pytest.raises(Exception, match="statement timeout"):
+            asyncio.run(adb.write_samples("raspberry_pi", [(datetime(2024, 1, 1), make_data())]))
+        
+        conn.close.assert_called_once()
+
+
+class TestAsyncWriter:
+    """Tests for AsyncWriter"""
+    
+    def test_drain_groups_by_table(self):
+        """Test queued samples are written per table and counted, and the buffers flushed on stop"""
+        adb = AsyncMock()
+        
+        async def write_samples(table, samples):
+            if table == "sensehat":
+                raise Exception("write failed")
+        
+        adb.write_samples.side_effect = write_samples
+        
+        async def run():
+            writer = AsyncWriter(SampleQueue(10), adb)
+            for i in range(3):
+                writer.put(Sample("raspberry_pi", datetime(2024, 1, 1), make_data(i)))
+            writer.put(Sample("sensehat", datetime(2024, 1, 1), MagicMock()))
+            writer.stop()
+            await writer.run()
+            return writer
+        
+        writer = asyncio.run(run())
+        
+        assert adb.write_samples.call_count == 2
+        assert writer.written == 3
+        assert writer.failed == 1
+        adb.flush.assert_awaited_once()
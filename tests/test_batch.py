@@ -0,0 +1,131 @@
+"""
+Tests for the columnar sample batches
+"""
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database import Database
+from src.models import RaspberryPiBatch, RaspberryPiData, SenseHatBatch, SenseHatData
+
+START = datetime(2024, 1, 1, 12, 0, 0, 250000)
+
+
+def make_pi(i):
+    return RaspberryPiData(
+        cpu_temp=None if i % 2 else 45.0 + i, cpu_percent=10.0 + i, cpu_count=4, cpu_freq_mhz=1500.0,
+        mem_total_gb=4.0, mem_used_gb=2.0, mem_available_gb=2.0, mem_percent=50.0,
+        disk_total_gb=32.0, disk_used_gb=16.0, disk_free_gb=16.0, disk_percent=50.0,
+        load_avg_1min=0.5, load_avg_5min=0.6, load_avg_15min=0.7,
+    )
+
+
+def make_pi_samples(count):
+    return [(START + timedelta(seconds=i), make_pi(i)) for i in range(count)]
+
+
+class TestSlottedModels:
+    """Tests for the slotted model dataclasses"""
+    
+    @pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass slots need Python 3.10")
+    def test_no_instance_dict(self):
+        """Test the models store their fields in slots"""
+        data = make_pi(0)
+        
+        assert not hasattr(data, "__dict__")
+        with pytest.raises(AttributeError):
+            data.unknown = 1
+
+
+class TestSampleBatch:
+    """Tests for SampleBatch"""
+    
+    def test_round_trip(self):
+        """Test models come back unchanged, with None values and integer fields restored"""
+        samples = make_pi_samples(5)
+        
+        batch = RaspberryPiBatch.from_models(samples)
+        
+        assert len(batch) == 5
+        assert batch.to_models() == samples
+        assert batch[1][1].cpu_temp is None
+        assert isinstance(batch[0][1].cpu_count, int)
+    
+    def test_slice(self):
+        """Test slicing returns a new batch of the selected samples"""
+        samples = make_pi_samples(10)
+        batch = RaspberryPiBatch.from_models(samples)
+        
+        part = batch[2:8:3]
+        
+        assert isinstance(part, RaspberryPiBatch)
+        assert part.to_models() == samples[2:8:3]
+        assert batch[-1] == samples[-1]
+    
+    def test_rows(self):
+        """Test rows follow the table's column order with the device id second"""
+        batch = RaspberryPiBatch.from_models(make_pi_samples(2))
+        
+        rows = batch.rows("pi-1")
+        
+        assert rows[0][:5] == (START, "pi-1", 45.0, 10.0, 4)
+        assert rows[1][2] is None
+        assert len(rows[0]) == 17
+    
+    def test_from_columns(self):
+        """Test a batch is built from per-field columns and epoch-second timestamps"""
+        np = pytest.importorskip("numpy")
+        names = [name for name in SenseHatBatch().field_names]
+        columns = {name: np.arange(3, dtype=np.float64) + i for i, name in enumerate(names)}
+        
+        batch = SenseHatBatch.from_columns([1704110400.0, 1704110401.0, 1704110402.5], columns)
+        
+        assert batch.timestamp(2) == datetime(2024, 1, 1, 12, 0, 2, 500000)
+        assert batch[1][1].humidity == 2.0
+        with pytest.raises(ValueError):
+            SenseHatBatch.from_columns([START], columns)
+    
+    def test_to_numpy_shares_memory(self):
+        """Test the NumPy views read the batch's arrays without copying"""
+        np = pytest.importorskip("numpy")
+        batch = RaspberryPiBatch.from_models(make_pi_samples(3))
+        
+        arrays = batch.to_numpy()
+        
+        assert arrays["timestamp"][0] == np.datetime64(START, "us")
+        assert np.isnan(arrays["cpu_temp"][1])
+        batch.columns["cpu_percent"][0] = 99.0
+        assert arrays["cpu_percent"][0] == 99.0
+    
+    def test_nbytes(self):
+        """Test the memory per sample is one double per field plus the timestamp"""
+        batch = SenseHatBatch.from_models([(START, SenseHatData(*([1.0] * 15)))] * 4)
+        
+        assert batch.nbytes == 4 * 16 * 8
+
+
+class TestWriteBatch:
+    """Tests for Database.write_batch"""
+    
+    @patch('database.db.psycopg2.connect')
+    def test_write_batch_single_statement(self, mock_connect, mock_db_connection):
+        """Test a batch is written as one bulk write under the database's device id"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        from src.database import db as db_module
+        
+        db = Database(batch_size=1, device_id="pi-7")
+        with patch.object(db_module.Config, 'DB_WRITE_METHOD', 'insert'):
+            db.write_batch(RaspberryPiBatch.from_models(make_pi_samples(3)))
+        
+        assert mock_cur.execute.call_count == 1
+        sql, params = mock_cur.execute.call_args[0]
+        assert sql.startswith("INSERT INTO raspberry_pi")
+        assert params[:3] == [START, "pi-7", 45.0]
+        assert len(params) == 3 * 17
+        mock_conn.commit.assert_called_once()
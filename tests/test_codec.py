@@ -0,0 +1,140 @@
+"""
+Tests for the binary record format
+"""
+import io
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models import RaspberryPiData, RecordCodec, RecordReader, RecordWriter, SenseHatData
+from src.models.codec import decode
+
+START = datetime(2024, 1, 1, 12, 0, 0, 250000)
+
+
+def make_pi(i):
+    return RaspberryPiData(
+        cpu_temp=None if i % 2 else 45.5 + i, cpu_percent=10.25 + i, cpu_count=None if i % 3 else 4,
+        cpu_freq_mhz=1500.0, mem_total_gb=4.0, mem_used_gb=2.0, mem_available_gb=2.0, mem_percent=50.0,
+        disk_total_gb=32.0, disk_used_gb=16.0, disk_free_gb=16.0, disk_percent=50.0,
+        load_avg_1min=0.5, load_avg_5min=0.6, load_avg_15min=0.7,
+    )
+
+
+def make_pi_samples(count):
+    return [(START + timedelta(seconds=i), make_pi(i)) for i in range(count)]
+
+
+class TestRecordCodec:
+    """Tests for RecordCodec"""
+    
+    def test_record_sizes(self):
+        """Test the records have no padding and a bitmap only where a model has Optional fields"""
+        assert RecordCodec(SenseHatData).record_size == 8 + 15 * 8
+        assert RecordCodec(SenseHatData, float_width=4).record_size == 8 + 15 * 4
+        # cpu_temp, cpu_count and cpu_freq_mhz are Optional; cpu_count is an int32
+        assert RecordCodec(RaspberryPiData).record_size == 8 + 1 + 14 * 8 + 4
+    
+    def test_round_trip_with_nulls(self):
+        """Test samples come back unchanged, including None values and integer fields"""
+        codec = RecordCodec(RaspberryPiData)
+        samples = make_pi_samples(6)
+        
+        decoded = [codec.unpack(codec.pack(timestamp, data)) for timestamp, data in samples]
+        
+        assert decoded == samples
+        assert decoded[1][1].cpu_temp is None
+        assert decoded[0][1].cpu_count == 4
+        assert isinstance(decoded[0][1].cpu_count, int)
+    
+    def test_float32_precision(self):
+        """Test float32 records keep about seven significant digits"""
+        codec = RecordCodec(SenseHatData, float_width=4)
+        data = SenseHatData(*([1013.2547] * 15))
+        
+        _, decoded = codec.unpack(codec.pack(START, data))
+        
+        assert decoded.pressure == pytest.approx(1013.2547, rel=1e-7)
+    
+    def test_encode_and_iter_unpack(self):
+        """Test a buffer of records is decoded in place from a memoryview"""
+        codec = RecordCodec(RaspberryPiData)
+        samples = make_pi_samples(10)
+        
+        buffer = codec.encode(samples)
+        
+        assert len(buffer) == 10 * codec.record_size
+        assert list(codec.iter_unpack(memoryview(buffer)[codec.record_size:])) == samples[1:]
+        with pytest.raises(ValueError):
+            codec.iter_unpack(buffer[:-1])
+    
+    def test_numpy_view(self):
+        """Test the structured dtype views the records without copying"""
+        np = pytest.importorskip("numpy")
+        codec = RecordCodec(RaspberryPiData)
+        buffer = codec.encode(make_pi_samples(3))
+        
+        records = np.frombuffer(buffer, dtype=codec.dtype())
+        
+        assert codec.dtype().itemsize == codec.record_size
+        assert records["cpu_percent"].tolist() == [10.25, 11.25, 12.25]
+        assert records["nulls"].tolist() == [0b00, 0b11, 0b10]  # bit 0 cpu_temp, bit 1 cpu_count
+        assert records["timestamp"][0] == np.datetime64(START, "us").astype(np.int64)
+
+
+class TestRecordStream:
+    """Tests for RecordWriter and RecordReader"""
+    
+    def test_stream_round_trip(self):
+        """Test a stream keeps its model, device id and samples across chunk boundaries"""
+        samples = make_pi_samples(25)
+        f = io.BytesIO()
+        writer = RecordWriter(f, RaspberryPiData, device_id="pi-1")
+        writer.write(*samples[0])
+        writer.write_many(samples[1:])
+        
+        f.seek(0)
+        reader = RecordReader(f, chunk_records=4)
+        
+        assert writer.count == 25
+        assert reader.model is RaspberryPiData
+        assert reader.device_id == "pi-1"
+        assert list(reader) == samples
+        assert not reader.truncated
+    
+    def test_decode_in_memory(self):
+        """Test a whole stream held in memory is decoded without a file object"""
+        f = io.BytesIO()
+        RecordWriter(f, SenseHatData, float_width=4).write(START, SenseHatData(*([0.5] * 15)))
+        
+        device_id, samples = decode(f.getbuffer())
+        
+        assert device_id is None
+        assert list(samples) == [(START, SenseHatData(*([0.5] * 15)))]
+    
+    def test_torn_tail(self):
+        """Test a partly written last record ends the stream"""
+        f = io.BytesIO()
+        RecordWriter(f, RaspberryPiData).write_many(make_pi_samples(3))
+        
+        reader = RecordReader(io.BytesIO(f.getvalue()[:-10]))
+        
+        assert len(list(reader)) == 2
+        assert reader.truncated
+    
+    def test_bad_header(self):
+        """Test streams with an unknown magic or version are rejected"""
+        f = io.BytesIO()
+        RecordWriter(f, RaspberryPiData)
+        header = f.getvalue()
+        
+        with pytest.raises(ValueError):
+            RecordReader(io.BytesIO(b"NOTREC" + header[6:]))
+        with pytest.raises(ValueError):
+            RecordReader(io.BytesIO(header[:6] + b"\x09" + header[7:]))
+        with pytest.raises(ValueError):
+            RecordReader(io.BytesIO(header[:4]))
@@ -4,16 +4,27 @@ Tests for database operations
 import pytest
 import sys
 import os
+from datetime import datetime
 from unittest.mock import patch, MagicMock
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.database import Database, get_database
-from src.models import SenseHatData, RaspberryPiData
+from src.models import SenseHatData, SenseHatMotionData, RaspberryPiData
 from src.config import Config
 
 
+def make_sensehat_data():
+    return SenseHatData(
+        temperature=25.5, humidity=60.0, pressure=1013.25,
+        pitch=0.0, roll=0.0, yaw=0.0,
+        accel_x=0.0, accel_y=0.0, accel_z=1.0,
+        gyro_x=0.0, gyro_y=0.0, gyro_z=0.0,
+        compass_x=0.0, compass_y=0.0, compass_z=0.0,
+    )
+
+
 class TestDatabase:
     """Tests for Database class"""
     
@@ -138,6 +149,35 @@ class TestDatabase:
         
         mock_conn.rollback.assert_called_once()
     
+    @patch('database.db.psycopg2.connect')
+    def test_write_uses_sample_timestamp(self, mock_connect, mock_db_connection):
+        """Test an explicit sample timestamp is written instead of the current time"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        
+        db = Database(batch_size=1)
+        timestamp = datetime(2024, 1, 1, 12, 0, 0)
+        db.write_sensehat_data(make_sensehat_data(), timestamp=timestamp)
+        
+        params = mock_cur.execute.call_args[0][1]
+        assert params[0] == timestamp
+    
+    @patch('database.db.psycopg2.connect')
+    def test_write_for_device(self, mock_connect, mock_db_connection):
+        """Test rows carry the device id given to the Database instead of DEVICE_ID"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        
+        from src.database import db as db_module
+        with patch.object(db_module.Config, 'DEVICE_ID', 'test-device'):
+            default = Database(batch_size=1)
+            other = Database(batch_size=1, device_id='load-7')
+        
+        default.write_sensehat_data(make_sensehat_data())
+        assert mock_cur.execute.call_args[0][1][1] == 'test-device'
+        other.write_sensehat_data(make_sensehat_data())
+        assert mock_cur.execute.call_args[0][1][1] == 'load-7'
+    
     def test_get_database_singleton(self):
         """Test get_database returns singleton"""
         db1 = get_database()
@@ -145,3 +185,214 @@ class TestDatabase:
         
         assert db1 is db2
 
+
+
+class TestLazyInit:
+    """Tests for schema creation on first use"""
+    
+    @patch('database.db.psycopg2.connect')
+    def test_get_database_does_not_connect(self, mock_connect):
+        """Test the global instance is created without opening a connection"""
+        get_database()
+        
+        mock_connect.assert_not_called()
+    
+    @patch('database.db.psycopg2.connect')
+    def test_schema_created_once_on_first_write(self, mock_connect, mock_db_connection, schema_ready):
+        """Test the first write creates the schema and later writes skip it"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        mock_cur.fetchall.return_value = []
+        schema_ready.ready = False
+        
+        db = Database(batch_size=1)
+        db.write_sensehat_data(make_sensehat_data())
+        db.write_sensehat_data(make_sensehat_data())
+        
+        statements = [call[0][0] for call in mock_cur.execute.call_args_list]
+        assert sum("CREATE TABLE IF NOT EXISTS sensehat (" in sql for sql in statements) == 1
+        assert sum(sql.startswith("INSERT INTO sensehat ") for sql in statements) == 2
+        assert schema_ready.ready
+    
+    @patch('database.db.psycopg2.connect')
+    def test_failed_init_backs_off(self, mock_connect, schema_ready):
+        """Test a failed initialisation is not retried before its backoff expires"""
+        mock_connect.side_effect = Exception("connection refused")
+        schema_ready.ready = False
+        
+        db = Database(batch_size=1)
+        with pytest.raises(Exception, match="connection refused"):
+            db.write_sensehat_data(make_sensehat_data())
+        with pytest.raises(ConnectionError):
+            db.write_sensehat_data(make_sensehat_data())
+        
+        assert mock_connect.call_count == 1
+        assert schema_ready.backoff > 0
+
+
+class TestBufferedWrites:
+    """Tests for batched (buffered) writes"""
+    
+    @patch('database.db.psycopg2.connect')
+    def test_rows_buffered_until_batch_size(self, mock_connect, mock_db_connection):
+        """Test rows are held back until the batch size is reached"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        
+        db = Database(batch_size=3, batch_max_age=3600)
+        db.write_sensehat_data(make_sensehat_data())
+        db.write_sensehat_data(make_sensehat_data())
+        
+        mock_cur.execute.assert_not_called()
+        
+        db.write_sensehat_data(make_sensehat_data())
+        
+        # One multi-row INSERT and one commit for the whole batch
+        assert mock_cur.execute.call_count == 1
+        mock_conn.commit.assert_called_once()
+        sql, params = mock_cur.execute.call_args[0]
+        assert sql.count("(%s") == 3
+        assert len(params) == 3 * 17
+    
+    @patch('database.db.psycopg2.connect')
+    def test_flush_on_max_age(self, mock_connect, mock_db_connection):
+        """Test buffered rows are flushed once the oldest row is too old"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        
+        db = Database(batch_size=100, batch_max_age=30)
+        with patch('database.db.time.monotonic', side_effect=[0.0, 1.0, 31.0]):
+            db.write_sensehat_data(make_sensehat_data())
+            mock_cur.execute.assert_not_called()
+            db.write_sensehat_data(make_sensehat_data())
+        
+        assert mock_cur.execute.call_count == 1
+        assert len(mock_cur.execute.call_args[0][1]) == 2 * 17
+    
+    @patch('database.db.psycopg2.connect')
+    def test_explicit_flush(self, mock_connect, mock_db_connection):
+        """Test flush() writes all pending rows and empties the buffers"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        
+        db = Database(batch_size=100, batch_max_age=3600)
+        db.write_sensehat_data(make_sensehat_data())
+        db.flush()
+        db.flush()
+        
+        assert mock_cur.execute.call_count == 1
+        mock_conn.commit.assert_called_once()
+    
+    @patch('database.db.psycopg2.connect')
+    def test_failed_flush_keeps_rows(self, mock_connect, mock_db_connection):
+        """Test rows of a failed flush stay buffered for the next one, oldest dropped beyond the cap"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        mock_cur.execute.side_effect = Exception("connection lost")
+        
+        db = Database(batch_size=2, batch_max_age=3600)
+        db.buffer_max_rows = 3
+        db.write_sensehat_data(make_sensehat_data())
+        with pytest.raises(Exception, match="connection lost"):
+            db.write_sensehat_data(make_sensehat_data())
+        assert len(db._buffers["sensehat"]) == 2
+        
+        with pytest.raises(Exception, match="connection lost"):
+            db.write_sensehat_data(make_sensehat_data())
+        with pytest.raises(Exception, match="connection lost"):
+            db.write_sensehat_data(make_sensehat_data())
+        assert len(db._buffers["sensehat"]) == 3
+        
+        mock_cur.execute.side_effect = None
+        db.flush()
+        
+        assert len(mock_cur.execute.call_args[0][1]) == 3 * 17
+        assert db._buffers["sensehat"] == []
+
+
+class TestCopyWrites:
+    """Tests for the COPY bulk ingest path"""
+    
+    def test_encode_copy_text(self):
+        """Test COPY text encoding of NULLs, strings and timestamps"""
+        from src.database.db import encode_copy_text
+        
+        rows = [(datetime(2024, 1, 1, 12, 0, 0, 500), "pi\t1", None, 1.5)]
+        
+        assert encode_copy_text(rows) == "2024-01-01 12:00:00.000500\tpi\\t1\t\\N\t1.5\n"
+    
+    def test_encode_copy_binary(self):
+        """Test COPY binary encoding produces header, tuples and trailer"""
+        import struct
+        from src.database.db import encode_copy_binary
+        
+        data = encode_copy_binary(
+            ("timestamp", "text", "float8", "int4"),
+            [(datetime(2000, 1, 1, 0, 0, 1), "pi", None, 4)],
+        )
+        
+        assert data.startswith(b"PGCOPY\n\xff\r\n\x00")
+        assert data.endswith(struct.pack("!h", -1))
+        body = data[19:-2]
+        assert body == (
+            struct.pack("!h", 4)
+            + struct.pack("!iq", 8, 1000000)
+            + struct.pack("!i", 2) + b"pi"
+            + struct.pack("!i", -1)
+            + struct.pack("!ii", 4, 4)
+        )
+    
+    @patch('database.db.psycopg2.connect')
+    def test_copy_rows_binary(self, mock_connect, mock_db_connection):
+        """Test rows are loaded with a single COPY FROM STDIN and commit"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        
+        db = Database(batch_size=1)
+        rows = [db._sensehat_row(make_sensehat_data(), None)] * 2
+        db.write_rows("sensehat", rows, method="copy_binary")
+        
+        mock_cur.execute.assert_not_called()
+        
+        sql = mock_cur.copy_expert.call_args[0][0]
+        assert sql.startswith("COPY sensehat (timestamp, device_id")
+        assert "FORMAT binary" in sql
+        mock_conn.commit.assert_called_once()
+
+
+class TestWriteSamples:
+    """Tests for writing queued samples"""
+    
+    @patch('database.db.psycopg2.connect')
+    def test_write_samples_single_statement(self, mock_connect, mock_db_connection):
+        """Test several samples of one table are written in one statement"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        
+        db = Database(batch_size=1)
+        timestamps = [datetime(2024, 1, 1, 0, 0, i) for i in range(3)]
+        with patch.object(Config, 'DB_WRITE_METHOD', 'insert'):
+            db.write_samples("sensehat", [(t, make_sensehat_data()) for t in timestamps])
+        
+        assert mock_cur.execute.call_count == 1
+        params = mock_cur.execute.call_args[0][1]
+        assert params[0] == timestamps[0]
+        assert params[17] == timestamps[1]
+        mock_conn.commit.assert_called_once()
+    
+    @patch('database.db.psycopg2.connect')
+    def test_write_sensehat_motion_samples(self, mock_connect, mock_db_connection):
+        """Test motion aggregates are written with their sample count first"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        
+        db = Database(batch_size=1)
+        columns = [name for name in SenseHatMotionData.__dataclass_fields__ if name != "sample_count"]
+        motion = SenseHatMotionData(sample_count=20, **{name: 1.5 for name in columns})
+        db.write_samples("sensehat_motion", [(datetime(2024, 1, 1), motion)])
+        
+        sql, params = mock_cur.execute.call_args[0]
+        assert "INSERT INTO sensehat_motion" in sql
+        assert params[2] == 20
+        assert params[3:] == [1.5] * 36
+
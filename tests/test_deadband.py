@@ -0,0 +1,118 @@
+"""
+Tests for the deadband filter
+"""
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.filters import Deadband, DeadbandFilter, parse_deadbands
+from src.models import SenseHatData
+
+START = datetime(2024, 1, 1)
+
+
+def at(seconds):
+    return START + timedelta(seconds=seconds)
+
+
+class TestDeadband:
+    """Tests for thresholds"""
+    
+    def test_parse(self):
+        """Test absolute and relative thresholds are parsed, table-qualified names kept"""
+        deadbands = parse_deadbands("temperature=0.1, sensehat.pressure=2%,")
+        
+        assert deadbands == {
+            "temperature": Deadband(0.1),
+            "sensehat.pressure": Deadband(0.02, relative=True),
+        }
+    
+    @pytest.mark.parametrize("spec", ["temperature", "temperature=abc", "temperature=-1", "=1"])
+    def test_parse_invalid(self, spec):
+        """Test malformed settings are rejected"""
+        with pytest.raises(ValueError):
+            parse_deadbands(spec)
+    
+    def test_exceeded(self):
+        """Test moves are compared with absolute, relative and zero thresholds"""
+        assert not Deadband(0.5).exceeded(20.0, 20.5)
+        assert Deadband(0.5).exceeded(20.0, 19.4)
+        assert not Deadband(0.01, relative=True).exceeded(1000.0, 1009.0)
+        assert Deadband(0.01, relative=True).exceeded(1000.0, 1011.0)
+        assert Deadband(0.0).exceeded(4, 5)
+        assert not Deadband(0.0).exceeded(4, 4)
+        assert Deadband(1.0).exceeded(None, 50.0)
+        assert not Deadband(1.0).exceeded(None, None)
+
+
+class TestDeadbandFilter:
+    """Tests for DeadbandFilter"""
+    
+    def test_first_sample_written(self):
+        """Test the first sample of every table is written"""
+        deadband = DeadbandFilter(default=Deadband(100))
+        
+        assert deadband.accept_values("sensehat", at(0), {"temperature": 20.0})
+        assert deadband.accept_values("raspberry_pi", at(0), {"cpu_percent": 5.0})
+    
+    def test_small_changes_suppressed(self):
+        """Test samples within the deadband are dropped and a larger move is written"""
+        deadband = DeadbandFilter({"temperature": Deadband(0.5)})
+        
+        written = [
+            deadband.accept_values("sensehat", at(i), {"temperature": value})
+            for i, value in enumerate([20.0, 20.1, 20.3, 20.2, 20.8, 20.9])
+        ]
+        
+        assert written == [True, False, False, False, True, False]
+        assert deadband.compression_ratio("sensehat") == 3.0
+    
+    def test_drift_compared_with_last_written(self):
+        """Test a slow drift is written once it adds up to more than the deadband"""
+        deadband = DeadbandFilter({"pressure": Deadband(1.0)})
+        
+        written = [
+            deadband.accept_values("sensehat", at(i), {"pressure": 1000.0 + 0.4 * i})
+            for i in range(6)
+        ]
+        
+        assert written == [True, False, False, True, False, False]
+    
+    def test_any_field_triggers_row(self):
+        """Test one field outside its deadband writes the whole row"""
+        deadband = DeadbandFilter({"humidity": Deadband(1.0)}, default=Deadband(0.1))
+        deadband.accept_values("sensehat", at(0), {"temperature": 20.0, "humidity": 50.0})
+        
+        assert not deadband.accept_values("sensehat", at(1), {"temperature": 20.05, "humidity": 50.5})
+        assert deadband.accept_values("sensehat", at(2), {"temperature": 20.2, "humidity": 50.5})
+    
+    def test_table_qualified_deadband(self):
+        """Test a table.field threshold overrides the plain field threshold"""
+        deadband = DeadbandFilter({"x": Deadband(10), "sensehat.x": Deadband(0)})
+        for table in ("sensehat", "raspberry_pi"):
+            deadband.accept_values(table, at(0), {"x": 1.0})
+        
+        assert deadband.accept_values("sensehat", at(1), {"x": 2.0})
+        assert not deadband.accept_values("raspberry_pi", at(1), {"x": 2.0})
+    
+    def test_heartbeat(self):
+        """Test an unchanged sample is written once the heartbeat interval has passed"""
+        deadband = DeadbandFilter(heartbeat=60)
+        deadband.accept_values("sensehat", at(0), {"temperature": 20.0})
+        
+        assert not deadband.accept_values("sensehat", at(59), {"temperature": 20.0})
+        assert deadband.accept_values("sensehat", at(60), {"temperature": 20.0})
+        assert not deadband.accept_values("sensehat", at(119), {"temperature": 20.0})
+    
+    def test_accept_dataclass(self):
+        """Test samples are checked field by field from the data models"""
+        deadband = DeadbandFilter(default=Deadband(0.5))
+        data = SenseHatData(20.0, 50.0, 1000.0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 10, 10, 10)
+        
+        assert deadband.accept("sensehat", at(0), data)
+        assert not deadband.accept("sensehat", at(1), data)
+        assert deadband.stats() == "sensehat 1/2 written (2.0:1)"
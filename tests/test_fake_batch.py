@@ -0,0 +1,83 @@
+"""
+Tests for the batched fake fleet generator
+"""
+import pytest
+import sys
+import os
+from dataclasses import fields
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+np = pytest.importorskip("numpy")
+
+from src.models import RaspberryPiData, SenseHatData
+from src.sensors.fake_batch import FakeFleet
+
+
+class TestFakeFleet:
+    """Tests for FakeFleet"""
+    
+    def test_fields_and_shapes(self):
+        """Test every model field is generated with one row per tick and one column per device"""
+        fleet = FakeFleet(5, seed=1, start_time=0)
+        
+        sensehat = fleet.sensehat(np.arange(3.0))
+        system = fleet.system(10.0)
+        
+        assert list(sensehat) == [field.name for field in fields(SenseHatData)]
+        assert list(system) == [field.name for field in fields(RaspberryPiData)]
+        assert all(values.shape == (3, 5) for values in sensehat.values())
+        assert all(values.shape == (1, 5) for values in system.values())
+    
+    def test_seed_reproducible(self):
+        """Test the same seed and calls give the same readings, another seed different ones"""
+        first = FakeFleet(10, seed=42, start_time=0)
+        second = FakeFleet(10, seed=42, start_time=0)
+        other = FakeFleet(10, seed=43, start_time=0)
+        times = np.arange(100.0)
+        
+        for _ in range(2):
+            a, b, c = first.sensehat(times), second.sensehat(times), other.sensehat(times)
+            assert all(np.array_equal(a[name], b[name]) for name in a)
+            assert not np.array_equal(a["temperature"], c["temperature"])
+    
+    def test_value_ranges(self):
+        """Test the readings stay in the ranges of the scalar fake readers"""
+        fleet = FakeFleet(100, seed=0, start_time=0)
+        times = np.arange(0.0, 86400.0, 60.0)
+        
+        sensehat = fleet.sensehat(times)
+        system = fleet.system(times)
+        
+        assert sensehat["temperature"].min() >= 14 and sensehat["temperature"].max() <= 26
+        assert sensehat["humidity"].min() >= 20 and sensehat["humidity"].max() <= 80
+        assert np.all(np.abs(sensehat["pressure"] - 1013.25) <= 5)
+        assert system["cpu_percent"].min() >= 5 and system["cpu_percent"].max() <= 95
+        assert np.all(system["cpu_count"] == 4)
+        assert np.allclose(system["disk_used_gb"] + system["disk_free_gb"], 32.0, atol=0.011)
+        assert np.array_equal(sensehat["temperature"], np.round(sensehat["temperature"], 2))
+    
+    def test_day_night_cycle(self):
+        """Test the temperature follows the daily sine of each device"""
+        fleet = FakeFleet(1000, seed=3, start_time=0)
+        fleet.phase[:] = 0.0
+        
+        peak = fleet.sensehat(3600 * np.pi / 2)["temperature"].mean()
+        trough = fleet.sensehat(3600 * 3 * np.pi / 2)["temperature"].mean()
+        
+        assert peak == pytest.approx(25.0, abs=0.1)
+        assert trough == pytest.approx(15.0, abs=0.1)
+    
+    def test_orientation_walk_continues(self):
+        """Test the orientation random walk carries over between calls"""
+        fleet = FakeFleet(2000, seed=5, start_time=0)
+        fleet.sensehat(np.arange(400.0))
+        
+        assert not np.all(fleet.base_yaw == 0)
+        assert np.std(fleet.base_yaw) > 5
+    
+    def test_devices_must_be_positive(self):
+        """Test an empty fleet is rejected"""
+        with pytest.raises(ValueError):
+            FakeFleet(0)
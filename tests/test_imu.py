@@ -0,0 +1,72 @@
+"""
+Tests for high-rate IMU capture
+"""
+import math
+import pytest
+import sys
+import os
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.sensors.imu import IMU_AXES, ImuWindowSampler
+
+
+def run_sampler(samples, rate_hz=1000):
+    """Run a sampler until it has read every sample, then stop it"""
+    remaining = list(samples)
+    done = threading.Event()
+    
+    def read_axes():
+        if not remaining:
+            done.set()
+            raise IOError("no more samples")
+        return remaining.pop(0)
+    
+    sampler = ImuWindowSampler(read_axes, rate_hz)
+    sampler.start()
+    assert done.wait(5)
+    sampler.stop()
+    return sampler
+
+
+class TestImuWindowSampler:
+    """Tests for ImuWindowSampler"""
+    
+    def test_window_aggregates(self):
+        """Test mean, min, max, RMS and sample count of one window"""
+        samples = [[float(i + 1)] * len(IMU_AXES) for i in range(4)]
+        sampler = run_sampler(samples)
+        
+        motion = sampler.collect()
+        
+        assert motion.sample_count == 4
+        for axis in IMU_AXES:
+            assert getattr(motion, f"{axis}_mean") == pytest.approx(2.5)
+            assert getattr(motion, f"{axis}_min") == 1.0
+            assert getattr(motion, f"{axis}_max") == 4.0
+            assert getattr(motion, f"{axis}_rms") == pytest.approx(math.sqrt(30 / 4))
+    
+    def test_axes_are_aggregated_separately(self):
+        """Test every axis has its own aggregates"""
+        sampler = run_sampler([[float(i) for i in range(len(IMU_AXES))]])
+        
+        motion = sampler.collect()
+        
+        for i, axis in enumerate(IMU_AXES):
+            assert getattr(motion, f"{axis}_mean") == float(i)
+    
+    def test_collect_starts_new_window(self):
+        """Test collect() resets the window and returns None while it is empty"""
+        sampler = run_sampler([[1.0] * len(IMU_AXES)] * 3)
+        
+        assert sampler.collect().sample_count == 3
+        assert sampler.collect() is None
+    
+    def test_read_errors_are_counted(self):
+        """Test failed reads are skipped instead of stopping the sampler"""
+        sampler = run_sampler([[1.0] * len(IMU_AXES)])
+        
+        assert sampler.errors >= 1
+        assert sampler.collect().sample_count == 1
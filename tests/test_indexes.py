@@ -0,0 +1,112 @@
+"""
+Tests for index profiles and the index migration
+"""
+import pytest
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database import Database
+from src.database import db as db_module
+from src.database.indexes import create_index_sql, other_profile_indexes, profile_indexes
+
+# The Config class the database module actually reads
+Config = db_module.Config
+
+
+def executed(mock_cur):
+    return [call[0][0] for call in mock_cur.execute.call_args_list]
+
+
+class TestIndexProfiles:
+    """Tests for index profile definitions"""
+    
+    def test_btree_profile_matches_original_indexes(self):
+        """Test the btree profile keeps the original index names"""
+        names = [name for name, _, _ in profile_indexes("sensehat", "btree")]
+        assert names == ["idx_sensehat_timestamp", "idx_sensehat_device_id"]
+    
+    def test_other_profile_indexes(self):
+        """Test the indexes to drop when switching profiles"""
+        assert other_profile_indexes("sensehat", "brin") == ["idx_sensehat_timestamp", "idx_sensehat_device_id"]
+    
+    def test_create_index_sql(self):
+        """Test CONCURRENTLY and ONLY variants"""
+        assert create_index_sql("idx_t_ts", "t", "brin", "timestamp", concurrently=True) == \
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_t_ts ON t USING brin (timestamp)"
+        assert create_index_sql("idx_t_ts", "t", "btree", "timestamp", only=True) == \
+            "CREATE INDEX IF NOT EXISTS idx_t_ts ON ONLY t USING btree (timestamp)"
+
+
+class TestInitIndexes:
+    """Tests for the indexes created by init_database"""
+    
+    @patch('database.db.psycopg2.connect')
+    def test_brin_profile_on_new_tables(self, mock_connect, mock_db_connection):
+        """Test the configured profile is created when no other profile exists"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        mock_cur.fetchall.return_value = []
+        
+        with patch.object(Config, 'DB_INDEX_PROFILE', 'brin'):
+            Database().init_database()
+        
+        statements = executed(mock_cur)
+        assert "CREATE INDEX IF NOT EXISTS idx_sensehat_timestamp_brin ON sensehat USING brin (timestamp)" in statements
+        assert ("CREATE INDEX IF NOT EXISTS idx_sensehat_device_timestamp ON sensehat "
+                "USING btree (device_id, timestamp)") in statements
+        assert not any("idx_sensehat_device_id" in sql for sql in statements)
+    
+    @patch('database.db.psycopg2.connect')
+    def test_other_profile_is_not_replaced_blocking(self, mock_connect, mock_db_connection):
+        """Test tables with another profile's indexes are left for migrate_indexes"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        mock_cur.fetchall.return_value = [("idx_sensehat_timestamp",), ("idx_sensehat_device_id",)]
+        
+        with patch.object(Config, 'DB_INDEX_PROFILE', 'brin'):
+            Database().init_database()
+        
+        statements = executed(mock_cur)
+        assert not any("ON sensehat " in sql for sql in statements if sql.startswith("CREATE INDEX"))
+        assert any("ON raspberry_pi " in sql for sql in statements if sql.startswith("CREATE INDEX"))
+
+
+class TestMigrateIndexes:
+    """Tests for migrate_indexes"""
+    
+    @patch('database.db.psycopg2.connect')
+    def test_migrate_builds_concurrently_then_drops(self, mock_connect, mock_db_connection):
+        """Test new indexes are built concurrently outside a transaction before old ones are dropped"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        mock_conn.autocommit = False
+        autocommit = []
+        mock_cur.execute.side_effect = lambda *args: autocommit.append(mock_conn.autocommit)
+        # No partitioned tables, every index missing, old profile present
+        mock_cur.fetchone.return_value = None
+        mock_cur.fetchall.side_effect = lambda: (
+            [] if "pg_partitioned_table" in mock_cur.execute.call_args[0][0]
+            else [("idx_sensehat_timestamp",), ("idx_sensehat_device_id",)]
+        )
+        
+        changed = Database().migrate_indexes("brin")
+        
+        statements = executed(mock_cur)
+        create = statements.index(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sensehat_timestamp_brin ON sensehat USING brin (timestamp)"
+        )
+        drop = statements.index("DROP INDEX CONCURRENTLY IF EXISTS idx_sensehat_timestamp")
+        assert create < drop
+        assert "idx_sensehat_device_id" in changed
+        assert all(autocommit)
+        assert mock_conn.autocommit is False
+    
+    @patch('database.db.psycopg2.connect')
+    def test_unknown_profile(self, mock_connect, mock_db_connection):
+        """Test an unknown profile is rejected"""
+        with pytest.raises(ValueError):
+            Database().migrate_indexes("hash")
@@ -0,0 +1,133 @@
+"""
+Tests for the hot-path stage timers
+"""
+import pytest
+import subprocess
+import sys
+import os
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.instrumentation import Histogram, StageTimers
+from src.utils.metrics import Metrics
+
+
+@pytest.fixture
+def enabled_timers():
+    """Enable the process-wide timers the readers record into, clearing them afterwards"""
+    from src.sensors import system as system_module
+    timers = system_module.timers
+    timers.enabled = True
+    timers.histograms.clear()
+    yield timers
+    timers.enabled = False
+    timers.histograms.clear()
+
+
+class TestHistogram:
+    """Tests for Histogram"""
+    
+    def test_buckets_and_quantiles(self):
+        """Test durations land in the first bucket whose bound is not below them"""
+        histogram = Histogram(bounds=(0.001, 0.01, 0.1))
+        for seconds in (0.0005, 0.001, 0.005, 0.005, 2.0):
+            histogram.record(seconds)
+        
+        assert histogram.buckets == [2, 2, 0, 1]
+        assert histogram.count == 5
+        assert histogram.mean == pytest.approx(2.0115 / 5)
+        assert histogram.quantile(0.5) == 0.01
+        # Above the largest bound the maximum is reported
+        assert histogram.quantile(0.99) == 2.0
+    
+    def test_reset(self):
+        histogram = Histogram()
+        histogram.record(0.5)
+        
+        histogram.reset()
+        
+        assert histogram.count == 0
+        assert sum(histogram.buckets) == 0
+        assert histogram.quantile(0.5) == 0.0
+
+
+class TestStageTimers:
+    """Tests for StageTimers"""
+    
+    def test_disabled_records_nothing(self):
+        """Test a disabled timer is a shared no-op"""
+        timers = StageTimers()
+        
+        with timers.time("db.commit"):
+            pass
+        timers.record("db.execute", 0.1)
+        
+        assert timers.histograms == {}
+        assert timers.time("a") is timers.time("b")
+    
+    def test_time_stage(self):
+        """Test the time spent inside a stage is recorded, also when it raises"""
+        timers = StageTimers(enabled=True)
+        
+        with patch("src.utils.instrumentation.time.perf_counter", side_effect=[1.0, 1.25, 2.0, 2.5]):
+            with timers.time("db.commit"):
+                pass
+            with pytest.raises(ValueError):
+                with timers.time("db.commit"):
+                    raise ValueError("boom")
+        
+        histogram = timers.histograms["db.commit"]
+        assert histogram.count == 2
+        assert histogram.total == pytest.approx(0.75)
+        assert histogram.max == pytest.approx(0.5)
+    
+    def test_summary_slowest_first(self):
+        timers = StageTimers(enabled=True)
+        timers.record("loop.sleep", 5.0)
+        timers.record("db.commit", 0.01)
+        
+        lines = timers.summary()
+        
+        assert lines[0].startswith("loop.sleep: n=1")
+        assert lines[1].startswith("db.commit: n=1")
+
+
+class TestInstrumentedStages:
+    """Tests for the stages timed by the readers and metrics"""
+    
+    def test_system_read_stages(self, enabled_timers):
+        """Test every system metrics call is timed"""
+        from src.sensors.system import SystemReader
+        
+        SystemReader().read()
+        
+        assert {"system.cpu_percent", "system.cpu_freq", "system.memory", "system.disk",
+                "system.load_avg"} <= set(enabled_timers.histograms)
+    
+    def test_metrics_histogram(self):
+        """Test the stage histograms are exported as cumulative Prometheus buckets"""
+        timers = StageTimers(enabled=True, bounds=(0.001, 0.01))
+        timers.record("db.commit", 0.0005)
+        timers.record("db.commit", 0.005)
+        timers.record("db.commit", 1.0)
+        
+        lines = Metrics(timers=timers).render().splitlines()
+        
+        assert "# TYPE sense_logger_stage_duration_seconds histogram" in lines
+        assert 'sense_logger_stage_duration_seconds_bucket{stage="db.commit",le="0.001"} 1' in lines
+        assert 'sense_logger_stage_duration_seconds_bucket{stage="db.commit",le="0.01"} 2' in lines
+        assert 'sense_logger_stage_duration_seconds_bucket{stage="db.commit",le="+Inf"} 3' in lines
+        assert 'sense_logger_stage_duration_seconds_count{stage="db.commit"} 3' in lines
+    
+    def test_package_imports(self):
+        """Test the instrumented modules import as src.* without src on sys.path"""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = {key: value for key, value in os.environ.items() if key != "PYTHONPATH"}
+        code = "import src.database, src.utils.instrumentation, src.utils.metrics"
+        
+        result = subprocess.run([sys.executable, "-c", code], cwd=root, env=env,
+                                capture_output=True, text=True)
+        
+        assert result.returncode == 0, result.stderr
@@ -0,0 +1,144 @@
+"""
+Tests for the queued, deduplicating logger setup
+"""
+import gzip
+import logging
+import queue
+import pytest
+import sys
+import os
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils import logger as logger_module
+from src.utils.logger import DroppingQueueHandler, DuplicateFilter, setup_logger, stop_logging
+
+
+def make_record(msg, level=logging.ERROR, exc_info=None):
+    return logging.LogRecord("sense_logger", level, __file__, 1, msg, None, exc_info)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestDuplicateFilter:
+    """Tests for DuplicateFilter"""
+    
+    def test_repeats_suppressed_within_interval(self, clock):
+        """Test a repeated error passes once per interval and then reports the repeats"""
+        dedup = DuplicateFilter(interval=60, clock=clock)
+        
+        assert dedup.filter(make_record("Database write failed, next attempt in 1s"))
+        clock.now = 10
+        assert not dedup.filter(make_record("Database write failed, next attempt in 2s"))
+        assert not dedup.filter(make_record("Database write failed, next attempt in 4s"))
+        clock.now = 61
+        record = make_record("Database write failed, next attempt in 8s")
+        
+        assert dedup.filter(record)
+        assert record.getMessage() == "Database write failed, next attempt in 8s (last message repeated 2 times)"
+        assert dedup.suppressed_total == 2
+    
+    def test_distinct_messages_and_levels(self, clock):
+        """Test different messages, exception types and INFO records are not collapsed"""
+        dedup = DuplicateFilter(interval=60, clock=clock)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            exc_info = sys.exc_info()
+        
+        assert dedup.filter(make_record("Error reading sensehat"))
+        assert dedup.filter(make_record("Error reading system"))
+        assert dedup.filter(make_record("Error reading sensehat", exc_info=exc_info))
+        assert dedup.filter(make_record("Error reading sensehat", level=logging.WARNING))
+        assert dedup.filter(make_record("Queued System", level=logging.INFO))
+        assert dedup.filter(make_record("Queued System", level=logging.INFO))
+    
+    def test_pending(self, clock):
+        """Test repeats not yet reported are listed with the last suppressed message"""
+        dedup = DuplicateFilter(interval=60, clock=clock)
+        dedup.filter(make_record("Error writing 1 sample(s)"))
+        dedup.filter(make_record("Error writing 3 sample(s)"))
+        
+        assert dedup.pending() == ["Error writing 3 sample(s) (last message repeated 1 times)"]
+    
+    def test_disabled(self, clock):
+        dedup = DuplicateFilter(interval=0, clock=clock)
+        
+        assert dedup.filter(make_record("Error"))
+        assert dedup.filter(make_record("Error"))
+
+
+class TestSetupLogger:
+    """Tests for setup_logger"""
+    
+    @pytest.fixture(autouse=True)
+    def stop_listener(self):
+        yield
+        stop_logging()
+    
+    def test_handlers_behind_queue(self, tmp_path):
+        """Test the logger only enqueues and the listener writes the file"""
+        with patch.object(logger_module.Config, 'LOG_DIR', str(tmp_path)):
+            logger = setup_logger("test_queue_logger")
+        logger.info("hello")
+        stop_logging()
+        
+        assert len(logger.handlers) == 1
+        assert isinstance(logger.handlers[0], DroppingQueueHandler)
+        assert "hello" in (tmp_path / logger_module.Config.LOG_FILE).read_text()
+    
+    def test_rotation_compresses_backups(self, tmp_path):
+        """Test the log file is rotated by size into gzip backups"""
+        with patch.object(logger_module.Config, 'LOG_DIR', str(tmp_path)), \
+                patch.object(logger_module.Config, 'LOG_MAX_BYTES', 200), \
+                patch.object(logger_module.Config, 'LOG_BACKUP_COUNT', 2):
+            logger = setup_logger("test_rotating_logger")
+        for i in range(20):
+            logger.info(f"message {i:04d} " + "x" * 50)
+        stop_logging()
+        
+        log_file = tmp_path / logger_module.Config.LOG_FILE
+        backups = sorted(tmp_path.glob(logger_module.Config.LOG_FILE + ".*.gz"))
+        assert [backup.name[-5:] for backup in backups] == [".1.gz", ".2.gz"]
+        assert "message" in gzip.open(backups[0], "rt").read()
+        assert "message 0019" in log_file.read_text()
+    
+    def test_full_queue_drops(self):
+        """Test records are dropped instead of blocking when the queue is full"""
+        handler = DroppingQueueHandler(queue.Queue(1))
+        
+        handler.handle(make_record("first"))
+        handler.handle(make_record("second"))
+        
+        assert handler.dropped == 1
+        assert handler.queue.get_nowait().getMessage() == "first"
+    
+    def test_records_queued_unformatted(self):
+        """Test the caller only enqueues; message and traceback are formatted by the listener"""
+        handler = DroppingQueueHandler(queue.Queue())
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("sense_logger", logging.ERROR, __file__, 1, "Error %s", ("x",), sys.exc_info())
+        
+        with patch.object(logging.Formatter, 'format') as mock_format:
+            handler.handle(record)
+        queued = handler.queue.get_nowait()
+        
+        mock_format.assert_not_called()
+        assert queued.msg == "Error %s" and queued.args == ("x",)
+        assert queued.exc_info is not None and queued.exc_text is None
+        assert "ValueError: boom" in logging.Formatter().format(queued)
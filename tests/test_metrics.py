@@ -0,0 +1,106 @@
+"""
+Tests for the Prometheus metrics endpoint
+"""
+import pytest
+import sys
+import os
+import asyncio
+import urllib.error
+import urllib.request
+from datetime import datetime
+from unittest.mock import MagicMock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.writer import Sample, SampleQueue
+from src.models import RaspberryPiData
+from src.utils.metrics import Metrics, MetricsServer, serve_metrics
+from src.utils.scheduler import DeadlineScheduler
+
+
+def make_data():
+    return RaspberryPiData(
+        cpu_temp=None, cpu_percent=12.5, cpu_count=4, cpu_freq_mhz=1500.0,
+        mem_total_gb=4.0, mem_used_gb=2.0, mem_available_gb=2.0, mem_percent=50.0,
+        disk_total_gb=32.0, disk_used_gb=16.0, disk_free_gb=16.0, disk_percent=50.0,
+        load_avg_1min=0.5, load_avg_5min=0.6, load_avg_15min=0.7,
+    )
+
+
+def metric_lines(text):
+    return [line for line in text.splitlines() if not line.startswith("#")]
+
+
+class TestMetrics:
+    """Tests for rendering metrics"""
+    
+    def test_latest_readings(self):
+        """Test the newest sample of each table is exposed, skipping missing values"""
+        metrics = Metrics()
+        metrics.observe("raspberry_pi", datetime(2024, 1, 1), make_data())
+        
+        lines = metric_lines(metrics.render())
+        
+        assert "raspberry_pi_timestamp_seconds 1704067200.0" in lines
+        assert "raspberry_pi_cpu_percent 12.5" in lines
+        assert "raspberry_pi_cpu_count 4" in lines
+        assert not any(line.startswith("raspberry_pi_cpu_temp") for line in lines)
+    
+    def test_logger_metrics(self):
+        """Test queue, writer, spool and scheduler metrics are exposed"""
+        queue = SampleQueue(10)
+        queue.put(Sample("raspberry_pi", datetime(2024, 1, 1), make_data()))
+        writer = MagicMock(written=1234567, failed=2, writes=3, write_seconds=0.25, last_write_seconds=0.5)
+        job = DeadlineScheduler(1.0, clock=lambda: 0.0)
+        job.poll()
+        
+        metrics = Metrics(queue, writer, spool=[None] * 7, jobs={"system": job})
+        text = metrics.render()
+        lines = metric_lines(text)
+        
+        assert "sense_logger_queue_depth 1" in lines
+        assert "sense_logger_samples_written_total 1234567" in lines
+        assert "sense_logger_write_duration_seconds_count 3" in lines
+        assert "sense_logger_spool_samples 7" in lines
+        assert 'sense_logger_ticks_total{source="system"} 1' in lines
+        assert "# TYPE sense_logger_write_duration_seconds summary" in text
+
+
+class TestMetricsServer:
+    """Tests for serving metrics over HTTP"""
+    
+    def test_thread_server(self):
+        """Test GET /metrics returns the rendered metrics and other paths 404"""
+        metrics = Metrics(SampleQueue(10))
+        server = MetricsServer(metrics, 0)
+        server.start()
+        try:
+            url = f"http://127.0.0.1:{server.port}"
+            response = urllib.request.urlopen(f"{url}/metrics", timeout=5)
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert "sense_logger_queue_depth 0" in response.read().decode()
+            with pytest.raises(urllib.error.HTTPError):
+                urllib.request.urlopen(f"{url}/other", timeout=5)
+        finally:
+            server.stop()
+    
+    def test_async_server(self):
+        """Test the event loop server answers a scrape"""
+        metrics = Metrics(SampleQueue(10))
+        
+        async def scrape():
+            server = await serve_metrics(metrics, 0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            response = await reader.read()
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            return response.decode()
+        
+        response = asyncio.run(scrape())
+        
+        assert response.startswith("HTTP/1.1 200 OK")
+        assert "sense_logger_queue_depth 0" in response
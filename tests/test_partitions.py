@@ -0,0 +1,119 @@
+"""
+Tests for time-partitioned tables
+"""
+import pytest
+import sys
+import os
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database import Database
+from src.database import db as db_module
+from src.database.partitions import parse_partition_bounds, partition_name, partition_start
+
+# The Config class the database module actually reads
+Config = db_module.Config
+
+
+def partition_queries(partitioned_tables, partitions):
+    """fetchall() results for _partitioned_tables followed by _partitions of each table"""
+    results = [[(table,) for table in partitioned_tables]]
+    for table in partitioned_tables:
+        results.append(partitions.get(table, []))
+    return results
+
+
+class TestPartitionHelpers:
+    """Tests for partition naming and bounds"""
+    
+    def test_daily_start(self):
+        """Test a daily partition starts at midnight"""
+        assert partition_start(datetime(2024, 1, 3, 15, 30), "daily") == datetime(2024, 1, 3)
+    
+    def test_weekly_start(self):
+        """Test a weekly partition starts on Monday"""
+        assert partition_start(datetime(2024, 1, 3, 15, 30), "weekly") == datetime(2024, 1, 1)
+    
+    def test_partition_name(self):
+        """Test partition names carry the start date"""
+        assert partition_name("sensehat", datetime(2024, 1, 1)) == "sensehat_p20240101"
+    
+    def test_parse_bounds(self):
+        """Test range bounds are parsed and the default partition has none"""
+        bound = "FOR VALUES FROM ('2024-01-01 00:00:00') TO ('2024-01-02 00:00:00')"
+        assert parse_partition_bounds(bound) == (datetime(2024, 1, 1), datetime(2024, 1, 2))
+        assert parse_partition_bounds("DEFAULT") is None
+
+
+class TestPartitionMaintenance:
+    """Tests for creating and dropping partitions"""
+    
+    @patch('database.db.psycopg2.connect')
+    def test_init_creates_partitioned_tables(self, mock_connect, mock_db_connection):
+        """Test tables are created with PARTITION BY RANGE when enabled"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        
+        db = Database()
+        with patch.object(Config, 'DB_PARTITIONING', 'daily'), \
+             patch.object(db, 'create_partitions') as create_partitions:
+            db.init_database()
+        
+        ddl = [call[0][0] for call in mock_cur.execute.call_args_list if "CREATE TABLE" in call[0][0]]
+        assert len(ddl) == 3
+        assert all("PARTITION BY RANGE (timestamp)" in sql for sql in ddl)
+        assert all("PRIMARY KEY (id, timestamp)" in sql for sql in ddl)
+        create_partitions.assert_called_once()
+    
+    @patch('database.db.psycopg2.connect')
+    def test_create_upcoming_partitions(self, mock_connect, mock_db_connection):
+        """Test the current and next partitions are created, skipping existing ones"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        mock_cur.fetchall.side_effect = partition_queries(["sensehat"], {"sensehat": [
+            ("sensehat_default", "DEFAULT"),
+            ("sensehat_p20240101", "FOR VALUES FROM ('2024-01-01 00:00:00') TO ('2024-01-02 00:00:00')"),
+        ]})
+        
+        db = Database()
+        with patch.object(Config, 'DB_PARTITIONING', 'daily'), \
+             patch.object(Config, 'DB_PARTITIONS_AHEAD', 2):
+            created = db.create_partitions(datetime(2024, 1, 1, 12))
+        
+        assert created == ["sensehat_p20240102", "sensehat_p20240103"]
+        sql, params = mock_cur.execute.call_args[0]
+        assert "PARTITION OF sensehat FOR VALUES FROM (%s) TO (%s)" in sql
+        assert params == (datetime(2024, 1, 3), datetime(2024, 1, 4))
+        mock_conn.commit.assert_called_once()
+    
+    @patch('database.db.psycopg2.connect')
+    def test_drop_expired_partitions(self, mock_connect, mock_db_connection):
+        """Test only partitions entirely older than the retention window are dropped"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        mock_cur.fetchall.side_effect = partition_queries(["raspberry_pi"], {"raspberry_pi": [
+            ("raspberry_pi_p20240101", "FOR VALUES FROM ('2024-01-01 00:00:00') TO ('2024-01-08 00:00:00')"),
+            ("raspberry_pi_p20240108", "FOR VALUES FROM ('2024-01-08 00:00:00') TO ('2024-01-15 00:00:00')"),
+        ]})
+        
+        db = Database()
+        with patch.object(Config, 'DB_RETENTION_DAYS', 7):
+            dropped = db.drop_expired_partitions(datetime(2024, 1, 16))
+        
+        assert dropped == ["raspberry_pi_p20240101"]
+        mock_cur.execute.assert_any_call("DROP TABLE raspberry_pi_p20240101")
+    
+    @patch('database.db.psycopg2.connect')
+    def test_retention_disabled(self, mock_connect, mock_db_connection):
+        """Test nothing is dropped without a retention period"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        
+        db = Database()
+        with patch.object(Config, 'DB_RETENTION_DAYS', 0):
+            assert db.drop_expired_partitions() == []
+        
+        mock_cur.execute.assert_not_called()
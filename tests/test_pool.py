@@ -0,0 +1,148 @@
+"""
+Tests for the shared connection pool
+"""
+import pytest
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INERROR
+
+from src.database import ConnectionPool, Database
+from src.database import db as db_module
+from src.database import pool as pool_module
+
+
+def make_conn():
+    """Mock connection that reports an idle transaction status"""
+    conn = MagicMock()
+    conn.closed = 0
+    conn.get_transaction_status.return_value = TRANSACTION_STATUS_IDLE
+    return conn
+
+
+class TestConnectionPool:
+    """Tests for ConnectionPool"""
+    
+    def test_reuses_returned_connection(self):
+        """Test a returned connection is handed out again instead of reconnecting"""
+        connect = MagicMock(side_effect=lambda: make_conn())
+        pool = ConnectionPool(connect)
+        
+        conn = pool.getconn()
+        pool.putconn(conn)
+        
+        assert pool.getconn() is conn
+        assert connect.call_count == 1
+    
+    def test_max_size(self):
+        """Test getconn times out once max_size connections are borrowed"""
+        pool = ConnectionPool(make_conn, max_size=1, timeout=0.05)
+        pool.getconn()
+        
+        with pytest.raises(ConnectionError):
+            pool.getconn()
+    
+    def test_surplus_connection_closed(self):
+        """Test connections beyond max_idle are closed when returned"""
+        pool = ConnectionPool(make_conn, max_idle=1)
+        first, second = pool.getconn(), pool.getconn()
+        pool.putconn(first)
+        pool.putconn(second)
+        
+        second.close.assert_called_once()
+        first.close.assert_not_called()
+        assert pool.size == 1
+    
+    def test_rollback_on_return(self):
+        """Test a connection left in a failed transaction is rolled back"""
+        pool = ConnectionPool(make_conn)
+        conn = pool.getconn()
+        conn.get_transaction_status.return_value = TRANSACTION_STATUS_INERROR
+        pool.putconn(conn)
+        
+        conn.rollback.assert_called_once()
+        assert pool.getconn() is conn
+    
+    def test_dead_idle_connection_replaced(self):
+        """Test an idle connection that fails its health check is discarded"""
+        pool = ConnectionPool(make_conn, check_interval=0)
+        dead = pool.getconn()
+        pool.putconn(dead)
+        dead.cursor.return_value.execute.side_effect = Exception("server closed the connection")
+        
+        conn = pool.getconn()
+        
+        assert conn is not dead
+        dead.close.assert_called_once()
+        assert pool.size == 1
+    
+    def test_backoff_after_failure(self):
+        """Test no reconnect is attempted until the backoff has expired"""
+        connect = MagicMock(side_effect=Exception("connection refused"))
+        pool = ConnectionPool(connect, backoff_min=10, backoff_max=60)
+        
+        with patch.object(pool_module, 'monotonic', return_value=100.0):
+            with pytest.raises(Exception, match="connection refused"):
+                pool.getconn()
+            with pytest.raises(ConnectionError, match="next connection attempt"):
+                pool.getconn()
+        assert connect.call_count == 1
+        assert pool.size == 0
+        
+        connect.side_effect = None
+        connect.return_value = make_conn()
+        with patch.object(pool_module, 'monotonic', return_value=111.0):
+            assert pool.getconn() is connect.return_value
+    
+    def test_backoff_grows(self):
+        """Test the delay doubles with every failed attempt up to backoff_max"""
+        connect = MagicMock(side_effect=Exception("connection refused"))
+        pool = ConnectionPool(connect, backoff_min=1, backoff_max=4)
+        
+        delays = []
+        now = 0.0
+        with patch.object(pool_module.random, 'uniform', side_effect=lambda low, high: high):
+            for _ in range(4):
+                with patch.object(pool_module, 'monotonic', return_value=now):
+                    with pytest.raises(Exception):
+                        pool.getconn()
+                delays.append(pool._retry_at - now)
+                now = pool._retry_at
+        
+        assert delays == [1, 2, 4, 4]
+
+
+class TestDatabasePooling:
+    """Tests for Database borrowing pooled connections"""
+    
+    @patch('database.db.psycopg2.connect')
+    def test_instances_share_connection(self, mock_connect, mock_db_connection):
+        """Test a connection released by one Database is reused by another"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        
+        mock_cur.fetchall.return_value = []
+        
+        with patch.object(db_module.Config, 'DB_RETENTION_DAYS', 7):
+            Database(batch_size=1).drop_expired_partitions()
+            Database(batch_size=1).drop_expired_partitions()
+        
+        assert mock_connect.call_count == 1
+        mock_conn.close.assert_not_called()
+    
+    @patch('database.db.psycopg2.connect')
+    def test_connect_options(self, mock_connect, mock_db_connection):
+        """Test connections enable TCP keepalives, a UTC session and a statement timeout"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        
+        Database().get_connection()
+        
+        kwargs = mock_connect.call_args[1]
+        assert kwargs["keepalives"] == 1
+        assert "statement_timeout" in kwargs["options"]
+        assert "-c TimeZone=UTC" in kwargs["options"]
@@ -0,0 +1,105 @@
+"""
+Tests for the in-memory sample history
+"""
+import pytest
+import sys
+import os
+import math
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models import RaspberryPiData
+from src.utils.ringbuffer import RingBuffer, SampleHistory, to_epoch
+
+
+def filled(count, capacity=4):
+    """Buffer with samples at t = 0, 1, ... and a = 10 * t"""
+    buffer = RingBuffer(["a", "b"], capacity)
+    for t in range(count):
+        buffer.append(float(t), [10.0 * t, None])
+    return buffer
+
+
+class TestRingBuffer:
+    """Tests for RingBuffer"""
+    
+    def test_empty(self):
+        """Test an empty buffer has no last value and empty slices"""
+        buffer = filled(0)
+        
+        assert buffer.last() is None
+        assert len(buffer.last_n(3).timestamps) == 0
+        assert len(buffer.window(0).timestamps) == 0
+    
+    def test_last(self):
+        """Test the newest sample is returned with None stored as NaN"""
+        timestamp, values = filled(6).last()
+        
+        assert timestamp == 5.0
+        assert values["a"] == 50.0
+        assert math.isnan(values["b"])
+    
+    def test_last_n_across_wrap(self):
+        """Test last_n returns the newest samples in order after wrapping around"""
+        buffer = filled(7)
+        window = buffer.last_n(10)
+        
+        assert len(buffer) == 4
+        assert list(window.timestamps) == [3.0, 4.0, 5.0, 6.0]
+        assert list(window.columns["a"]) == [30.0, 40.0, 50.0, 60.0]
+    
+    def test_views_are_zero_copy(self):
+        """Test slices are memoryviews sharing the buffer's memory"""
+        buffer = filled(3)
+        window = buffer.last_n(1)
+        
+        assert isinstance(window.timestamps, memoryview)
+        assert window.columns["a"].obj is buffer._columns["a"]
+    
+    def test_window(self):
+        """Test window selects start <= timestamp < end"""
+        buffer = filled(6)
+        
+        assert list(buffer.window(3.0, 5.0).timestamps) == [3.0, 4.0]
+        assert list(buffer.window(3.5).timestamps) == [4.0, 5.0]
+        assert list(buffer.window(0.0, 2.5).timestamps) == [2.0]
+        assert list(buffer.window(9.0).timestamps) == []
+    
+    def test_fixed_memory(self):
+        """Test the memory use depends on the capacity only"""
+        buffer = filled(0, capacity=1000)
+        size = buffer.nbytes
+        for t in range(5000):
+            buffer.append(float(t), [1.0, 2.0])
+        
+        assert buffer.nbytes == size == 3 * 2 * 1000 * 8
+    
+    def test_invalid_capacity(self):
+        """Test a non-positive capacity is rejected"""
+        with pytest.raises(ValueError):
+            RingBuffer(["a"], 0)
+
+
+class TestSampleHistory:
+    """Tests for SampleHistory"""
+    
+    def test_record(self):
+        """Test samples of kept tables are stored by field name, others ignored"""
+        history = SampleHistory()
+        history.add("raspberry_pi", RaspberryPiData, 10)
+        data = RaspberryPiData(
+            cpu_temp=None, cpu_percent=12.5, cpu_count=4, cpu_freq_mhz=1500.0,
+            mem_total_gb=4.0, mem_used_gb=2.0, mem_available_gb=2.0, mem_percent=50.0,
+            disk_total_gb=32.0, disk_used_gb=16.0, disk_free_gb=16.0, disk_percent=50.0,
+            load_avg_1min=0.5, load_avg_5min=0.6, load_avg_15min=0.7,
+        )
+        
+        history.record("raspberry_pi", datetime(2024, 1, 1), data)
+        history.record("sensehat", datetime(2024, 1, 1), object())
+        
+        timestamp, values = history["raspberry_pi"].last()
+        assert timestamp == to_epoch(datetime(2024, 1, 1))
+        assert values["cpu_percent"] == 12.5
+        assert math.isnan(values["cpu_temp"])
@@ -0,0 +1,135 @@
+"""
+Tests for the rollup tables
+"""
+import pytest
+import sys
+import os
+import threading
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database import Database
+from src.database.rollup import Rollups, RollupWorker, resolution_table, safe_bound, select_resolution
+
+
+class TestResolution:
+    """Tests for picking the resolution of a time range"""
+    
+    def test_short_range_uses_raw_table(self):
+        """Test short ranges are served from the raw table"""
+        end = datetime(2024, 1, 1)
+        assert select_resolution(end - timedelta(hours=1), end, raw_interval=5) == "raw"
+        assert resolution_table("sensehat", end - timedelta(hours=1), end, raw_interval=5) == "sensehat"
+    
+    def test_medium_range_uses_minutes(self):
+        """Test ranges too long for raw rows use the 1-minute rollup"""
+        end = datetime(2024, 1, 1)
+        assert resolution_table("sensehat", end - timedelta(hours=12), end, raw_interval=5) == "sensehat_1m"
+    
+    def test_long_range_uses_hours(self):
+        """Test long ranges use the 1-hour rollup, even beyond max_points"""
+        end = datetime(2024, 1, 1)
+        assert resolution_table("raspberry_pi", end - timedelta(days=30), end, raw_interval=5) == "raspberry_pi_1h"
+        assert select_resolution(end - timedelta(days=365), end, raw_interval=5) == "1h"
+    
+    def test_source_interval(self):
+        """Test each table is judged by the sampling interval of its own source"""
+        from src.database import rollup as rollup_module
+        end = datetime(2024, 1, 1)
+        with patch.object(rollup_module.Config, 'SENSEHAT_INTERVAL', 60), \
+                patch.object(rollup_module.Config, 'SYSTEM_INTERVAL', 5):
+            # 12 hours: 720 sensehat rows, 8640 raspberry_pi rows
+            assert resolution_table("sensehat", end - timedelta(hours=12), end) == "sensehat"
+            assert resolution_table("raspberry_pi", end - timedelta(hours=12), end) == "raspberry_pi_1m"
+
+
+class TestRollups:
+    """Tests for incremental rollup updates"""
+    
+    def test_upsert_merges_buckets(self):
+        """Test the upsert aggregates one id range and merges into existing buckets"""
+        sql = Rollups(Database(batch_size=1))._upsert_sql("sensehat", "1m")
+        
+        assert "INSERT INTO sensehat_1m AS r" in sql
+        assert "date_trunc('minute', timestamp)" in sql
+        assert "WHERE id > %s AND id <= %s" in sql
+        assert "ON CONFLICT (timestamp, device_id)" in sql
+        assert "temperature_min = LEAST(r.temperature_min, EXCLUDED.temperature_min)" in sql
+        assert "temperature_max = GREATEST(r.temperature_max, EXCLUDED.temperature_max)" in sql
+        # Weighted by the non-null values of the field, not by all samples of the bucket
+        assert "COUNT(temperature)" in sql
+        assert "r.temperature_avg * COALESCE(r.temperature_count, r.sample_count)" in sql
+        assert "EXCLUDED.temperature_avg * EXCLUDED.temperature_count" in sql
+        assert "temperature_count = COALESCE(r.temperature_count, r.sample_count) + EXCLUDED.temperature_count" in sql
+    
+    @patch('database.db.psycopg2.connect')
+    def test_update_processes_new_ids_in_chunks(self, mock_connect, mock_db_connection):
+        """Test only ids above the watermark are processed, advancing it per chunk"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        # Watermark 100, newest id 250, no transaction in flight
+        mock_cur.fetchone.side_effect = [(100, None, None), (250, 7, 7)]
+        mock_cur.rowcount = 3
+        
+        rollups = Rollups(Database(batch_size=1), chunk_size=100)
+        written = rollups._update_rollup("sensehat", "1m")
+        
+        ranges = [call[0][1] for call in mock_cur.execute.call_args_list if "INSERT INTO sensehat_1m" in call[0][0]]
+        watermarks = [call[0][1] for call in mock_cur.execute.call_args_list if "INTO rollup_state" in call[0][0]]
+        assert ranges == [(100, 200), (200, 250)]
+        assert watermarks == [("sensehat_1m", 200, None, None), ("sensehat_1m", 250, None, None)]
+        assert written == 6
+    
+    @patch('database.db.psycopg2.connect')
+    def test_update_without_new_rows(self, mock_connect, mock_db_connection):
+        """Test nothing is written when the watermark is current"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        mock_cur.fetchone.side_effect = [(250, None, None), (250, 7, 7)]
+        
+        written = Rollups(Database(batch_size=1))._update_rollup("raspberry_pi", "1h")
+        
+        assert written == 0
+        assert mock_cur.execute.call_count == 2
+    
+    @patch('database.db.psycopg2.connect')
+    def test_update_waits_for_transactions_in_flight(self, mock_connect, mock_db_connection):
+        """Test ids read while transactions are in flight are only recorded as pending"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        # Transaction 5 is still running when id 250 is read
+        mock_cur.fetchone.side_effect = [(100, None, None), (250, 5, 9)]
+        
+        written = Rollups(Database(batch_size=1))._update_rollup("sensehat", "1m")
+        
+        watermarks = [call[0][1] for call in mock_cur.execute.call_args_list if "INTO rollup_state" in call[0][0]]
+        assert written == 0
+        assert watermarks == [("sensehat_1m", 100, 250, 9)]
+    
+    def test_safe_bound(self):
+        """Test the watermark only passes ids no transaction in flight can still commit"""
+        # Nothing in flight
+        assert safe_bound(100, None, 250, 9, 9) == (250, None)
+        # In flight: remember the newest id, keep the watermark
+        assert safe_bound(100, None, 250, 5, 9) == (100, (250, 9))
+        # Still in flight: keep the older pending id so it is not postponed forever
+        assert safe_bound(100, (250, 9), 300, 8, 12) == (100, (250, 9))
+        # The transactions of the pending id have finished, newer ones have not
+        assert safe_bound(100, (250, 9), 300, 10, 12) == (250, (300, 12))
+    
+    def test_worker_creates_tables_once(self):
+        """Test the worker creates the tables before its first update"""
+        updated = threading.Event()
+        rollups = MagicMock()
+        rollups.update.side_effect = lambda: updated.set() or {}
+        worker = RollupWorker(rollups, interval=60)
+        worker.start()
+        assert updated.wait(5)
+        worker.stop()
+        
+        rollups.init_tables.assert_called_once()
+        rollups.update.assert_called_once()
+
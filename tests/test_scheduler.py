@@ -0,0 +1,128 @@
+"""
+Tests for the sampling scheduler
+"""
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.scheduler import DeadlineScheduler, MultiRateScheduler
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+    
+    def __init__(self, now=100.0):
+        self.now = now
+        self.sleeps = []
+    
+    def __call__(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestDeadlineScheduler:
+    """Tests for DeadlineScheduler"""
+    
+    def test_fixed_grid_without_drift(self):
+        """Test work time is absorbed instead of added to the period"""
+        clock = FakeClock()
+        scheduler = DeadlineScheduler(5, clock=clock, sleep=clock.sleep)
+        
+        deadlines = []
+        for _ in range(4):
+            tick = scheduler.wait()
+            deadlines.append(tick.deadline)
+            clock.now += 1.3  # read + write time
+        
+        assert deadlines == [100.0, 105.0, 110.0, 115.0]
+        assert clock.sleeps == pytest.approx([3.7, 3.7, 3.7])
+    
+    def test_align_to_wall_clock(self):
+        """Test the first tick waits for the next wall-clock multiple"""
+        clock = FakeClock()
+        scheduler = DeadlineScheduler(5, align=True, clock=clock, sleep=clock.sleep,
+                                      wall_clock=lambda: 1000.5)
+        
+        tick = scheduler.wait()
+        
+        assert tick.deadline == pytest.approx(104.5)
+    
+    def test_late_tick_records_lateness(self):
+        """Test a small overrun fires late and records lateness"""
+        clock = FakeClock()
+        scheduler = DeadlineScheduler(5, clock=clock, sleep=clock.sleep)
+        scheduler.wait()
+        clock.now += 6.0
+        
+        tick = scheduler.wait()
+        
+        assert tick.missed == 0
+        assert tick.lateness == pytest.approx(1.0)
+        assert scheduler.stats.max == pytest.approx(1.0)
+    
+    def test_skip_missed_ticks(self):
+        """Test skip waits for the next grid point after an overrun"""
+        clock = FakeClock()
+        scheduler = DeadlineScheduler(5, missed="skip", clock=clock, sleep=clock.sleep)
+        scheduler.wait()
+        clock.now += 12.0
+        
+        tick = scheduler.wait()
+        
+        assert tick.missed == 2  # 105 and 110 dropped
+        assert tick.deadline == 115.0
+        assert clock.now == 115.0
+    
+    def test_coalesce_missed_ticks(self):
+        """Test coalesce fires one tick immediately, then continues on the grid"""
+        clock = FakeClock()
+        scheduler = DeadlineScheduler(5, missed="coalesce", clock=clock, sleep=clock.sleep)
+        scheduler.wait()
+        clock.now += 12.0
+        
+        tick = scheduler.wait()
+        next_tick = scheduler.wait()
+        
+        assert tick.missed == 1  # 105 merged into the 110 tick
+        assert tick.deadline == 110.0
+        assert tick.lateness == pytest.approx(2.0)
+        assert next_tick.deadline == 115.0
+        assert scheduler.stats.missed == 1
+    
+    def test_invalid_policy(self):
+        """Test unknown missed tick policies are rejected"""
+        with pytest.raises(ValueError):
+            DeadlineScheduler(5, missed="catch-up")
+
+
+class TestMultiRateScheduler:
+    """Tests for MultiRateScheduler"""
+    
+    def test_sources_fire_at_their_own_rates(self):
+        """Test each job fires on its own grid from one loop"""
+        clock = FakeClock(0.0)
+        scheduler = MultiRateScheduler(clock=clock, sleep=clock.sleep)
+        scheduler.add("fast", 1)
+        scheduler.add("slow", 3)
+        
+        fired = []
+        while clock.now < 6:
+            fired.extend((clock.now, name) for name, _ in scheduler.wait())
+        
+        assert [t for t, name in fired if name == "fast"] == [0, 1, 2, 3, 4, 5, 6]
+        assert [t for t, name in fired if name == "slow"] == [0, 3, 6]
+    
+    def test_due_jobs_keep_insertion_order(self):
+        """Test jobs due at the same time are returned in the order they were added"""
+        clock = FakeClock(0.0)
+        scheduler = MultiRateScheduler(clock=clock, sleep=clock.sleep)
+        scheduler.add("environment", 5)
+        scheduler.add("sensehat", 1)
+        
+        assert [name for name, _ in scheduler.wait()] == ["environment", "sensehat"]
@@ -9,7 +9,7 @@ from unittest.mock import patch, MagicMock
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.sensors import SenseHatReader, SystemReader
+from src.sensors import SenseHatReader, SystemReader, CpuSampler, CpuUsage
 from src.models import SenseHatData, RaspberryPiData
 
 
@@ -77,7 +77,7 @@ class TestSystemReader:
     @patch('psutil.virtual_memory')
     @patch('psutil.cpu_freq')
     @patch('psutil.cpu_count')
-    @patch('psutil.cpu_percent')
+    @patch.object(CpuSampler, 'sample')
     @patch('builtins.open')
     def test_read_system_data(self, mock_open, mock_cpu_percent, mock_cpu_count,
                               mock_cpu_freq, mock_mem, mock_disk, mock_loadavg):
@@ -88,8 +88,8 @@ class TestSystemReader:
         mock_file.__enter__.return_value = mock_file
         mock_open.return_value = mock_file
         
-        # Mock psutil
-        mock_cpu_percent.return_value = 25.0
+        # Mock CPU sampler and psutil
+        mock_cpu_percent.return_value = CpuUsage(25.0, [20.0, 30.0], 250000, 1000000)
         mock_cpu_count.return_value = 4
         mock_cpu_freq_obj = MagicMock()
         mock_cpu_freq_obj.current = 1500.0
@@ -126,7 +126,7 @@ class TestSystemReader:
     @patch('psutil.virtual_memory')
     @patch('psutil.cpu_freq')
     @patch('psutil.cpu_count')
-    @patch('psutil.cpu_percent')
+    @patch.object(CpuSampler, 'sample')
     @patch('builtins.open')
     def test_read_system_data_no_cpu_temp(self, mock_open, mock_cpu_percent,
                                          mock_cpu_count, mock_cpu_freq,
@@ -135,8 +135,8 @@ class TestSystemReader:
         # Mock file not found
         mock_open.side_effect = FileNotFoundError
         
-        # Mock psutil
-        mock_cpu_percent.return_value = 25.0
+        # Mock CPU sampler and psutil
+        mock_cpu_percent.return_value = CpuUsage(25.0, [20.0, 30.0], 250000, 1000000)
         mock_cpu_count.return_value = 4
         mock_cpu_freq.return_value = None  # No CPU freq available
         
@@ -161,4 +161,69 @@ class TestSystemReader:
         
         assert data.cpu_temp is None
         assert data.cpu_freq_mhz is None
+    
+    @patch.object(CpuSampler, 'sample')
+    @patch('psutil.disk_usage')
+    def test_disk_usage_reused_between_refreshes(self, mock_disk, mock_cpu_sample, mock_psutil):
+        """Test read(refresh_disk=False) reuses the last disk reading"""
+        mock_cpu_sample.return_value = CpuUsage(25.0, [25.0], 250000, 1000000)
+        mock_disk_obj = MagicMock()
+        mock_disk_obj.total = 32 * 1024**3
+        mock_disk_obj.used = 16 * 1024**3
+        mock_disk_obj.free = 16 * 1024**3
+        mock_disk_obj.percent = 50.0
+        mock_disk.return_value = mock_disk_obj
+        
+        reader = SystemReader()
+        reader.read()
+        reader.read(refresh_disk=False)
+        reader.read(refresh_disk=False)
+        
+        assert mock_disk.call_count == 1
+        assert reader.read(refresh_disk=False).disk_percent == 50.0
 
+
+PROC_STAT = """cpu  {0} 0 {1} {2} 0 0 0 0 0 0
+cpu0 {0} 0 {1} {2} 0 0 0 0 0 0
+intr 12345
+"""
+
+
+class TestCpuSampler:
+    """Tests for CpuSampler"""
+    
+    def write_stat(self, path, user, system, idle):
+        path.write_text(PROC_STAT.format(user, system, idle))
+    
+    def test_first_sample_is_since_boot(self, tmp_path):
+        """Test the first sample reports the average since boot instead of 0"""
+        stat = tmp_path / "stat"
+        self.write_stat(stat, 100, 100, 600)
+        
+        usage = CpuSampler(str(stat)).sample()
+        
+        assert usage.percent == 25.0
+        assert usage.per_core == [25.0]
+    
+    def test_delta_between_samples(self, tmp_path):
+        """Test utilisation is computed from counter deltas"""
+        stat = tmp_path / "stat"
+        self.write_stat(stat, 100, 100, 600)
+        sampler = CpuSampler(str(stat))
+        sampler.sample()
+        
+        self.write_stat(stat, 160, 120, 620)
+        usage = sampler.sample()
+        
+        assert usage.percent == 80.0
+        assert usage.total_us == 100 * sampler._us_per_tick
+        assert usage.busy_us == 80 * sampler._us_per_tick
+    
+    def test_no_new_ticks_returns_previous(self, tmp_path):
+        """Test a repeated sample within one clock tick keeps the last value"""
+        stat = tmp_path / "stat"
+        self.write_stat(stat, 100, 100, 600)
+        sampler = CpuSampler(str(stat))
+        first = sampler.sample()
+        
+        assert sampler.sample() == first
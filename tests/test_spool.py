@@ -0,0 +1,151 @@
+"""
+Tests for the on-disk sample spool
+"""
+import pytest
+import sys
+import os
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database import Database
+from src.database.spool import Spool, SpoolReplayer
+
+
+def make_row(second, value=1.0):
+    """Build a raspberry_pi row with a NULL cpu_temp"""
+    return (datetime(2024, 1, 1, 12, 0, second, 250), "pi-1", None) + (value,) * 14
+
+
+class TestSpool:
+    """Tests for Spool"""
+    
+    def test_append_and_peek(self, tmp_path):
+        """Test records keep their table, timestamp, values and NULLs"""
+        spool = Spool(str(tmp_path / "spool.bin"), capacity=10)
+        spool.append_rows("raspberry_pi", [make_row(1), make_row(2, 2.5)])
+        
+        records = spool.peek(10)
+        
+        assert len(spool) == 2
+        assert [r.seq for r in records] == [0, 1]
+        assert records[0].table == "raspberry_pi"
+        assert records[0].timestamp == datetime(2024, 1, 1, 12, 0, 1, 250)
+        assert records[0].values[0] is None
+        assert records[1].values[1] == 2.5
+    
+    def test_consume(self, tmp_path):
+        """Test consumed records are removed from the front"""
+        spool = Spool(str(tmp_path / "spool.bin"), capacity=10)
+        spool.append_rows("raspberry_pi", [make_row(i) for i in range(5)])
+        
+        spool.consume(2)
+        
+        assert len(spool) == 2
+        assert spool.peek(10)[0].seq == 3
+    
+    def test_evicts_oldest_when_full(self, tmp_path):
+        """Test the oldest records are overwritten once capacity is reached"""
+        spool = Spool(str(tmp_path / "spool.bin"), capacity=3)
+        spool.append_rows("raspberry_pi", [make_row(i) for i in range(5)])
+        
+        records = spool.peek(10)
+        
+        assert len(spool) == 3
+        assert spool.evicted == 2
+        assert [r.timestamp.second for r in records] == [2, 3, 4]
+        assert os.path.getsize(tmp_path / "spool.bin") == 64 + 3 * 144
+    
+    def test_survives_reopen(self, tmp_path):
+        """Test pending records are still there after reopening the file"""
+        path = str(tmp_path / "spool.bin")
+        spool = Spool(path, capacity=10)
+        spool.append_rows("raspberry_pi", [make_row(i) for i in range(3)])
+        spool.consume(0)
+        spool.close()
+        
+        reopened = Spool(path, capacity=10)
+        
+        assert len(reopened) == 2
+        assert reopened.peek(10)[0].seq == 1
+    
+    def test_corrupt_record_skipped(self, tmp_path):
+        """Test a torn record is skipped instead of replayed"""
+        path = str(tmp_path / "spool.bin")
+        spool = Spool(path, capacity=10)
+        spool.append_rows("raspberry_pi", [make_row(1), make_row(2)])
+        with open(path, "r+b") as f:
+            f.seek(64 + 20)
+            f.write(b"\xff\xff")
+        
+        records = spool.peek(10)
+        
+        assert [r.seq for r in records] == [1]
+
+
+class TestSpoolFallback:
+    """Tests for Database spooling and replay"""
+    
+    @patch('database.db.psycopg2.connect')
+    def test_failed_write_is_spooled(self, mock_connect, mock_db_connection, tmp_path):
+        """Test a failed write goes to the spool instead of raising"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        
+        spool = Spool(str(tmp_path / "spool.bin"), capacity=10)
+        db = Database(batch_size=1, spool=spool)
+        db.insert_rows = MagicMock(side_effect=Exception("connection lost"))
+        db._write("raspberry_pi", [make_row(1)])
+        
+        assert len(spool) == 1
+    
+    @patch('database.db.psycopg2.connect')
+    def test_unspoolable_table_raises(self, mock_connect, mock_db_connection, tmp_path):
+        """Test rows too wide for a spool record are not spooled"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        
+        spool = Spool(str(tmp_path / "spool.bin"), capacity=10)
+        db = Database(batch_size=1, spool=spool)
+        db.insert_rows = MagicMock(side_effect=Exception("connection lost"))
+        with pytest.raises(Exception):
+            db._write("sensehat_motion", [make_row(1)])
+        
+        assert len(spool) == 0
+    
+    @patch('database.db.psycopg2.connect')
+    def test_replay_skips_existing_rows(self, mock_connect, mock_db_connection, tmp_path):
+        """Test replayed rows use their original timestamps and a NOT EXISTS guard"""
+        mock_conn, mock_cur = mock_db_connection
+        mock_connect.return_value = mock_conn
+        
+        spool = Spool(str(tmp_path / "spool.bin"), capacity=10)
+        spool.append_rows("raspberry_pi", [make_row(1), make_row(2)])
+        db = Database(batch_size=1)
+        db.replay_records(spool.peek(10))
+        
+        sql, params = mock_cur.execute.call_args[0]
+        assert "NOT EXISTS" in sql
+        assert params[0] == datetime(2024, 1, 1, 12, 0, 1, 250)
+        assert isinstance(params[4], int)  # cpu_count restored as integer
+        mock_conn.commit.assert_called_once()
+    
+    def test_replayer_drains_spool(self, tmp_path):
+        """Test the replayer writes spooled records and removes them"""
+        spool = Spool(str(tmp_path / "spool.bin"), capacity=10)
+        spool.append_rows("raspberry_pi", [make_row(i) for i in range(3)])
+        db = MagicMock()
+        
+        replayer = SpoolReplayer(spool, db, rate=0, poll_interval=0.01)
+        replayer.start()
+        for _ in range(100):
+            if not len(spool):
+                break
+            replayer._stop_event.wait(0.01)
+        replayer.stop()
+        
+        assert len(spool) == 0
+        assert replayer.replayed == 3
+        db.replay_records.assert_called()
@@ -0,0 +1,147 @@
+"""
+Tests for swinging-door compression
+"""
+import math
+import random
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.filters import Deadband, SwingingDoor, SwingingDoorFilter, reconstruct
+from src.models import SenseHatData
+
+
+def compress(door, values, step=1.0):
+    points = []
+    for i, value in enumerate(values):
+        points += door.add(i * step, value)
+    return points + door.flush()
+
+
+class TestSwingingDoor:
+    """Tests for a single field"""
+    
+    def test_straight_line(self):
+        """Test a linear ramp is reduced to its end points"""
+        points = compress(SwingingDoor(Deadband(0.01)), [2.0 * i for i in range(100)])
+        
+        assert points == [(0.0, 0.0), (99.0, 198.0)]
+    
+    def test_corner(self):
+        """Test a change of slope is kept as a corner point"""
+        values = [float(i) for i in range(10)] + [9.0 - i for i in range(1, 10)]
+        
+        points = compress(SwingingDoor(Deadband(0.1)), values)
+        
+        assert points == [(0.0, 0.0), (9.0, 9.0), (18.0, 0.0)]
+    
+    def test_max_error(self):
+        """Test every original value is reconstructed within the deviation"""
+        rng = random.Random(42)
+        values, value = [], 20.0
+        for _ in range(5000):
+            value += rng.uniform(-0.3, 0.3)
+            values.append(value)
+        
+        door = SwingingDoor(Deadband(0.5))
+        points = compress(door, values)
+        restored = reconstruct(points, [float(i) for i in range(len(values))])
+        
+        assert max(abs(a - b) for a, b in zip(values, restored)) <= 0.5 + 1e-9
+        assert door.seen == 5000
+        assert door.kept == len(points) < 1000
+    
+    def test_relative_deviation(self):
+        """Test a relative deviation is taken of the archived value"""
+        door = SwingingDoor(Deadband(0.01, relative=True))
+        
+        points = compress(door, [1000.0, 1005.0, 1000.0, 1030.0])
+        
+        assert points == [(0.0, 1000.0), (2.0, 1000.0), (3.0, 1030.0)]
+    
+    def test_max_interval(self):
+        """Test a point is archived at least every max_interval seconds"""
+        points = compress(SwingingDoor(Deadband(1.0), max_interval=10), [5.0] * 35)
+        
+        assert [t for t, _ in points] == [0.0, 10.0, 20.0, 30.0, 34.0]
+    
+    def test_gap(self):
+        """Test missing values end a segment and are not interpolated across"""
+        door = SwingingDoor(Deadband(0.1))
+        
+        points = compress(door, [1.0, 1.0, 1.0, None, float("nan"), 4.0, 4.0])
+        
+        assert points == [(0.0, 1.0), (2.0, 1.0), (3.0, None), (5.0, 4.0), (6.0, 4.0)]
+        assert reconstruct(points, [1.0, 2.5, 3.0, 4.0, 5.5]) == [1.0, None, None, None, 4.0]
+    
+    def test_flush_is_idempotent(self):
+        """Test flushing twice does not repeat the last point"""
+        door = SwingingDoor()
+        door.add(0.0, 1.0)
+        door.add(1.0, 2.0)
+        
+        assert door.flush() == [(1.0, 2.0)]
+        assert door.flush() == []
+
+
+class TestReconstruct:
+    """Tests for reconstruct()"""
+    
+    def test_interpolate(self):
+        """Test values between corners are interpolated and outside ones are None"""
+        points = [(10.0, 0.0), (20.0, 10.0), (30.0, 0.0)]
+        
+        assert reconstruct(points, [5.0, 10.0, 15.0, 25.0, 30.0, 35.0]) == [None, 0.0, 5.0, 5.0, 0.0, None]
+
+
+class TestSwingingDoorFilter:
+    """Tests for SwingingDoorFilter"""
+    
+    def test_per_field_deviations(self):
+        """Test table-qualified deviations win over field-wide ones and the default"""
+        sdt = SwingingDoorFilter(
+            {"temperature": Deadband(0.5), "sensehat.humidity": Deadband(2.0)}, default=Deadband(0.0)
+        )
+        sdt.add_values("sensehat", 0.0, {"temperature": 20.0, "humidity": 50.0, "pressure": 1000.0})
+        
+        assert sdt.doors[("sensehat", "temperature")].deviation == Deadband(0.5)
+        assert sdt.doors[("sensehat", "humidity")].deviation == Deadband(2.0)
+        assert sdt.doors[("sensehat", "pressure")].deviation == Deadband(0.0)
+    
+    def test_add_sample(self):
+        """Test dataclass samples are split into fields and only new corners returned"""
+        sdt = SwingingDoorFilter(default=Deadband(1.0))
+        start = datetime(2024, 1, 1)
+        sample = SenseHatData(*([1.0] * 15))
+        
+        first = sdt.add("sensehat", start, sample)
+        second = sdt.add("sensehat", start + timedelta(seconds=1), sample)
+        
+        assert len(first) == 15
+        assert first["temperature"] == [(1704067200.0, 1.0)]
+        assert second == {}
+        assert sdt.flush("sensehat")["temperature"] == [(1704067201.0, 1.0)]
+        assert sdt.flush("raspberry_pi") == {}
+        assert "sensehat.temperature 2/2 kept" in sdt.stats()
+    
+    def test_error_bound_per_field(self):
+        """Test every field stays within its own deviation"""
+        rng = random.Random(7)
+        sdt = SwingingDoorFilter({"a": Deadband(0.1), "b": Deadband(5.0)})
+        series = {"a": [], "b": []}
+        points = {"a": [], "b": []}
+        for i in range(2000):
+            values = {"a": math.sin(i / 50) + rng.gauss(0, 0.02), "b": rng.uniform(0, 10)}
+            for name, value in values.items():
+                series[name].append(value)
+            for name, emitted in sdt.add_values("t", float(i), values).items():
+                points[name] += emitted
+        for name, emitted in sdt.flush("t").items():
+            points[name] += emitted
+        
+        for name, deviation in (("a", 0.1), ("b", 5.0)):
+            restored = reconstruct(points[name], [float(i) for i in range(2000)])
+            assert max(abs(x - y) for x, y in zip(series[name], restored)) <= deviation + 1e-9
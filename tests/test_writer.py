@@ -0,0 +1,132 @@
+"""
+Tests for the sample queue and background writer
+"""
+import pytest
+import sys
+import os
+import threading
+from datetime import datetime
+from unittest.mock import MagicMock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.writer import Sample, SampleQueue, WriterThread, merge_samples
+from src.models import RaspberryPiData
+
+
+def make_sample(value, table="raspberry_pi"):
+    data = RaspberryPiData(
+        cpu_temp=None, cpu_percent=value, cpu_count=4, cpu_freq_mhz=1500.0,
+        mem_total_gb=4.0, mem_used_gb=2.0, mem_available_gb=2.0, mem_percent=50.0,
+        disk_total_gb=32.0, disk_used_gb=16.0, disk_free_gb=16.0, disk_percent=50.0,
+        load_avg_1min=0.5, load_avg_5min=0.6, load_avg_15min=0.7,
+    )
+    return Sample(table, datetime(2024, 1, 1, 0, 0, int(value) % 60), data)
+
+
+class TestSampleQueue:
+    """Tests for SampleQueue backpressure policies"""
+    
+    def test_get_batch(self):
+        """Test samples come out in order, up to the batch size"""
+        queue = SampleQueue(10)
+        for i in range(5):
+            queue.put(make_sample(i))
+        
+        batch = queue.get_batch(3, timeout=0)
+        
+        assert [s.data.cpu_percent for s in batch] == [0, 1, 2]
+        assert queue.depth == 2
+        assert queue.max_depth == 5
+    
+    def test_drop_oldest(self):
+        """Test the oldest sample is dropped when full"""
+        queue = SampleQueue(2, "drop_oldest")
+        for i in range(3):
+            queue.put(make_sample(i))
+        
+        batch = queue.get_batch(10, timeout=0)
+        
+        assert [s.data.cpu_percent for s in batch] == [1, 2]
+        assert queue.dropped == 1
+    
+    def test_block_with_timeout(self):
+        """Test a blocking put gives up after its timeout"""
+        queue = SampleQueue(1, "block")
+        queue.put(make_sample(1))
+        
+        assert queue.put(make_sample(2), timeout=0.01) is False
+        assert queue.dropped == 1
+    
+    def test_block_until_space(self):
+        """Test a blocking put continues once the writer takes samples"""
+        queue = SampleQueue(1, "block")
+        queue.put(make_sample(1))
+        threading.Timer(0.05, queue.get_batch, args=(1,)).start()
+        
+        assert queue.put(make_sample(2), timeout=5) is True
+        assert queue.depth == 1
+    
+    def test_aggregate(self):
+        """Test samples are averaged into the newest queued sample when full"""
+        queue = SampleQueue(1, "aggregate")
+        queue.put(make_sample(10))
+        queue.put(make_sample(20))
+        queue.put(make_sample(60))
+        
+        batch = queue.get_batch(10, timeout=0)
+        
+        assert len(batch) == 1
+        assert batch[0].count == 3
+        assert batch[0].data.cpu_percent == pytest.approx(30.0)
+        assert batch[0].data.cpu_temp is None
+        assert batch[0].data.cpu_count == 4
+        assert queue.aggregated == 2
+    
+    def test_merge_keeps_latest_timestamp(self):
+        """Test a merged sample takes the timestamp of the newest reading"""
+        merged = merge_samples(make_sample(10), make_sample(20))
+        
+        assert merged.timestamp == make_sample(20).timestamp
+    
+    def test_invalid_policy(self):
+        """Test unknown policies are rejected"""
+        with pytest.raises(ValueError):
+            SampleQueue(10, "drop_newest")
+
+
+class TestWriterThread:
+    """Tests for WriterThread"""
+    
+    def test_drains_queue_in_batches(self):
+        """Test queued samples are written per table and drained on stop"""
+        queue = SampleQueue(100)
+        for i in range(3):
+            queue.put(make_sample(i))
+        queue.put(make_sample(5, table="sensehat"))
+        db = MagicMock()
+        
+        writer = WriterThread(queue, db, idle_timeout=0.01)
+        writer.start()
+        writer.stop()
+        
+        assert writer.written == 4
+        assert queue.depth == 0
+        tables = [c[0][0] for c in db.write_samples.call_args_list]
+        assert sorted(tables) == ["raspberry_pi", "sensehat"]
+        db.flush_expired.assert_called()
+    
+    def test_write_error_is_counted(self):
+        """Test a failing write is logged and counted, not fatal"""
+        queue = SampleQueue(100)
+        queue.put(make_sample(1))
+        db = MagicMock()
+        db.write_samples.side_effect = Exception("database down")
+        
+        writer = WriterThread(queue, db, idle_timeout=0.01)
+        writer.start()
+        writer.stop()
+        
+        assert writer.failed == 1
+        assert not writer.is_alive()